@@ -1,18 +1,25 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, FileResponse
 from pydantic import BaseModel, Field
 from typing import Optional, List
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 import jwt
 import hashlib
 import os
-from pymongo import MongoClient
-from pymongo.errors import ServerSelectionTimeoutError, ConnectionFailure, ConfigurationError
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient, ReturnDocument
+from pymongo.errors import ServerSelectionTimeoutError, ConnectionFailure, ConfigurationError, BulkWriteError
 import uuid
 from bson import ObjectId
-import pandas as pd
+from openpyxl import Workbook
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only the parquet export needs it
+    pa = None
+    pq = None
 import io
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
@@ -21,6 +28,19 @@ from reportlab.lib.units import inch
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 import json
+import csv
+import gzip
+import zlib
+import itertools
+import tempfile
+import shutil
+import base64
+import time
+import asyncio
+import secrets
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict
 
 app = FastAPI(title="Emergency Management System API")
 
@@ -35,7 +55,7 @@ app.add_middleware(
 
 # MongoDB connection
 MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017/')
-client = MongoClient(MONGO_URL)
+client = AsyncIOMotorClient(MONGO_URL)
 db = client['emergency_management']
 
 # Global variables for dynamic database management
@@ -91,34 +111,100 @@ DEFAULT_PERMISSIONS = {
     ]
 }
 
+# Data versions: monotonically increasing counters bumped on every write to a
+# shared dataset, so each worker process can detect changes with a single read
+async def get_data_version(name: str) -> int:
+    version_doc = await db.data_versions.find_one({"_id": name})
+    return version_doc["version"] if version_doc else 0
+
+async def bump_data_version(name: str) -> int:
+    version_doc = await db.data_versions.find_one_and_update(
+        {"_id": name},
+        {"$inc": {"version": 1}, "$set": {"updated_at": datetime.now()}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return version_doc["version"]
+
+class PermissionTable:
+    """In-memory role -> permissions table, reloaded when the role_permissions version changes"""
+    
+    def __init__(self, refresh_interval: float = 5):
+        self.refresh_interval = refresh_interval
+        self.permissions = {}
+        self.version = None
+        self.checked_at = 0.0
+        self.reloads = 0
+        self.lock = asyncio.Lock()
+    
+    async def load(self):
+        # Read the version first: a change landing during the load is picked up by the next check
+        version = await get_data_version("role_permissions")
+        permissions = {role: frozenset(perms) for role, perms in DEFAULT_PERMISSIONS.items()}
+        async for role_doc in db.role_permissions.find({}, {"_id": 0, "role": 1, "permissions": 1}):
+            permissions[role_doc["role"]] = frozenset(role_doc.get("permissions", []))
+        
+        self.permissions = permissions
+        self.version = version
+        self.checked_at = time.monotonic()
+        self.reloads += 1
+    
+    async def refresh_if_stale(self):
+        if time.monotonic() - self.checked_at < self.refresh_interval:
+            return
+        
+        async with self.lock:
+            if time.monotonic() - self.checked_at < self.refresh_interval:
+                return
+            if await get_data_version("role_permissions") != self.version:
+                await self.load()
+            else:
+                self.checked_at = time.monotonic()
+    
+    def invalidate(self):
+        self.version = None
+        self.checked_at = 0.0
+    
+    def get(self, role: str) -> frozenset:
+        return self.permissions.get(role, frozenset())
+    
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "roles": len(self.permissions),
+            "reloads": self.reloads,
+            "refresh_interval": self.refresh_interval,
+            "seconds_since_check": round(time.monotonic() - self.checked_at, 1) if self.checked_at else None
+        }
+
+# Changes made by another worker process become visible within refresh_interval seconds
+permission_table = PermissionTable(
+    refresh_interval=float(os.environ.get('PERMISSIONS_REFRESH_INTERVAL', 5))
+)
+
 # Helper function to check permissions
-def check_permission(user_role: str, permission: str) -> bool:
+async def check_permission(user_role: str, permission: str) -> bool:
     """Check if user role has specific permission"""
     try:
-        # Get permissions from database or use defaults
-        role_permissions = db.role_permissions.find_one({"role": user_role})
-        if role_permissions:
-            return permission in role_permissions.get("permissions", [])
-        else:
-            # Use default permissions if not found in database
-            return permission in DEFAULT_PERMISSIONS.get(user_role, [])
+        await permission_table.refresh_if_stale()
+        return permission in permission_table.get(user_role)
     except:
         return False
 
 def require_permission(permission: str):
     """Decorator to require specific permission"""
     def decorator(func):
-        def wrapper(*args, **kwargs):
+        async def wrapper(*args, **kwargs):
             # Get current user from kwargs (assuming it's passed)
             current_user = kwargs.get('current_user')
             if not current_user:
                 raise HTTPException(status_code=401, detail="Utente non autenticato")
             
             user_role = current_user.get('role')
-            if not check_permission(user_role, permission):
+            if not await check_permission(user_role, permission):
                 raise HTTPException(status_code=403, detail="Permessi insufficienti")
             
-            return func(*args, **kwargs)
+            return await func(*args, **kwargs)
         return wrapper
     return decorator
 
@@ -157,7 +243,7 @@ class InventoryItem(BaseModel):
     quantity: int
     unit: str
     location: str
-    min_quantity: int = 0  # Alert quando sotto questa quantità
+    min_quantity: int = 0  # Alert quando pari o sotto questa quantità
     max_quantity: Optional[int] = None
     expiry_date: Optional[datetime] = None
     supplier: Optional[str] = None
@@ -172,6 +258,15 @@ class InventoryUpdate(BaseModel):
     reason: str
     location: Optional[str] = None
 
+INVENTORY_BATCH_MAX_MOVEMENTS = 1000
+
+class InventoryMovement(InventoryUpdate):
+    item_id: str
+
+class InventoryMovementBatch(BaseModel):
+    movements: List[InventoryMovement] = Field(..., min_length=1, max_length=INVENTORY_BATCH_MAX_MOVEMENTS)
+    reason: Optional[str] = None  # Motivo complessivo (es. "Scarico camion"), usato nel log
+
 class UserManagement(BaseModel):
     username: str
     email: str
@@ -252,7 +347,8 @@ class TrainedResource(BaseModel):
 
 class ReportRequest(BaseModel):
     report_type: str  # events, logs, statistics, inventory, resources
-    format: str = "pdf"  # pdf, excel, csv
+    format: str = "pdf"  # pdf, excel, csv, ndjson, parquet
+    compress: bool = False  # gzip csv/ndjson exports
     start_date: Optional[str] = None
     end_date: Optional[str] = None
     event_type: Optional[str] = None
@@ -289,20 +385,157 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+# Pagination helpers
+def encode_cursor(values: dict) -> str:
+    """Encode the sort key of the last returned document as an opaque cursor"""
+    payload = {
+        key: {"$date": value.isoformat()} if isinstance(value, datetime) else value
+        for key, value in values.items()
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+def decode_cursor(cursor: str) -> dict:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        return {
+            key: datetime.fromisoformat(value["$date"]) if isinstance(value, dict) else value
+            for key, value in payload.items()
+        }
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise HTTPException(status_code=400, detail="Cursore non valido")
+
+def keyset_condition(sort_field: str, cursor_values: dict, direction: int = -1) -> dict:
+    """Build the "after this document" predicate for a (sort_field, id) ordering, descending by default"""
+    if sort_field not in cursor_values or "id" not in cursor_values:
+        raise HTTPException(status_code=400, detail="Cursore non valido")
+    after = "$lt" if direction < 0 else "$gt"
+    return {"$or": [
+        {sort_field: {after: cursor_values[sort_field]}},
+        {sort_field: cursor_values[sort_field], "id": {after: cursor_values["id"]}}
+    ]}
+
+def build_date_range(start_date: Optional[str], end_date: Optional[str]) -> Optional[dict]:
+    """Translate YYYY-MM-DD bounds into a Mongo range predicate (end date inclusive)"""
+    if not start_date and not end_date:
+        return None
+    
+    date_range = {}
+    try:
+        if start_date:
+            date_range["$gte"] = datetime.fromisoformat(start_date + 'T00:00:00')
+        if end_date:
+            date_range["$lte"] = datetime.fromisoformat(end_date + 'T23:59:59')
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Formato data non valido (usare AAAA-MM-GG)")
+    return date_range
+
+# Geospatial helpers
+EARTH_RADIUS_KM = 6378.1
+MAP_CLUSTER_CELL_PX = 64  # cluster grid cell, in screen pixels of a 256px web-mercator tile
+MAP_CLUSTER_MAX_CELLS = 2000
+SEVERITY_LEVELS = ["bassa", "media", "alta", "critica"]
+
+def event_location(latitude: Optional[float], longitude: Optional[float]) -> Optional[dict]:
+    """GeoJSON point stored alongside latitude/longitude for the 2dsphere index"""
+    if latitude is None or longitude is None:
+        return None
+    return {"type": "Point", "coordinates": [float(longitude), float(latitude)]}
+
+def parse_bbox(bbox: str) -> List[float]:
+    """Parse a "min_lon,min_lat,max_lon,max_lat" viewport string"""
+    try:
+        min_lon, min_lat, max_lon, max_lat = [float(value) for value in bbox.split(",")]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox non valido (usare min_lon,min_lat,max_lon,max_lat)")
+    
+    if not (-90 <= min_lat < max_lat <= 90):
+        raise HTTPException(status_code=400, detail="bbox non valido: latitudini fuori intervallo")
+    # Longitudes stay unwrapped (map bounds may run past ±180): bbox_boxes normalizes them
+    return [min_lon, min_lat, max_lon, max_lat]
+
+def cluster_cell_size(zoom: int) -> float:
+    """Grid cell size in degrees so that a cell covers about MAP_CLUSTER_CELL_PX pixels at this zoom"""
+    return 360.0 * MAP_CLUSTER_CELL_PX / (256 * 2 ** zoom)
+
+def build_cluster_pipeline(query: dict, zoom: int) -> list:
+    """Aggregate matching events into grid cells with centroid, count and severity breakdown"""
+    cell_size = cluster_cell_size(zoom)
+    group_stage = {
+        "_id": {
+            "x": {"$floor": {"$divide": ["$longitude", cell_size]}},
+            "y": {"$floor": {"$divide": ["$latitude", cell_size]}}
+        },
+        "count": {"$sum": 1},
+        "latitude": {"$avg": "$latitude"},
+        "longitude": {"$avg": "$longitude"},
+        # Most recent event of the cell, used as a plain marker when the cell holds a single event
+        "event": {"$first": {
+            "id": "$id",
+            "title": "$title",
+            "description": "$description",
+            "event_type": "$event_type",
+            "severity": "$severity",
+            "status": "$status",
+            "latitude": "$latitude",
+            "longitude": "$longitude",
+            "address": "$address",
+            "created_at": "$created_at",
+            "created_by": "$created_by",
+            "notes": "$notes"
+        }}
+    }
+    for severity in SEVERITY_LEVELS:
+        group_stage[severity] = {"$sum": {"$cond": [{"$eq": ["$severity", severity]}, 1, 0]}}
+    
+    return [
+        {"$match": query},
+        {"$sort": {"created_at": -1}},
+        {"$group": group_stage},
+        {"$sort": {"count": -1}},
+        {"$limit": MAP_CLUSTER_MAX_CELLS}
+    ]
+
+def bbox_boxes(min_lon: float, min_lat: float, max_lon: float, max_lat: float) -> List[list]:
+    """Planar [[west, south], [east, north]] boxes covering a viewport, split at the antimeridian.
+    
+    A map viewport is a lat/lon rectangle; GeoJSON polygon edges are great-circle arcs that bow
+    towards the pole on wide viewports, so the viewport is matched with $box on the 2d index.
+    """
+    width = max_lon - min_lon
+    if width < 0:
+        # West edge east of the east edge: the viewport crosses the antimeridian
+        width += 360
+    if width >= 360:
+        return [[[-180.0, min_lat], [180.0, max_lat]]]
+    west = (min_lon + 180) % 360 - 180
+    east = west + width
+    if east <= 180:
+        return [[[west, min_lat], [east, max_lat]]]
+    return [[[west, min_lat], [180.0, max_lat]], [[-180.0, min_lat], [east - 360, max_lat]]]
+
+def bbox_query(bbox: str) -> dict:
+    """Events filter for a "min_lon,min_lat,max_lon,max_lat" viewport"""
+    conditions = [
+        {"location.coordinates": {"$geoWithin": {"$box": box}}}
+        for box in bbox_boxes(*parse_bbox(bbox))
+    ]
+    return conditions[0] if len(conditions) == 1 else {"$or": conditions}
+
 # Database management functions
-def test_database_connection(mongo_url: str, database_name: str, timeout: int = 5000):
+async def test_database_connection(mongo_url: str, database_name: str, timeout: int = 5000):
     """Test connection to a MongoDB database"""
     try:
-        test_client = MongoClient(
+        test_client = AsyncIOMotorClient(
             mongo_url, 
             serverSelectionTimeoutMS=timeout,
             connectTimeoutMS=timeout
         )
         # Try to get server info to test connection
-        test_client.admin.command('ismaster')
+        await test_client.admin.command('ismaster')
         test_db = test_client[database_name]
         # Try a simple operation to test database access
-        test_db.list_collection_names()
+        await test_db.list_collection_names()
         test_client.close()
         return True, "Connessione riuscita"
     except ServerSelectionTimeoutError:
@@ -314,21 +547,24 @@ def test_database_connection(mongo_url: str, database_name: str, timeout: int =
     except Exception as e:
         return False, f"Errore generico: {str(e)}"
 
-def switch_database_connection(mongo_url: str, database_name: str):
+async def switch_database_connection(mongo_url: str, database_name: str):
     """Switch to a new database connection"""
     global current_client, current_db, current_mongo_url, current_database_name
     
     try:
+        # Buffered log entries belong to the current database
+        await log_writer.flush()
+        
         # Close existing connection
         if current_client:
             current_client.close()
         
         # Create new connection
-        new_client = MongoClient(mongo_url)
+        new_client = AsyncIOMotorClient(mongo_url)
         new_db = new_client[database_name]
         
         # Test the new connection
-        new_db.list_collection_names()
+        await new_db.list_collection_names()
         
         # Update global variables
         current_client = new_client
@@ -340,11 +576,15 @@ def switch_database_connection(mongo_url: str, database_name: str):
         global db
         db = new_db
         
+        # Cached users and permissions belong to the previous database
+        user_cache.clear()
+        permission_table.invalidate()
+        
         return True, "Connessione database aggiornata con successo"
     except Exception as e:
         return False, f"Errore durante il cambio di database: {str(e)}"
 
-def initialize_new_database(database):
+async def initialize_new_database(database):
     """Initialize a new database with default admin user and collections"""
     try:
         # Create default admin user
@@ -362,9 +602,9 @@ def initialize_new_database(database):
         }
         
         # Check if admin user already exists
-        existing_admin = database.users.find_one({"username": "admin"})
+        existing_admin = await database.users.find_one({"username": "admin"})
         if not existing_admin:
-            database.users.insert_one(admin_user)
+            await database.users.insert_one(admin_user)
             print("✅ Utente admin creato nel nuovo database")
         
         # Initialize default role permissions
@@ -386,9 +626,9 @@ def initialize_new_database(database):
         }
         
         for role, perm_data in default_permissions.items():
-            existing = database.role_permissions.find_one({"role": role})
+            existing = await database.role_permissions.find_one({"role": role})
             if not existing:
-                database.role_permissions.insert_one({"role": role, **perm_data})
+                await database.role_permissions.insert_one({"role": role, **perm_data})
         
         # Initialize default event types
         default_event_types = [
@@ -399,7 +639,7 @@ def initialize_new_database(database):
         ]
         
         for event_type in default_event_types:
-            existing = database.event_types.find_one({"name": event_type["name"]})
+            existing = await database.event_types.find_one({"name": event_type["name"]})
             if not existing:
                 event_type_data = {
                     "id": str(uuid.uuid4()),
@@ -409,7 +649,7 @@ def initialize_new_database(database):
                     "created_at": datetime.now(),
                     "created_by": "system"
                 }
-                database.event_types.insert_one(event_type_data)
+                await database.event_types.insert_one(event_type_data)
         
         # Initialize default inventory categories
         default_categories = [
@@ -419,7 +659,7 @@ def initialize_new_database(database):
         ]
         
         for category in default_categories:
-            existing = database.inventory_categories.find_one({"name": category["name"]})
+            existing = await database.inventory_categories.find_one({"name": category["name"]})
             if not existing:
                 category_data = {
                     "id": str(uuid.uuid4()),
@@ -429,17 +669,17 @@ def initialize_new_database(database):
                     "created_at": datetime.now(),
                     "created_by": "system"
                 }
-                database.inventory_categories.insert_one(category_data)
+                await database.inventory_categories.insert_one(category_data)
         
         # Create indexes
         try:
-            database.users.create_index([("username", 1)], unique=True)
-            database.events.create_index([("id", 1)], unique=True)
-            database.logs.create_index([("id", 1)], unique=True)
-            database.inventory.create_index([("id", 1)], unique=True)
-            database.event_types.create_index([("name", 1)], unique=True)
-            database.inventory_categories.create_index([("name", 1)], unique=True)
-            database.role_permissions.create_index([("role", 1)], unique=True)
+            await database.users.create_index([("username", 1)], unique=True)
+            await database.events.create_index([("id", 1)], unique=True)
+            await database.logs.create_index([("id", 1)], unique=True)
+            await database.inventory.create_index([("id", 1)], unique=True)
+            await database.event_types.create_index([("name", 1)], unique=True)
+            await database.inventory_categories.create_index([("name", 1)], unique=True)
+            await database.role_permissions.create_index([("role", 1)], unique=True)
         except Exception as e:
             print(f"⚠️ Avviso creazione indici: {str(e)}")
         
@@ -447,26 +687,195 @@ def initialize_new_database(database):
     except Exception as e:
         return False, f"Errore durante l'inizializzazione del database: {str(e)}"
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+# Authenticated user cache
+class UserCache:
+    """Bounded LRU cache with per-entry TTL for user documents, keyed by username"""
+    
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 60):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def get(self, username: str) -> Optional[dict]:
+        entry = self.entries.get(username)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            del self.entries[username]
+            self.misses += 1
+            return None
+        
+        self.entries.move_to_end(username)
+        self.hits += 1
+        return user
+    
+    def set(self, username: str, user: dict):
+        self.entries[username] = (time.monotonic() + self.ttl_seconds, user)
+        self.entries.move_to_end(username)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+    
+    def invalidate(self, username: str):
+        if self.entries.pop(username, None) is not None:
+            self.invalidations += 1
+    
+    def clear(self):
+        self.invalidations += len(self.entries)
+        self.entries.clear()
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+# TTL bounds how long another worker process can serve a stale user after an admin change
+user_cache = UserCache(
+    max_size=int(os.environ.get('USER_CACHE_SIZE', 1024)),
+    ttl_seconds=float(os.environ.get('USER_CACHE_TTL', 60))
+)
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     try:
         payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
             raise HTTPException(status_code=401, detail="Token non valido")
         
-        user = db.users.find_one({"username": username})
+        user = user_cache.get(username)
         if user is None:
-            raise HTTPException(status_code=401, detail="Utente non trovato")
+            user = await db.users.find_one({"username": username})
+            if user is None:
+                raise HTTPException(status_code=401, detail="Utente non trovato")
+            user_cache.set(username, user)
         
         return user
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Token non valido")
 
 # Report generation functions
-def generate_events_pdf(events_data, filters):
-    """Generate PDF report for emergency events"""
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
+# PDF tables are emitted in page-sized chunks: reportlab lays out (and splits) each table as a
+# whole, so one table holding every row costs far more than many small ones
+PDF_TABLE_CHUNK_ROWS = 40
+
+def report_table_style(header_font_size: int, body_font_size: int) -> TableStyle:
+    """Shared style for report tables whose first row is the header"""
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), header_font_size),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('FONTSIZE', (0, 1), (-1, -1), body_font_size),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+
+EVENTS_TABLE_STYLE = report_table_style(10, 8)
+LOGS_TABLE_STYLE = report_table_style(9, 7)
+
+def chunked_tables(header, rows, col_widths, style, chunk_rows: int = PDF_TABLE_CHUNK_ROWS):
+    """Split an iterable of rows into fixed-size tables, each starting with (and repeating on split) the header row"""
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_rows))
+        if not chunk:
+            return
+        table = Table([header] + chunk, colWidths=col_widths, repeatRows=1)
+        table.setStyle(style)
+        yield table
+
+class StreamingDocTemplate(SimpleDocTemplate):
+    """SimpleDocTemplate that pulls the flowables following the static content from an iterator.
+    
+    build() lays out the head of its flowable list and then deletes it, so topping the list up
+    just before each step keeps only `lookahead` chunk tables (and their rows) alive at a time.
+    """
+    
+    def __init__(self, filename, tail=(), lookahead: int = 2, **kw):
+        super().__init__(filename, **kw)
+        self.tail = iter(tail)
+        self.lookahead = lookahead
+        self.content = None
+    
+    def build(self, flowables, **kw):
+        self.content = flowables
+        super().build(flowables, **kw)
+    
+    def filterFlowables(self, flowables):
+        # Also called on reportlab's internal page-begin list, which must be left alone
+        while flowables is self.content and len(flowables) < self.lookahead:
+            flowable = next(self.tail, None)
+            if flowable is None:
+                break
+            flowables.append(flowable)
+        super().filterFlowables(flowables)
+
+def format_report_date(value, date_format: str) -> str:
+    """Format a stored datetime (or legacy ISO/'%Y-%m-%d %H:%M:%S' string) for a PDF table, 'N/A' if unreadable"""
+    if isinstance(value, str) and value:
+        try:
+            # Remove timezone info and parse
+            clean_date = value.replace('Z', '').replace('+00:00', '')
+            if 'T' in clean_date:
+                date_obj = datetime.fromisoformat(clean_date)
+            else:
+                date_obj = datetime.strptime(clean_date, '%Y-%m-%d %H:%M:%S')
+            return date_obj.strftime(date_format)
+        except (ValueError, TypeError):
+            return 'N/A'
+    if isinstance(value, datetime):
+        return value.strftime(date_format)
+    return 'N/A'
+
+def event_pdf_row(event: dict) -> list:
+    return [
+        event.get('title', '')[:30],
+        event.get('event_type', ''),
+        event.get('severity', ''),
+        event.get('status', ''),
+        format_report_date(event.get('created_at', ''), '%d/%m/%Y'),
+        event.get('created_by', '')
+    ]
+
+def log_pdf_row(log: dict) -> list:
+    details = log.get('details', '')
+    return [
+        log.get('action', '')[:25],
+        log.get('priority', ''),
+        log.get('operator', ''),
+        format_report_date(log.get('timestamp', ''), '%d/%m/%Y %H:%M'),
+        details[:40] + '...' if len(details) > 40 else details
+    ]
+
+def generate_events_pdf(events_data, filters, output=None, total: Optional[int] = None):
+    """Generate PDF report for emergency events.
+    
+    events_data may be any iterable (e.g. a cursor). When `total` (the number of events it
+    yields, shown in the header) is given, rows are laid out as they are read, a few chunk
+    tables at a time; otherwise events_data is read into a list first to count it. The PDF is
+    written to `output` (a new BytesIO if omitted), which is returned.
+    """
+    if total is None:
+        events_data = list(events_data)
+        total = len(events_data)
+    buffer = output if output is not None else io.BytesIO()
     
     # Get styles
     styles = getSampleStyleSheet()
@@ -491,70 +900,33 @@ def generate_events_pdf(events_data, filters):
     <b>Data generazione:</b> {datetime.now().strftime('%d/%m/%Y %H:%M')}<br/>
     <b>Periodo:</b> {filters.get('start_date', 'Non specificato')} - {filters.get('end_date', 'Non specificato')}<br/>
     <b>Filtri applicati:</b> Tipo: {filters.get('event_type', 'Tutti')}, Gravità: {filters.get('severity', 'Tutte')}<br/>
-    <b>Totale eventi:</b> {len(events_data)}
+    <b>Totale eventi:</b> {total}
     """
     content.append(Paragraph(report_info, styles['Normal']))
     content.append(Spacer(1, 20))
     
-    if events_data:
-        # Create table data
-        table_data = [['Titolo', 'Tipo', 'Gravità', 'Status', 'Data', 'Operatore']]
-        
-        for event in events_data:
-            # Handle datetime conversion safely
-            created_at = event.get('created_at', '')
-            if isinstance(created_at, str) and created_at:
-                try:
-                    # Remove timezone info and parse
-                    clean_date = created_at.replace('Z', '').replace('+00:00', '')
-                    if 'T' in clean_date:
-                        date_obj = datetime.fromisoformat(clean_date)
-                    else:
-                        date_obj = datetime.strptime(clean_date, '%Y-%m-%d %H:%M:%S')
-                    formatted_date = date_obj.strftime('%d/%m/%Y')
-                except (ValueError, TypeError):
-                    formatted_date = 'N/A'
-            elif isinstance(created_at, datetime):
-                formatted_date = created_at.strftime('%d/%m/%Y')
-            else:
-                formatted_date = 'N/A'
-            
-            table_data.append([
-                event.get('title', '')[:30],
-                event.get('event_type', ''),
-                event.get('severity', ''),
-                event.get('status', ''),
-                formatted_date,
-                event.get('created_by', '')
-            ])
-        
-        # Create table
-        table = Table(table_data, colWidths=[2*inch, 1*inch, 1*inch, 1*inch, 1*inch, 1*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        content.append(table)
+    tables = ()
+    if total:
+        tables = chunked_tables(
+            ['Titolo', 'Tipo', 'Gravità', 'Status', 'Data', 'Operatore'],
+            map(event_pdf_row, events_data),
+            [2*inch, 1*inch, 1*inch, 1*inch, 1*inch, 1*inch],
+            EVENTS_TABLE_STYLE
+        )
     else:
         content.append(Paragraph("Nessun evento trovato per i filtri specificati.", styles['Normal']))
     
     # Build PDF
-    doc.build(content)
+    StreamingDocTemplate(buffer, tail=tables, pagesize=A4).build(content)
     buffer.seek(0)
     return buffer
 
-def generate_logs_pdf(logs_data, filters):
-    """Generate PDF report for operational logs"""
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
+def generate_logs_pdf(logs_data, filters, output=None, total: Optional[int] = None):
+    """Generate PDF report for operational logs (see generate_events_pdf for data, total and output)"""
+    if total is None:
+        logs_data = list(logs_data)
+        total = len(logs_data)
+    buffer = output if output is not None else io.BytesIO()
     
     styles = getSampleStyleSheet()
     title_style = ParagraphStyle(
@@ -577,66 +949,29 @@ def generate_logs_pdf(logs_data, filters):
     <b>Data generazione:</b> {datetime.now().strftime('%d/%m/%Y %H:%M')}<br/>
     <b>Periodo:</b> {filters.get('start_date', 'Non specificato')} - {filters.get('end_date', 'Non specificato')}<br/>
     <b>Filtri applicati:</b> Priorità: {filters.get('priority', 'Tutte')}, Operatore: {filters.get('operator', 'Tutti')}<br/>
-    <b>Totale log:</b> {len(logs_data)}
+    <b>Totale log:</b> {total}
     """
     content.append(Paragraph(report_info, styles['Normal']))
     content.append(Spacer(1, 20))
     
-    if logs_data:
-        # Create table data
-        table_data = [['Azione', 'Priorità', 'Operatore', 'Data', 'Dettagli']]
-        
-        for log in logs_data:
-            # Handle datetime conversion safely
-            timestamp = log.get('timestamp', '')
-            if isinstance(timestamp, str) and timestamp:
-                try:
-                    # Remove timezone info and parse
-                    clean_date = timestamp.replace('Z', '').replace('+00:00', '')
-                    if 'T' in clean_date:
-                        date_obj = datetime.fromisoformat(clean_date)
-                    else:
-                        date_obj = datetime.strptime(clean_date, '%Y-%m-%d %H:%M:%S')
-                    formatted_date = date_obj.strftime('%d/%m/%Y %H:%M')
-                except (ValueError, TypeError):
-                    formatted_date = 'N/A'
-            elif isinstance(timestamp, datetime):
-                formatted_date = timestamp.strftime('%d/%m/%Y %H:%M')
-            else:
-                formatted_date = 'N/A'
-            
-            table_data.append([
-                log.get('action', '')[:25],
-                log.get('priority', ''),
-                log.get('operator', ''),
-                formatted_date,
-                log.get('details', '')[:40] + '...' if len(log.get('details', '')) > 40 else log.get('details', '')
-            ])
-        
-        table = Table(table_data, colWidths=[1.5*inch, 0.8*inch, 1*inch, 1.2*inch, 2.5*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('FONTSIZE', (0, 1), (-1, -1), 7),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        content.append(table)
+    tables = ()
+    if total:
+        tables = chunked_tables(
+            ['Azione', 'Priorità', 'Operatore', 'Data', 'Dettagli'],
+            map(log_pdf_row, logs_data),
+            [1.5*inch, 0.8*inch, 1*inch, 1.2*inch, 2.5*inch],
+            LOGS_TABLE_STYLE
+        )
     else:
         content.append(Paragraph("Nessun log trovato per i filtri specificati.", styles['Normal']))
     
-    doc.build(content)
+    StreamingDocTemplate(buffer, tail=tables, pagesize=A4).build(content)
     buffer.seek(0)
     return buffer
 
-def generate_statistics_pdf(stats_data):
+def generate_statistics_pdf(stats_data, output=None):
     """Generate PDF report for statistics"""
-    buffer = io.BytesIO()
+    buffer = output if output is not None else io.BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4)
     
     styles = getSampleStyleSheet()
@@ -693,91 +1028,693 @@ def generate_statistics_pdf(stats_data):
     buffer.seek(0)
     return buffer
 
-def generate_excel_report(data, report_type, filters):
-    """Generate Excel report"""
-    buffer = io.BytesIO()
-    
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        if report_type == 'events':
-            # Convert events data to DataFrame
-            if data:
-                df = pd.DataFrame(data)
-                # Convert datetime columns
-                if 'created_at' in df.columns:
-                    df['created_at'] = pd.to_datetime(df['created_at']).dt.strftime('%d/%m/%Y %H:%M')
-                if 'updated_at' in df.columns:
-                    df['updated_at'] = pd.to_datetime(df['updated_at'], errors='coerce').dt.strftime('%d/%m/%Y %H:%M')
-                
-                df.to_excel(writer, sheet_name='Eventi Emergenza', index=False)
-            else:
-                # Create empty DataFrame with headers if no data
-                empty_df = pd.DataFrame(columns=['title', 'event_type', 'severity', 'status', 'created_at', 'created_by'])
-                empty_df.to_excel(writer, sheet_name='Eventi Emergenza', index=False)
-            
-        elif report_type == 'logs':
-            # Convert logs data to DataFrame
-            if data:
-                df = pd.DataFrame(data)
-                if 'timestamp' in df.columns:
-                    df['timestamp'] = pd.to_datetime(df['timestamp']).dt.strftime('%d/%m/%Y %H:%M')
-                
-                df.to_excel(writer, sheet_name='Log Operativi', index=False)
-            else:
-                # Create empty DataFrame with headers if no data
-                empty_df = pd.DataFrame(columns=['action', 'priority', 'operator', 'timestamp', 'details'])
-                empty_df.to_excel(writer, sheet_name='Log Operativi', index=False)
-        
-        elif report_type == 'statistics':
-            # Create statistics sheet
-            stats_df = pd.DataFrame.from_dict(data, orient='index', columns=['Valore'])
-            stats_df.index.name = 'Categoria'
-            stats_df.to_excel(writer, sheet_name='Statistiche')
+# Column schema of each tabular report: document fields, in order
+REPORT_COLUMNS = {
+    'events': [
+        'id', 'title', 'description', 'event_type', 'severity', 'status', 'latitude', 'longitude', 'address',
+        'created_at', 'created_by', 'updated_at', 'updated_by', 'resources_needed', 'notes'
+    ],
+    'logs': ['id', 'timestamp', 'operator', 'action', 'details', 'event_id', 'priority'],
+    'inventory': [
+        'id', 'name', 'category', 'quantity', 'unit', 'location', 'min_quantity', 'max_quantity', 'expiry_date',
+        'supplier', 'cost_per_unit', 'notes', 'created_at', 'updated_at', 'last_updated_by'
+    ],
+    'resources': [
+        'id', 'full_name', 'role', 'specializations', 'contact_phone', 'contact_email', 'availability',
+        'location', 'created_at', 'updated_at'
+    ]
+}
+EXCEL_SHEET_TITLES = {'events': 'Eventi Emergenza', 'logs': 'Log Operativi'}
+
+def excel_cell(value):
+    """Convert a document value to something a worksheet cell can hold"""
+    if isinstance(value, datetime):
+        return value.strftime('%d/%m/%Y %H:%M')
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(item) for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value, default=str)
+    return value
+
+def generate_excel_report(data, report_type, filters, output=None):
+    """Generate Excel report.
     
+    Uses openpyxl's write-only mode: rows are serialized as they are appended, so events and
+    logs can be streamed from a cursor without ever holding the sheet in memory.
+    """
+    buffer = output if output is not None else io.BytesIO()
+    workbook = Workbook(write_only=True)
+    
+    if report_type in EXCEL_SHEET_TITLES:
+        columns = REPORT_COLUMNS[report_type]
+        sheet = workbook.create_sheet(EXCEL_SHEET_TITLES[report_type])
+        sheet.append(columns)
+        for document in data:
+            sheet.append([excel_cell(document.get(column)) for column in columns])
+    
+    elif report_type == 'statistics':
+        sheet = workbook.create_sheet('Statistiche')
+        sheet.append(['Categoria', 'Valore'])
+        for category, value in data.items():
+            sheet.append([category, value])
+    
+    workbook.save(buffer)
     buffer.seek(0)
     return buffer
 
-def filter_data_by_date(data, start_date, end_date, date_field='created_at'):
-    """Filter data by date range"""
-    if not start_date and not end_date:
-        return data
+# Bulk export formats: one line per document, no layout engine involved
+EXPORT_FORMATS = ('csv', 'ndjson')
+
+def export_value(value):
+    """Flatten a document value for CSV: ISO dates, JSON for lists and objects"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, tuple, dict)):
+        return json.dumps(value, default=str, ensure_ascii=False)
+    return value
+
+def export_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def export_header(export_format: str, columns) -> str:
+    if export_format != 'csv':
+        return ""
+    return export_batch(export_format, columns, [dict(zip(columns, columns))])
+
+def export_batch(export_format: str, columns, documents) -> str:
+    """Encode a batch of documents as CSV rows or NDJSON lines"""
+    if export_format == 'csv':
+        text = io.StringIO()
+        writer = csv.writer(text, lineterminator='\n')
+        writer.writerows([export_value(document.get(column)) for column in columns] for document in documents)
+        return text.getvalue()
+    return "".join(
+        json.dumps({column: document.get(column) for column in columns}, default=export_default, ensure_ascii=False) + "\n"
+        for document in documents
+    )
+
+def generate_export(data, report_type, export_format, output, compress=False, batch_size=1000):
+    """Write a CSV/NDJSON export of `data` (any iterable of documents) to the binary file object `output`"""
+    columns = REPORT_COLUMNS[report_type]
+    target = gzip.GzipFile(fileobj=output, mode='wb') if compress else output
+    try:
+        target.write(export_header(export_format, columns).encode('utf-8'))
+        documents = iter(data)
+        while True:
+            batch = list(itertools.islice(documents, batch_size))
+            if not batch:
+                break
+            target.write(export_batch(export_format, columns, batch).encode('utf-8'))
+    finally:
+        if compress:
+            target.close()
+    output.seek(0)
+    return output
+
+# Parquet export: typed columns, enums dictionary-encoded, written one row group at a time
+PARQUET_ROW_GROUP_ROWS = 50000
+
+def parquet_schema(report_type: str):
+    """Arrow schema of a parquet export, following REPORT_COLUMNS"""
+    enum = pa.dictionary(pa.int32(), pa.string())
+    text = pa.string()
+    timestamp = pa.timestamp('ms')
+    types = {
+        'events': {
+            'event_type': enum, 'severity': enum, 'status': enum, 'latitude': pa.float64(), 'longitude': pa.float64(),
+            'created_at': timestamp, 'updated_at': timestamp, 'created_by': enum, 'updated_by': enum,
+            'resources_needed': pa.list_(text)
+        },
+        'logs': {'timestamp': timestamp, 'operator': enum, 'priority': enum},
+        'inventory': {
+            'category': enum, 'unit': enum, 'location': enum, 'quantity': pa.int64(), 'min_quantity': pa.int64(),
+            'max_quantity': pa.int64(), 'expiry_date': timestamp, 'cost_per_unit': pa.float64(),
+            'created_at': timestamp, 'updated_at': timestamp, 'last_updated_by': enum
+        }
+    }[report_type]
+    return pa.schema([(column, types.get(column, text)) for column in REPORT_COLUMNS[report_type]])
+
+def parquet_value(value, arrow_type):
+    """Coerce a stored value to the column type, or None if it does not fit"""
+    if value is None:
+        return None
+    if pa.types.is_timestamp(arrow_type):
+        return normalize_datetime(value)
+    if pa.types.is_integer(arrow_type):
+        return int(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+    if pa.types.is_floating(arrow_type):
+        return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+    if pa.types.is_list(arrow_type):
+        return [str(item) for item in value] if isinstance(value, (list, tuple)) else None
+    return value if isinstance(value, str) else str(value)
+
+def generate_parquet_export(data, report_type, output, row_group_rows=PARQUET_ROW_GROUP_ROWS):
+    """Write a parquet export of `data` (any iterable of documents) to the binary file object `output`"""
+    schema = parquet_schema(report_type)
+    documents = iter(data)
+    with pq.ParquetWriter(output, schema, compression='zstd') as writer:
+        while True:
+            batch = list(itertools.islice(documents, row_group_rows))
+            if not batch:
+                break
+            columns = [
+                pa.array([parquet_value(document.get(field.name), field.type) for document in batch], type=field.type)
+                for field in schema
+            ]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema), row_group_size=row_group_rows)
+    output.seek(0)
+    return output
+
+# Operational log and dashboard counter helpers
+DASHBOARD_COUNTERS_ID = "dashboard"
+EXPIRY_WARNING_DAYS = 30
+DASHBOARD_RECONCILE_INTERVAL = float(os.environ.get('DASHBOARD_RECONCILE_INTERVAL', 300))
+
+def expiry_threshold() -> datetime:
+    """Items expiring on or before this instant are reported as expiring soon"""
+    return datetime.now() + timedelta(days=EXPIRY_WARNING_DAYS)
+
+def normalize_datetime(value) -> Optional[datetime]:
+    """Coerce an ISO string, date or datetime to a naive UTC datetime (stored as a BSON date) or None"""
+    if isinstance(value, date) and not isinstance(value, datetime):
+        # BSON has no plain date type: a calendar day is stored as its midnight
+        value = datetime.combine(value, datetime.min.time())
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return None
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def normalize_expiry_date(expiry_date) -> Optional[datetime]:
+    """Coerce an expiry date to a naive datetime (stored as a BSON date) or None"""
+    return normalize_datetime(expiry_date)
+
+def is_expiring_soon(expiry_date: Optional[datetime]) -> bool:
+    """True when a stored (normalized) expiry date falls within the warning window"""
+    return isinstance(expiry_date, datetime) and expiry_date <= expiry_threshold()
+
+# Alert state kept on every inventory document: `low_stock` (indexed) and a days-to-expiry
+# `expiry_bucket` (None when the item does not expire within the warning window). Buckets count
+# whole days from the start of today, so they only change at midnight, when they are refreshed.
+EXPIRY_BUCKETS = [("scaduto", 0), ("entro_7_giorni", 7), ("entro_30_giorni", EXPIRY_WARNING_DAYS)]
+INVENTORY_ALERT_FIELDS = ["id", "name", "category", "quantity", "min_quantity", "unit", "location"]
+
+def today_start() -> datetime:
+    return datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+def expiry_bucket(expiry_date: Optional[datetime], today: Optional[datetime] = None) -> Optional[str]:
+    """Narrowest days-to-expiry bucket an expiry date falls in, None outside the warning window"""
+    if not isinstance(expiry_date, datetime):
+        return None
+    today = today or today_start()
+    for bucket, days in EXPIRY_BUCKETS:
+        if expiry_date <= today + timedelta(days=days):
+            return bucket
+    return None
+
+def inventory_alert_state(item: dict) -> dict:
+    """Alert fields for an item document about to be written in full"""
+    return {
+        "low_stock": item.get("quantity", 0) <= item.get("min_quantity", 0),
+        "expiry_bucket": expiry_bucket(item.get("expiry_date"))
+    }
+
+def alert_state_stage() -> dict:
+    """Pipeline-update stage recomputing the alert fields from the document's own values"""
+    today = today_start()
+    return {"$set": {
+        "low_stock": {"$lte": [{"$ifNull": ["$quantity", 0]}, {"$ifNull": ["$min_quantity", 0]}]},
+        "expiry_bucket": {"$switch": {
+            "branches": [
+                {"case": {"$and": [
+                    {"$eq": [{"$type": "$expiry_date"}, "date"]},
+                    {"$lte": ["$expiry_date", today + timedelta(days=days)]}
+                ]}, "then": bucket}
+                for bucket, days in EXPIRY_BUCKETS
+            ],
+            "default": None
+        }}
+    }}
+
+def quantity_update_pipeline(quantity_change: int, update_data: dict) -> list:
+    """Atomic $inc-equivalent pipeline update that keeps the alert fields in step with the quantity"""
+    return [
+        {"$set": {
+            "quantity": {"$add": ["$quantity", quantity_change]},
+            "stock_sequence": {"$add": [{"$ifNull": ["$stock_sequence", 0]}, 1]},
+            # Values are literals: a location starting with "$" must not be read as a field path
+            **{key: {"$literal": value} for key, value in update_data.items()}
+        }},
+        alert_state_stage()
+    ]
+
+async def refresh_inventory_alerts(full: bool = False) -> int:
+    """Recompute stored alert state; the nightly run only touches items that can change bucket by date"""
+    query = {} if full else {"expiry_date": {"$ne": None}}
+    result = await db.inventory.update_many(query, [alert_state_stage()])
+    return result.modified_count
+
+async def migrate_expiry_dates() -> int:
+    """One-shot migration of legacy string expiry dates to BSON dates.
     
-    filtered_data = []
-    for item in data:
-        item_date_str = item.get(date_field)
-        if not item_date_str:
+    Values that do not parse are left untouched and reported, so no original data is lost.
+    """
+    migrated = 0
+    async for item in db.inventory.find({"expiry_date": {"$type": "string"}}, {"_id": 1, "id": 1, "expiry_date": 1}):
+        value = normalize_expiry_date(item["expiry_date"])
+        if value is None and item["expiry_date"].strip():
+            print(f"⚠️ Data di scadenza non riconosciuta per l'articolo {item.get('id', item['_id'])}: {item['expiry_date']!r}")
             continue
-            
-        try:
-            # Handle different datetime formats
-            if isinstance(item_date_str, str):
-                # Remove timezone info if present and parse
-                clean_date_str = item_date_str.replace('Z', '').replace('+00:00', '')
-                if 'T' in clean_date_str:
-                    item_date = datetime.fromisoformat(clean_date_str)
-                else:
-                    item_date = datetime.strptime(clean_date_str, '%Y-%m-%d %H:%M:%S')
-            elif isinstance(item_date_str, datetime):
-                item_date = item_date_str
-            else:
+        await db.inventory.update_one({"_id": item["_id"]}, {"$set": {"expiry_date": value}})
+        migrated += 1
+    return migrated
+
+# Date fields that reports range-query on, per collection
+REPORT_DATE_FIELDS = {"events": "created_at", "logs": "timestamp"}
+
+async def migrate_report_dates() -> int:
+    """One-shot migration of legacy string event/log dates to BSON dates, so date ranges stay indexable"""
+    migrated = 0
+    for collection_name, date_field in REPORT_DATE_FIELDS.items():
+        collection = db[collection_name]
+        async for item in collection.find({date_field: {"$type": "string"}}, {"_id": 1, date_field: 1}):
+            value = normalize_datetime(item[date_field])
+            if value is None:
                 continue
-            
-            if start_date:
-                start_datetime = datetime.fromisoformat(start_date + 'T00:00:00')
-                if item_date < start_datetime:
-                    continue
-                    
-            if end_date:
-                end_datetime = datetime.fromisoformat(end_date + 'T23:59:59')
-                if item_date > end_datetime:
+            await collection.update_one({"_id": item["_id"]}, {"$set": {date_field: value}})
+            migrated += 1
+    return migrated
+
+def event_counters(event: Optional[dict]) -> dict:
+    """Dashboard counters contributed by a single event document"""
+    if not event:
+        return {}
+    return {
+        "total_events": 1,
+        "open_events": int(event.get("status") == "aperto"),
+        "critical_events": int(event.get("severity") == "critica")
+    }
+
+def inventory_counters(item: Optional[dict]) -> dict:
+    """Dashboard counters contributed by a single inventory document"""
+    if not item:
+        return {}
+    return {
+        "inventory_items": 1,
+        "low_stock": int(item.get("quantity", 0) <= item.get("min_quantity", 0)),
+        "expiring_soon": int(is_expiring_soon(item.get("expiry_date")))
+    }
+
+def counters_delta(before: dict, after: dict) -> dict:
+    return {key: after.get(key, 0) - before.get(key, 0) for key in set(before) | set(after)}
+
+async def increment_dashboard_counters(deltas: dict):
+    """Apply counter deltas to the materialized dashboard document"""
+    deltas = {key: value for key, value in deltas.items() if value}
+    if deltas:
+        await db.dashboard_counters.update_one(
+            {"_id": DASHBOARD_COUNTERS_ID},
+            {"$inc": deltas},
+            upsert=True
+        )
+
+class LogWriter:
+    """Buffers operational log entries and writes them with insert_many on size or time thresholds.
+    
+    The buffer holds at most `max_buffer` entries: once full, writers wait for a flush (and get its
+    error while the database is unreachable), and failed batches beyond the limit are dropped.
+    """
+    
+    def __init__(self, batch_size: int = 500, flush_interval: float = 1.0, max_buffer: int = 50000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max(max_buffer, batch_size)
+        self.buffer = []
+        self.lock = asyncio.Lock()
+        self.wakeup = asyncio.Event()
+        self.written = 0
+        self.flushes = 0
+        self.failures = 0
+        self.retried = 0
+        self.dropped = 0
+    
+    async def write(self, log_data: dict, durable: bool = False):
+        """Queue an entry; a durable write returns only once the entry is in the database"""
+        if len(self.buffer) >= self.max_buffer:
+            # Backpressure: the database is not keeping up, so the caller waits for (or fails with) a flush
+            await self.flush()
+        self.buffer.append(log_data)
+        if durable:
+            await self.flush()
+        elif len(self.buffer) >= self.batch_size:
+            self.wakeup.set()
+    
+    async def flush(self) -> int:
+        """Write every buffered entry in one batch; entries are put back if the write fails"""
+        async with self.lock:
+            batch, self.buffer = self.buffer, []
+            if not batch:
+                return 0
+            try:
+                await db.logs.insert_many(batch, ordered=False)
+            except BulkWriteError as e:
+                # A retried batch may be partly stored already: duplicate ids count as written
+                if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                    self.requeue(batch)
+                    raise
+            except Exception:
+                self.requeue(batch)
+                raise
+            self.written += len(batch)
+            self.flushes += 1
+        await increment_dashboard_counters({"total_logs": len(batch)})
+        await bump_data_version("logs")
+        return len(batch)
+    
+    def requeue(self, batch: list):
+        """Put a failed batch back in front of the buffer, dropping the oldest entries beyond max_buffer"""
+        self.failures += 1
+        self.retried += len(batch)
+        self.buffer[:0] = batch
+        overflow = len(self.buffer) - self.max_buffer
+        if overflow > 0:
+            del self.buffer[:overflow]
+            self.dropped += overflow
+            print(f"⚠️ Buffer log pieno: {overflow} voci scartate")
+    
+    async def run(self):
+        """Flush every `flush_interval` seconds, or as soon as a full batch is buffered, until cancelled"""
+        while True:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"⚠️ Errore scrittura log: {str(e)}")
+    
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self.buffer),
+            "written": self.written,
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "retried": self.retried,
+            "dropped": self.dropped,
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+            "max_buffer": self.max_buffer
+        }
+
+log_writer = LogWriter(
+    batch_size=int(os.environ.get('LOG_WRITER_BATCH_SIZE', 500)),
+    flush_interval=float(os.environ.get('LOG_WRITER_FLUSH_INTERVAL', 1.0)),
+    max_buffer=int(os.environ.get('LOG_WRITER_MAX_BUFFER', 50000))
+)
+
+async def insert_log(log_data: dict, durable: Optional[bool] = None):
+    """Queue an operational log entry for the batched writer.
+    
+    High-priority entries are flushed before returning unless `durable` says otherwise.
+    """
+    if durable is None:
+        durable = log_data.get("priority") == "alta"
+    await log_writer.write(log_data, durable)
+
+# Operational log archive: db.logs keeps a hot window of recent months, older months are moved
+# to one gzipped NDJSON file per month (newest first) and catalogued in db.log_archives
+LOG_HOT_MONTHS = int(os.environ.get('LOG_HOT_MONTHS', 3))
+LOG_ARCHIVE_DIR = os.environ.get('LOG_ARCHIVE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'log_archive'))
+LOG_ARCHIVE_INTERVAL = float(os.environ.get('LOG_ARCHIVE_INTERVAL', 86400))
+LOG_ARCHIVE_DELETE_BATCH_SIZE = 1000
+
+def month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+def add_months(value: datetime, months: int) -> datetime:
+    """Shift a first-of-month datetime by a number of months"""
+    month_index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=month_index // 12, month=month_index % 12 + 1)
+
+def hot_logs_start() -> datetime:
+    """Logs older than this belong to archived months"""
+    return add_months(month_start(datetime.now()), -(max(LOG_HOT_MONTHS, 1) - 1))
+
+def log_sort_key(log: dict):
+    return (log["timestamp"], log.get("id") or "")
+
+def write_log_archive(path: str, logs):
+    """Write logs, already sorted newest first, to a gzipped NDJSON file; returns the count (blocking).
+    
+    The file is written and synced under a temporary name, then renamed over `path`, so a crash
+    leaves either the previous archive or the complete new one.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    count = 0
+    try:
+        with open(temp_path, 'wb') as raw:
+            with gzip.open(raw, 'wt', encoding='utf-8') as archive:
+                for log in logs:
+                    archive.write(json.dumps(log, default=export_default, ensure_ascii=False) + "\n")
+                    count += 1
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return count
+
+def read_log_archive(path: str):
+    """Yield archived logs in file order, newest first (blocking)"""
+    with gzip.open(path, 'rt', encoding='utf-8') as archive:
+        for line in archive:
+            log = json.loads(line)
+            log["timestamp"] = datetime.fromisoformat(log["timestamp"])
+            yield log
+
+def log_matches(log: dict, query: dict) -> bool:
+    """Evaluate a logs query (equality filters plus a timestamp range) against an archived log"""
+    for field, condition in query.items():
+        if field == "timestamp":
+            timestamp = log["timestamp"]
+            if "$gte" in condition and timestamp < condition["$gte"]:
+                return False
+            if "$lte" in condition and timestamp > condition["$lte"]:
+                return False
+        elif log.get(field) != condition:
+            return False
+    return True
+
+def log_archive_filter(query: dict) -> dict:
+    """Catalog filter selecting archived months that overlap the query's timestamp range"""
+    date_range = query.get("timestamp", {})
+    archive_filter = {}
+    if "$gte" in date_range:
+        archive_filter["end"] = {"$gt": date_range["$gte"]}
+    if "$lte" in date_range:
+        archive_filter["start"] = {"$lte": date_range["$lte"]}
+    return archive_filter
+
+async def find_log_archives(query: dict, direction: int = -1) -> list:
+    return await db.log_archives.find(log_archive_filter(query)).sort("start", direction).to_list(None)
+
+def iter_archived_logs(archives: list, query: dict, direction: int = -1, after: Optional[dict] = None):
+    """Yield archived logs matching `query` in (timestamp, id) order, resuming after a keyset position (blocking)"""
+    after_key = log_sort_key(after) if after else None
+    for archive in archives:
+        # A whole month on the wrong side of the cursor can be skipped unread
+        if after_key and direction < 0 and archive["start"] > after_key[0]:
+            continue
+        if after_key and direction > 0 and archive["end"] <= after_key[0]:
+            continue
+        
+        logs = read_log_archive(archive["path"])
+        if direction > 0:
+            logs = reversed(list(logs))
+        for log in logs:
+            if after_key:
+                key = log_sort_key(log)
+                if (direction < 0 and key >= after_key) or (direction > 0 and key <= after_key):
                     continue
-                    
-            filtered_data.append(item)
-        except (ValueError, TypeError) as e:
-            # Skip items with invalid dates
-            print(f"Skipping item with invalid date: {item_date_str}, error: {e}")
+            if log_matches(log, query):
+                yield log
+
+def take_archived_logs(archives: list, query: dict, direction: int, after: Optional[dict], limit: int) -> list:
+    return list(itertools.islice(iter_archived_logs(archives, query, direction, after), limit))
+
+async def archived_logs_count() -> int:
+    result = await db.log_archives.aggregate([{"$group": {"_id": None, "count": {"$sum": "$count"}}}]).to_list(None)
+    return result[0]["count"] if result else 0
+
+async def count_logs(query: dict) -> int:
+    """Number of logs matching `query`, hot and archived"""
+    total = await db.logs.count_documents(query)
+    if not query:
+        return total + await archived_logs_count()
+    archives = await find_log_archives(query)
+    return total + await asyncio.to_thread(lambda: sum(1 for _ in iter_archived_logs(archives, query)))
+
+async def archive_old_logs() -> int:
+    """Move every month older than the hot window from db.logs to its archive file"""
+    cutoff = hot_logs_start()
+    archived = 0
+    while True:
+        oldest = await db.logs.find_one({"timestamp": {"$lt": cutoff}}, {"timestamp": 1}, sort=[("timestamp", 1)])
+        if oldest is None:
+            return archived
+        
+        start = month_start(oldest["timestamp"])
+        end = add_months(start, 1)
+        month_range = {"timestamp": {"$gte": start, "$lt": end}}
+        month = start.strftime('%Y-%m')
+        path = os.path.join(LOG_ARCHIVE_DIR, current_database_name, f"logs_{month}.ndjson.gz")
+        
+        logs = await db.logs.find(month_range, {"_id": 0}).sort([("timestamp", -1), ("id", -1)]).to_list(None)
+        archived_ids = [log["id"] for log in logs]
+        existing = await db.log_archives.find_one({"_id": month})
+        if existing:
+            # Late entries for an already archived month (or a retry after a crash): merge by id
+            def merge():
+                merged = {log["id"]: log for log in read_log_archive(existing["path"])}
+                merged.update((log["id"], log) for log in logs)
+                return sorted(merged.values(), key=log_sort_key, reverse=True)
+            logs = await asyncio.to_thread(merge)
+        
+        count = await asyncio.to_thread(write_log_archive, path, logs)
+        await db.log_archives.update_one(
+            {"_id": month},
+            {"$set": {"start": start, "end": end, "path": path, "count": count, "archived_at": datetime.now()}},
+            upsert=True
+        )
+        # Only the entries read above are in the file: anything that reached the month since
+        # (a late batched flush, a client-supplied timestamp) stays for the next pass
+        for start_index in range(0, len(archived_ids), LOG_ARCHIVE_DELETE_BATCH_SIZE):
+            chunk = archived_ids[start_index:start_index + LOG_ARCHIVE_DELETE_BATCH_SIZE]
+            result = await db.logs.delete_many({"id": {"$in": chunk}, **month_range})
+            archived += result.deleted_count
+        print(f"🗄️ Log di {month} archiviati: {count} voci in {path}")
+
+# Stock ledger: append-only record of every quantity/location change, plus periodic per-item
+# snapshots so that stock at any instant is a snapshot plus at most one interval of movements.
+# Every write that changes stock also increments the item's stock_sequence; ledger entries and
+# snapshots carry it, so a movement already reflected in a snapshot is never replayed on top of it.
+STOCK_SNAPSHOT_INTERVAL = float(os.environ.get('STOCK_SNAPSHOT_INTERVAL', 86400))
+STOCK_SNAPSHOT_BATCH_SIZE = 1000
+
+def stock_movement(item: dict, quantity_change: int, reason: str, username: str, source: str) -> dict:
+    """Ledger entry for a change to `item`, which must already hold the resulting quantity, location and sequence"""
+    return {
+        "id": str(uuid.uuid4()),
+        "timestamp": datetime.now(),
+        "item_id": item["id"],
+        "sequence": item.get("stock_sequence"),
+        "item_name": item.get("name"),
+        "unit": item.get("unit"),
+        "location": item.get("location"),
+        "quantity_change": quantity_change,
+        "quantity_after": item.get("quantity", 0),
+        "reason": reason,
+        "source": source,
+        "operator": username
+    }
+
+async def take_stock_snapshot() -> int:
+    """Store the current quantity, location and sequence of every item under one snapshot time.
+    
+    The scan is not a point-in-time read: `taken_at` is its start, and the per-item sequence tells
+    stock_at which later movements the snapshot already contains.
+    """
+    taken_at = datetime.now()
+    count = 0
+    batch = []
+    projection = {"_id": 0, "id": 1, "name": 1, "unit": 1, "location": 1, "quantity": 1, "stock_sequence": 1}
+    async for item in db.inventory.find({}, projection):
+        batch.append({
+            "taken_at": taken_at,
+            "item_id": item["id"],
+            "sequence": item.get("stock_sequence", 0),
+            "item_name": item.get("name"),
+            "unit": item.get("unit"),
+            "location": item.get("location"),
+            "quantity": item.get("quantity", 0)
+        })
+        if len(batch) == STOCK_SNAPSHOT_BATCH_SIZE:
+            await db.stock_snapshots.insert_many(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        await db.stock_snapshots.insert_many(batch)
+        count += len(batch)
+    await db.stock_snapshot_runs.insert_one({"taken_at": taken_at, "items": count})
+    return count
+
+async def stock_at(timestamp: datetime, item_id: Optional[str] = None, location: Optional[str] = None) -> dict:
+    """Reconstruct item stock at `timestamp` from the latest snapshot before it plus later movements"""
+    snapshot = await db.stock_snapshot_runs.find_one({"taken_at": {"$lte": timestamp}}, sort=[("taken_at", -1)])
+    if snapshot is None:
+        # Items may predate the ledger: without a baseline snapshot their stock is unknown
+        first = await db.stock_snapshot_runs.find_one({}, sort=[("taken_at", 1)])
+        detail = "Nessuno snapshot delle giacenze disponibile"
+        if first:
+            detail = f"Giacenze ricostruibili solo dal {first['taken_at'].strftime('%d/%m/%Y %H:%M')}"
+        raise HTTPException(status_code=400, detail=detail)
+    snapshot_at = snapshot["taken_at"]
+    
+    item_filter = {"item_id": item_id} if item_id else {}
+    state = {}
+    snapshot_sequences = {}
+    async for entry in db.stock_snapshots.find({"taken_at": snapshot_at, **item_filter}, {"_id": 0, "taken_at": 0}):
+        snapshot_sequences[entry["item_id"]] = entry.pop("sequence", None)
+        state[entry["item_id"]] = entry
+    
+    movements = 0
+    async for movement in db.stock_movements.find(
+        {"timestamp": {"$gt": snapshot_at, "$lte": timestamp}, **item_filter}, {"_id": 0}
+    ).sort([("timestamp", 1), ("id", 1)]):
+        # Committed while the snapshot scan was running and already counted in it
+        sequence, snapshot_sequence = movement.get("sequence"), snapshot_sequences.get(movement["item_id"])
+        if sequence is not None and snapshot_sequence is not None and sequence <= snapshot_sequence:
+            continue
+        movements += 1
+        if movement["source"] == "eliminazione":
+            state.pop(movement["item_id"], None)
             continue
+        entry = state.setdefault(movement["item_id"], {"item_id": movement["item_id"], "quantity": 0})
+        entry["quantity"] += movement["quantity_change"]
+        entry.update(item_name=movement["item_name"], unit=movement["unit"], location=movement["location"])
     
-    return filtered_data
+    items = sorted(
+        (entry for entry in state.values() if not location or entry.get("location") == location),
+        key=lambda entry: (entry.get("item_name") or "", entry["item_id"])
+    )
+    totals = {}
+    for entry in items:
+        totals[entry.get("unit") or ""] = totals.get(entry.get("unit") or "", 0) + entry["quantity"]
+    return {
+        "timestamp": timestamp,
+        "snapshot_at": snapshot_at,
+        "movements_applied": movements,
+        "items": items,
+        "totals_by_unit": totals
+    }
+
+# Background jobs started at startup and cancelled at shutdown
+background_tasks = []
 
 # Initialize admin user and database
 @app.on_event("startup")
@@ -788,52 +1725,118 @@ async def startup_event():
     try:
         # Test database connection
         print("📊 Connessione al database MongoDB...")
-        db.command('ping')
+        await db.command('ping')
         print("✅ Connessione MongoDB stabilita con successo")
         
+        # Batched operational log writer
+        background_tasks.append(asyncio.create_task(log_writer.run()))
+        
         # Initialize collections with indexes for better performance
         print("🗂️ Inizializzazione collezioni database...")
         
         # Create indexes for better performance
         try:
             # Events collection indexes
-            db.events.create_index([("created_at", -1)])
-            db.events.create_index([("status", 1)])
-            db.events.create_index([("severity", 1)])
-            db.events.create_index([("event_type", 1)])
-            db.events.create_index([("latitude", 1), ("longitude", 1)])
+            await db.events.create_index([("created_at", -1)])
+            await db.events.create_index([("created_at", -1), ("id", -1)])
+            await db.events.create_index([("status", 1)])
+            await db.events.create_index([("severity", 1)])
+            await db.events.create_index([("event_type", 1)])
+            await db.events.create_index([("location", "2dsphere")])
+            # Planar index for viewport boxes; 2d bounds exclude the max, widened to keep longitude 180
+            await db.events.create_index([("location.coordinates", "2d")], min=-180.0, max=180.000001)
             
             # Users collection indexes
-            db.users.create_index([("username", 1)], unique=True)
-            db.users.create_index([("email", 1)], unique=True)
-            db.users.create_index([("role", 1)])
+            await db.users.create_index([("username", 1)], unique=True)
+            await db.users.create_index([("email", 1)], unique=True)
+            await db.users.create_index([("role", 1)])
             
             # Inventory collection indexes
-            db.inventory.create_index([("name", 1)])
-            db.inventory.create_index([("category", 1)])
-            db.inventory.create_index([("location", 1)])
-            db.inventory.create_index([("expiry_date", 1)])
+            await db.inventory.create_index([("id", 1)], unique=True)
+            await db.inventory.create_index([("name", 1), ("id", 1)])
+            await db.inventory.create_index(
+                [("name", "text"), ("supplier", "text"), ("notes", "text")],
+                name="inventory_text", default_language="italian"
+            )
+            await db.inventory.create_index([("category", 1)])
+            await db.inventory.create_index([("location", 1)])
+            await db.inventory.create_index([("expiry_date", 1)])
+            await db.inventory.create_index(
+                [("low_stock", 1)] + [(field, 1) for field in INVENTORY_ALERT_FIELDS if field != "id"] + [("id", 1)],
+                name="inventory_low_stock_alerts", partialFilterExpression={"low_stock": True}
+            )
             
             # Logs collection indexes
-            db.logs.create_index([("timestamp", -1)])
-            db.logs.create_index([("operator", 1)])
-            db.logs.create_index([("priority", 1)])
+            await db.logs.create_index([("timestamp", -1)])
+            await db.logs.create_index([("timestamp", -1), ("id", -1)])
+            await db.logs.create_index([("operator", 1), ("timestamp", -1), ("id", -1)])
+            await db.logs.create_index([("priority", 1), ("timestamp", -1), ("id", -1)])
+            await db.logs.create_index([("event_id", 1), ("timestamp", -1), ("id", -1)])
+            await db.log_archives.create_index([("start", -1)])
+            
+            # Stock ledger and snapshot indexes
+            await db.stock_movements.create_index([("timestamp", 1), ("id", 1)])
+            await db.stock_movements.create_index([("item_id", 1), ("timestamp", -1), ("id", -1)])
+            await db.stock_snapshots.create_index([("taken_at", 1), ("item_id", 1)])
+            await db.stock_snapshot_runs.create_index([("taken_at", -1)])
             
             # Resources collection indexes
-            db.resources.create_index([("full_name", 1)])
-            db.resources.create_index([("role", 1)])
-            db.resources.create_index([("availability", 1)])
+            await db.resources.create_index([("full_name", 1)])
+            await db.resources.create_index([("role", 1)])
+            await db.resources.create_index([("availability", 1)])
             
             # Role permissions collection indexes
-            db.role_permissions.create_index([("role", 1)], unique=True)
+            await db.role_permissions.create_index([("role", 1)], unique=True)
+            
+            # Report jobs collection indexes
+            await db.report_jobs.create_index([("id", 1)], unique=True)
+            await db.report_jobs.create_index([("download_token", 1)])
+            await db.report_jobs.create_index([("expires_at", 1)])
             
             print("✅ Indici database creati con successo")
         except Exception as e:
             print(f"⚠️ Avviso indici database: {str(e)}")
         
+        # Backfill GeoJSON points for events created before the 2dsphere index
+        try:
+            result = await db.events.update_many(
+                {
+                    "location": {"$exists": False},
+                    "latitude": {"$type": "number"},
+                    "longitude": {"$type": "number"}
+                },
+                [{"$set": {"location": {"type": "Point", "coordinates": ["$longitude", "$latitude"]}}}]
+            )
+            if result.modified_count:
+                print(f"✅ Posizione GeoJSON aggiunta a {result.modified_count} eventi")
+        except Exception as e:
+            print(f"⚠️ Avviso migrazione posizioni eventi: {str(e)}")
+        
+        # Normalize legacy string expiry dates to BSON dates
+        try:
+            migrated = await migrate_expiry_dates()
+            if migrated:
+                print(f"✅ Date di scadenza normalizzate per {migrated} articoli")
+        except Exception as e:
+            print(f"⚠️ Avviso migrazione date di scadenza: {str(e)}")
+        
+        # Normalize legacy string event/log dates to BSON dates
+        try:
+            migrated = await migrate_report_dates()
+            if migrated:
+                for collection_name in REPORT_DATE_FIELDS:
+                    await bump_data_version(collection_name)
+                print(f"✅ Date normalizzate per {migrated} eventi/log")
+        except Exception as e:
+            print(f"⚠️ Avviso migrazione date eventi/log: {str(e)}")
+        
+        # Load role permissions into memory
+        await permission_table.load()
+        print(f"✅ Permessi ruoli caricati (versione {permission_table.version})")
+        
         # Check and create admin user
         print("👤 Verifica utente amministratore...")
-        admin_user = db.users.find_one({"username": "admin"})
+        admin_user = await db.users.find_one({"username": "admin"})
         
         if not admin_user:
             print("🔧 Creazione utente amministratore...")
@@ -847,7 +1850,7 @@ async def startup_event():
                 "created_at": datetime.now(),
                 "created_by": "system"
             }
-            db.users.insert_one(admin_data)
+            await db.users.insert_one(admin_data)
             print("✅ Utente amministratore creato con successo!")
             print("   📧 Username: admin")
             print("   🔑 Password: admin123")
@@ -856,9 +1859,9 @@ async def startup_event():
             print("✅ Utente amministratore già esistente")
         
         # Check if this is a fresh installation
-        total_users = db.users.count_documents({})
-        total_events = db.events.count_documents({})
-        total_inventory = db.inventory.count_documents({})
+        total_users = await db.users.count_documents({})
+        total_events = await db.events.count_documents({})
+        total_inventory = await db.inventory.count_documents({})
         
         is_fresh_install = total_users <= 1 and total_events == 0 and total_inventory == 0
         
@@ -902,9 +1905,9 @@ async def startup_event():
             
             for user_data in sample_users:
                 try:
-                    existing = db.users.find_one({"username": user_data["username"]})
+                    existing = await db.users.find_one({"username": user_data["username"]})
                     if not existing:
-                        db.users.insert_one(user_data)
+                        await db.users.insert_one(user_data)
                         print(f"   ✅ Utente {user_data['username']} ({user_data['role']}) creato")
                 except Exception as e:
                     print(f"   ⚠️ Errore creazione utente {user_data['username']}: {str(e)}")
@@ -993,7 +1996,7 @@ async def startup_event():
             
             for item in sample_inventory:
                 try:
-                    db.inventory.insert_one(item)
+                    await db.inventory.insert_one(item)
                     print(f"   ✅ Articolo '{item['name']}' aggiunto all'inventario")
                 except Exception as e:
                     print(f"   ⚠️ Errore creazione articolo: {str(e)}")
@@ -1038,7 +2041,7 @@ async def startup_event():
             
             for resource in sample_resources:
                 try:
-                    db.resources.insert_one(resource)
+                    await db.resources.insert_one(resource)
                     print(f"   ✅ Risorsa '{resource['full_name']}' aggiunta")
                 except Exception as e:
                     print(f"   ⚠️ Errore creazione risorsa: {str(e)}")
@@ -1052,7 +2055,7 @@ async def startup_event():
                 "details": "Sistema di gestione emergenze inizializzato con successo. Database configurato, utenti creati, inventario e risorse di esempio aggiunti.",
                 "priority": "normale"
             }
-            db.logs.insert_one(initial_log)
+            await insert_log(initial_log)
             print("✅ Log inizializzazione sistema creato")
             
             print("\n🎉 Inizializzazione completata con successo!")
@@ -1082,7 +2085,7 @@ async def startup_event():
         ]
         
         for event_type in default_event_types:
-            existing = db.event_types.find_one({"name": event_type["name"]})
+            existing = await db.event_types.find_one({"name": event_type["name"]})
             if not existing:
                 event_type_data = {
                     "id": str(uuid.uuid4()),
@@ -1092,7 +2095,7 @@ async def startup_event():
                     "created_at": datetime.now(),
                     "created_by": "system"
                 }
-                db.event_types.insert_one(event_type_data)
+                await db.event_types.insert_one(event_type_data)
                 print(f"   ✅ Tipo evento '{event_type['name']}' creato")
         
         # Default inventory categories
@@ -1110,7 +2113,7 @@ async def startup_event():
         ]
         
         for category in default_inventory_categories:
-            existing = db.inventory_categories.find_one({"name": category["name"]})
+            existing = await db.inventory_categories.find_one({"name": category["name"]})
             if not existing:
                 category_data = {
                     "id": str(uuid.uuid4()),
@@ -1120,26 +2123,66 @@ async def startup_event():
                     "created_at": datetime.now(),
                     "created_by": "system"
                 }
-                db.inventory_categories.insert_one(category_data)
+                await db.inventory_categories.insert_one(category_data)
                 print(f"   ✅ Categoria inventario '{category['name']}' creata")
         
         # Create indexes for new collections
         try:
-            db.event_types.create_index([("name", 1)], unique=True)
-            db.inventory_categories.create_index([("name", 1)], unique=True)
+            await db.event_types.create_index([("name", 1)], unique=True)
+            await db.inventory_categories.create_index([("name", 1)], unique=True)
             print("✅ Indici collezioni categorie creati")
         except Exception as e:
             print(f"⚠️ Avviso indici categorie: {str(e)}")
         
+        # Inventory alert state: backfill every item (before the counters below are rebuilt from it),
+        # then move expiry buckets on at each midnight
+        refreshed = await refresh_inventory_alerts(full=True)
+        if refreshed:
+            print(f"✅ Stato avvisi aggiornato per {refreshed} articoli")
+        background_tasks.append(asyncio.create_task(
+            run_daily_at_midnight(refresh_inventory_alerts, "avvisi inventario")
+        ))
+        
+        # Materialized dashboard counters: rebuild now, then repair drift periodically
+        await reconcile_dashboard_counters()
+        background_tasks.append(asyncio.create_task(
+            run_periodically(DASHBOARD_RECONCILE_INTERVAL, reconcile_dashboard_counters, "contatori dashboard")
+        ))
+        print("✅ Contatori dashboard riconciliati")
+        
+        # Background report jobs: fail those cut short by a restart, expire old files
+        os.makedirs(REPORT_JOBS_DIR, exist_ok=True)
+        report_cache.load()
+        interrupted = await fail_interrupted_report_jobs()
+        if interrupted:
+            print(f"⚠️ {interrupted} report in background interrotti dal riavvio")
+        background_tasks.append(asyncio.create_task(
+            run_periodically(REPORT_JOB_CLEANUP_INTERVAL, cleanup_report_jobs, "pulizia report")
+        ))
+        
+        # Stock ledger: baseline snapshot on first start, then one per interval
+        if await db.stock_snapshot_runs.count_documents({}, limit=1) == 0:
+            snapshot_items = await take_stock_snapshot()
+            print(f"✅ Snapshot iniziale giacenze: {snapshot_items} articoli")
+        background_tasks.append(asyncio.create_task(
+            run_periodically(STOCK_SNAPSHOT_INTERVAL, take_stock_snapshot, "snapshot giacenze")
+        ))
+        
+        # Operational logs: keep LOG_HOT_MONTHS in the collection, archive older months to disk
+        os.makedirs(os.path.join(LOG_ARCHIVE_DIR, current_database_name), exist_ok=True)
+        background_tasks.append(asyncio.create_task(
+            run_periodically(LOG_ARCHIVE_INTERVAL, archive_old_logs, "archiviazione log")
+        ))
+        
         # Final system status
         print(f"\n📊 STATO SISTEMA:")
-        print(f"   👥 Utenti registrati: {db.users.count_documents({})}")
-        print(f"   🚨 Eventi di emergenza: {db.events.count_documents({})}")
-        print(f"   📦 Articoli inventario: {db.inventory.count_documents({})}")
-        print(f"   👷 Risorse formate: {db.resources.count_documents({})}")
-        print(f"   📝 Log operativi: {db.logs.count_documents({})}")
-        print(f"   🏷️ Tipi evento: {db.event_types.count_documents({})}")
-        print(f"   🗂️ Categorie inventario: {db.inventory_categories.count_documents({})}")
+        print(f"   👥 Utenti registrati: {await db.users.count_documents({})}")
+        print(f"   🚨 Eventi di emergenza: {await db.events.count_documents({})}")
+        print(f"   📦 Articoli inventario: {await db.inventory.count_documents({})}")
+        print(f"   👷 Risorse formate: {await db.resources.count_documents({})}")
+        print(f"   📝 Log operativi: {await db.logs.count_documents({})}")
+        print(f"   🏷️ Tipi evento: {await db.event_types.count_documents({})}")
+        print(f"   🗂️ Categorie inventario: {await db.inventory_categories.count_documents({})}")
         
         print("\n✅ === SISTEMA GESTIONE EMERGENZE PRONTO ===")
         print("🌐 Accedi all'interfaccia web per iniziare!")
@@ -1149,14 +2192,28 @@ async def startup_event():
         print("⚠️ Il sistema potrebbe non funzionare correttamente")
         raise e
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background jobs and write out buffered log entries"""
+    await log_writer.flush()
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    background_tasks.clear()
+    # Entries queued by requests that finished while the jobs were stopping
+    await log_writer.flush()
+    
+    if report_job_pool is not None:
+        report_job_pool.shutdown(wait=False, cancel_futures=True)
+
 # Authentication endpoints
 @app.post("/api/auth/register")
 async def register(user: UserCreate):
     # Check if user exists
-    if db.users.find_one({"username": user.username}):
+    if await db.users.find_one({"username": user.username}):
         raise HTTPException(status_code=400, detail="Username già esistente")
     
-    if db.users.find_one({"email": user.email}):
+    if await db.users.find_one({"email": user.email}):
         raise HTTPException(status_code=400, detail="Email già registrata")
     
     # Validate role
@@ -1173,12 +2230,12 @@ async def register(user: UserCreate):
         "created_at": datetime.now()
     }
     
-    db.users.insert_one(user_data)
+    await db.users.insert_one(user_data)
     return {"message": "Utente registrato con successo"}
 
 @app.post("/api/auth/login")
 async def login(user: UserLogin):
-    db_user = db.users.find_one({"username": user.username})
+    db_user = await db.users.find_one({"username": user.username})
     
     if not db_user or not verify_password(user.password, db_user["password"]):
         raise HTTPException(status_code=401, detail="Credenziali non valide")
@@ -1212,28 +2269,93 @@ async def create_emergency_event(event: EmergencyEvent, current_user: dict = Dep
     
     event_data = event.dict()
     event_data["created_by"] = current_user["username"]
+    event_data["location"] = event_location(event.latitude, event.longitude)
     
-    result = db.events.insert_one(event_data)
+    result = await db.events.insert_one(event_data)
+    await increment_dashboard_counters(event_counters(event_data))
+    await bump_data_version("events")
     return {"message": "Evento creato con successo", "event_id": event.id}
 
 @app.get("/api/events")
-async def get_emergency_events(current_user: dict = Depends(get_current_user)):
-    events = list(db.events.find({}, {"_id": 0}).sort("created_at", -1))
-    return events
+async def get_emergency_events(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    status: Optional[str] = None,
+    severity: Optional[str] = None,
+    event_type: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    include_total: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get a page of events, newest first, using keyset pagination on (created_at, id)"""
+    query = {}
+    if status:
+        query["status"] = status
+    if severity:
+        query["severity"] = severity
+    if event_type:
+        query["event_type"] = event_type
+    
+    date_range = build_date_range(start_date, end_date)
+    if date_range:
+        query["created_at"] = date_range
+    
+    page_query = query
+    if cursor:
+        page_query = {"$and": [query, keyset_condition("created_at", decode_cursor(cursor))]}
+    
+    # Fetch one extra document to know whether another page exists
+    events = await db.events.find(page_query, {"_id": 0, "location": 0}).sort(
+        [("created_at", -1), ("id", -1)]
+    ).limit(limit + 1).to_list(None)
+    
+    has_more = len(events) > limit
+    events = events[:limit]
+    
+    next_cursor = None
+    if has_more:
+        last_event = events[-1]
+        next_cursor = encode_cursor({"created_at": last_event["created_at"], "id": last_event["id"]})
+    
+    page = {
+        "events": events,
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+        "limit": limit
+    }
+    if include_total:
+        page["total"] = await db.events.count_documents(query)
+    
+    return page
 
 @app.get("/api/events/map")
 async def get_map_events(
     status: Optional[str] = None,
     event_type: Optional[str] = None,
     severity: Optional[str] = None,
+    bbox: Optional[str] = None,
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: Optional[float] = Query(None, gt=0, le=2000),
+    cluster: bool = False,
+    zoom: Optional[int] = Query(None, ge=0, le=22),
     current_user: dict = Depends(get_current_user)
 ):
-    """Get events with coordinates for map display"""
-    # Build query for events with coordinates
-    query = {
-        "latitude": {"$exists": True, "$ne": None},
-        "longitude": {"$exists": True, "$ne": None}
-    }
+    """Get events with coordinates for map display, optionally limited to a viewport bbox or a radius around a point.
+    
+    With cluster=true and a zoom level, events are aggregated per grid cell: cells holding
+    more than one event come back as clusters, single-event cells as regular events.
+    """
+    # Build query for events with coordinates
+    query = {"location": {"$ne": None}}
+    
+    if radius_km is not None:
+        if lat is None or lon is None:
+            raise HTTPException(status_code=400, detail="radius_km richiede lat e lon")
+        query["location"] = {"$geoWithin": {"$centerSphere": [[lon, lat], radius_km / EARTH_RADIUS_KM]}}
+    elif bbox:
+        query.update(bbox_query(bbox))
     
     # Apply filters
     if status:
@@ -1251,7 +2373,53 @@ async def get_map_events(
     if severity:
         query["severity"] = severity
     
-    events = list(db.events.find(query, {"_id": 0}).sort("created_at", -1))
+    filters_applied = {
+        "status": status or "active",
+        "event_type": event_type,
+        "severity": severity,
+        "bbox": bbox,
+        "radius_km": radius_km
+    }
+    
+    if cluster:
+        if zoom is None:
+            raise HTTPException(status_code=400, detail="cluster richiede il livello di zoom")
+        
+        # The pipeline keeps at most MAP_CLUSTER_MAX_CELLS cells: the total is counted separately
+        cells, total = await asyncio.gather(
+            db.events.aggregate(build_cluster_pipeline(query, zoom)).to_list(None),
+            db.events.count_documents(query)
+        )
+        clusters = []
+        single_events = []
+        for cell in cells:
+            if cell["count"] == 1:
+                event = cell["event"]
+                event["latitude"] = float(event["latitude"])
+                event["longitude"] = float(event["longitude"])
+                event.setdefault("address", "")
+                event.setdefault("notes", "")
+                single_events.append(event)
+            else:
+                clusters.append({
+                    "latitude": cell["latitude"],
+                    "longitude": cell["longitude"],
+                    "count": cell["count"],
+                    "severity": {severity_level: cell[severity_level] for severity_level in SEVERITY_LEVELS}
+                })
+        
+        return {
+            "events": single_events,
+            "clusters": clusters,
+            "total": total,
+            "shown": sum(cell["count"] for cell in cells),
+            "zoom": zoom,
+            "cell_size": cluster_cell_size(zoom),
+            "truncated": len(cells) == MAP_CLUSTER_MAX_CELLS,
+            "filters_applied": filters_applied
+        }
+    
+    events = await db.events.find(query, {"_id": 0, "location": 0}).sort("created_at", -1).to_list(None)
     
     # Format events for map display
     map_events = []
@@ -1275,16 +2443,12 @@ async def get_map_events(
     return {
         "events": map_events,
         "total": len(map_events),
-        "filters_applied": {
-            "status": status or "active",
-            "event_type": event_type,
-            "severity": severity
-        }
+        "filters_applied": filters_applied
     }
 
 @app.get("/api/events/{event_id}")
 async def get_emergency_event(event_id: str, current_user: dict = Depends(get_current_user)):
-    event = db.events.find_one({"id": event_id}, {"_id": 0})
+    event = await db.events.find_one({"id": event_id}, {"_id": 0, "location": 0})
     if not event:
         raise HTTPException(status_code=404, detail="Evento non trovato")
     return event
@@ -1292,11 +2456,11 @@ async def get_emergency_event(event_id: str, current_user: dict = Depends(get_cu
 @app.put("/api/events/{event_id}")
 async def update_emergency_event(event_id: str, event_update: EventUpdate, current_user: dict = Depends(get_current_user)):
     # Check permissions
-    if not check_permission(current_user["role"], "events.update"):
+    if not await check_permission(current_user["role"], "events.update"):
         raise HTTPException(status_code=403, detail="Permessi insufficienti")
     
     # Get existing event
-    existing_event = db.events.find_one({"id": event_id})
+    existing_event = await db.events.find_one({"id": event_id})
     if not existing_event:
         raise HTTPException(status_code=404, detail="Evento non trovato")
     
@@ -1323,14 +2487,30 @@ async def update_emergency_event(event_id: str, event_update: EventUpdate, curre
     if event_update.notes is not None:
         update_data["notes"] = event_update.notes
     
+    # Keep the GeoJSON point in sync with the coordinates
+    if "latitude" in update_data or "longitude" in update_data:
+        update_data["location"] = event_location(
+            update_data.get("latitude", existing_event.get("latitude")),
+            update_data.get("longitude", existing_event.get("longitude"))
+        )
+    
     # Add metadata
     update_data["updated_at"] = datetime.now()
     update_data["updated_by"] = current_user["username"]
     
     # Update event
-    result = db.events.update_one({"id": event_id}, {"$set": update_data})
-    if result.matched_count == 0:
+    previous_event = await db.events.find_one_and_update(
+        {"id": event_id},
+        {"$set": update_data},
+        return_document=ReturnDocument.BEFORE
+    )
+    if previous_event is None:
         raise HTTPException(status_code=404, detail="Evento non trovato")
+    await increment_dashboard_counters(counters_delta(
+        event_counters(previous_event),
+        event_counters({**previous_event, **update_data})
+    ))
+    await bump_data_version("events")
     
     # Create log entry
     log_data = {
@@ -1342,25 +2522,27 @@ async def update_emergency_event(event_id: str, event_update: EventUpdate, curre
         "event_id": event_id,
         "priority": "normale"
     }
-    db.logs.insert_one(log_data)
+    await insert_log(log_data)
     
     return {"message": "Evento aggiornato con successo"}
 
 @app.delete("/api/events/{event_id}")
 async def delete_emergency_event(event_id: str, current_user: dict = Depends(get_current_user)):
     # Check permissions
-    if not check_permission(current_user["role"], "events.delete"):
+    if not await check_permission(current_user["role"], "events.delete"):
         raise HTTPException(status_code=403, detail="Permessi insufficienti")
     
     # Get event details for logging
-    event = db.events.find_one({"id": event_id})
+    event = await db.events.find_one({"id": event_id})
     if not event:
         raise HTTPException(status_code=404, detail="Evento non trovato")
     
     # Delete event
-    result = db.events.delete_one({"id": event_id})
-    if result.deleted_count == 0:
+    deleted_event = await db.events.find_one_and_delete({"id": event_id})
+    if deleted_event is None:
         raise HTTPException(status_code=404, detail="Evento non trovato")
+    await increment_dashboard_counters(counters_delta(event_counters(deleted_event), {}))
+    await bump_data_version("events")
     
     # Create log entry
     log_data = {
@@ -1371,7 +2553,7 @@ async def delete_emergency_event(event_id: str, current_user: dict = Depends(get
         "details": f"Evento eliminato dal sistema. ID: {event_id}",
         "priority": "alta"
     }
-    db.logs.insert_one(log_data)
+    await insert_log(log_data)
     
     return {"message": "Evento eliminato con successo"}
 
@@ -1379,7 +2561,7 @@ async def delete_emergency_event(event_id: str, current_user: dict = Depends(get
 @app.get("/api/admin/permissions")
 async def get_all_permissions(current_user: dict = Depends(get_current_user)):
     """Get all available permissions and current role assignments"""
-    if not check_permission(current_user["role"], "permissions.manage"):
+    if not await check_permission(current_user["role"], "permissions.manage"):
         raise HTTPException(status_code=403, detail="Solo gli amministratori possono gestire i permessi")
     
     # Get all available permissions
@@ -1393,13 +2575,10 @@ async def get_all_permissions(current_user: dict = Depends(get_current_user)):
     ]
     
     # Get current role permissions
+    await permission_table.refresh_if_stale()
     current_permissions = {}
     for role in USER_ROLES.keys():
-        role_perms = db.role_permissions.find_one({"role": role})
-        if role_perms:
-            current_permissions[role] = role_perms["permissions"]
-        else:
-            current_permissions[role] = DEFAULT_PERMISSIONS.get(role, [])
+        current_permissions[role] = sorted(permission_table.get(role))
     
     return {
         "all_permissions": all_permissions,
@@ -1410,7 +2589,7 @@ async def get_all_permissions(current_user: dict = Depends(get_current_user)):
 @app.post("/api/admin/permissions/{role}")
 async def update_role_permissions(role: str, permissions: RolePermissions, current_user: dict = Depends(get_current_user)):
     """Update permissions for a specific role"""
-    if not check_permission(current_user["role"], "permissions.manage"):
+    if not await check_permission(current_user["role"], "permissions.manage"):
         raise HTTPException(status_code=403, detail="Solo gli amministratori possono gestire i permessi")
     
     if role not in USER_ROLES:
@@ -1425,12 +2604,16 @@ async def update_role_permissions(role: str, permissions: RolePermissions, curre
         "updated_by": current_user["username"]
     }
     
-    result = db.role_permissions.update_one(
+    result = await db.role_permissions.update_one(
         {"role": role}, 
         {"$set": permission_data}, 
         upsert=True
     )
     
+    # Publish the change to every worker and reload this one immediately
+    await bump_data_version("role_permissions")
+    await permission_table.load()
+    
     # Create log entry
     log_data = {
         "id": str(uuid.uuid4()),
@@ -1440,20 +2623,20 @@ async def update_role_permissions(role: str, permissions: RolePermissions, curre
         "details": f"Permessi modificati per il ruolo {role}. Nuovi permessi: {', '.join(permissions.permissions)}",
         "priority": "alta"
     }
-    db.logs.insert_one(log_data)
+    await insert_log(log_data)
     
     return {"message": f"Permessi per il ruolo {role} aggiornati con successo"}
 
 @app.get("/api/admin/permissions/{role}")
 async def get_role_permissions(role: str, current_user: dict = Depends(get_current_user)):
     """Get permissions for a specific role"""
-    if not check_permission(current_user["role"], "permissions.manage"):
+    if not await check_permission(current_user["role"], "permissions.manage"):
         raise HTTPException(status_code=403, detail="Solo gli amministratori possono gestire i permessi")
     
     if role not in USER_ROLES:
         raise HTTPException(status_code=400, detail="Ruolo non valido")
     
-    role_perms = db.role_permissions.find_one({"role": role}, {"_id": 0})
+    role_perms = await db.role_permissions.find_one({"role": role}, {"_id": 0})
     if not role_perms:
         # Return default permissions if none found
         role_perms = {
@@ -1472,8 +2655,16 @@ async def create_inventory_item(item: InventoryItem, current_user: dict = Depend
         raise HTTPException(status_code=403, detail="Permessi insufficienti")
     
     item_data = item.dict()
+    item_data["expiry_date"] = normalize_expiry_date(item_data["expiry_date"])
     item_data["last_updated_by"] = current_user["username"]
-    result = db.inventory.insert_one(item_data)
+    item_data["stock_sequence"] = 1
+    item_data.update(inventory_alert_state(item_data))
+    result = await db.inventory.insert_one(item_data)
+    await db.stock_movements.insert_one(
+        stock_movement(item_data, item_data["quantity"], "Nuovo articolo", current_user["username"], "creazione")
+    )
+    await increment_dashboard_counters(inventory_counters(item_data))
+    await bump_data_version("inventory")
     return {"message": "Articolo creato con successo", "item_id": item.id}
 
 @app.get("/api/inventory")
@@ -1492,48 +2683,25 @@ async def get_inventory(
         query["location"] = location
     if low_stock:
         # Items below minimum quantity
-        query["$expr"] = {"$lt": ["$quantity", "$min_quantity"]}
-    
-    items = list(db.inventory.find(query, {"_id": 0}).sort("name", 1))
-    
-    # Filter expiring items if requested
+        query["low_stock"] = True
     if expiring_soon:
-        today = datetime.now()
-        thirty_days = today + timedelta(days=30)
-        items = [item for item in items if item.get('expiry_date') and 
-                datetime.fromisoformat(item['expiry_date'].replace('Z', '')) <= thirty_days]
+        query["expiry_date"] = {"$lte": expiry_threshold()}
+    
+    items = await db.inventory.find(query, {"_id": 0}).sort("name", 1).to_list(None)
     
     return items
 @app.get("/api/inventory/alerts")
 async def get_inventory_alerts(current_user: dict = Depends(get_current_user)):
     try:
-        # Get low stock items
-        low_stock_items = list(db.inventory.find({
-            "$expr": {"$lte": ["$quantity", "$min_quantity"]}
-        }, {"_id": 0}))
-        
-        # Get expiring items (next 30 days)
-        today = datetime.now()
-        thirty_days_from_now = today + timedelta(days=30)
-        
-        expiring_items = []
-        all_items = list(db.inventory.find({"expiry_date": {"$exists": True, "$ne": None}}, {"_id": 0}))
+        # Low stock items: a covered query on the partial (low_stock, alert fields) index
+        projection = {"_id": 0, **{field: 1 for field in INVENTORY_ALERT_FIELDS}}
+        low_stock_items = await db.inventory.find({"low_stock": True}, projection).sort("name", 1).to_list(None)
         
-        for item in all_items:
-            expiry_date = item.get('expiry_date')
-            if expiry_date:
-                try:
-                    if isinstance(expiry_date, str):
-                        expiry_date = datetime.fromisoformat(expiry_date.replace('Z', ''))
-                    elif isinstance(expiry_date, datetime):
-                        pass  # Already datetime object
-                    else:
-                        continue
-                    
-                    if expiry_date <= thirty_days_from_now:
-                        expiring_items.append(item)
-                except:
-                    continue
+        # Get expiring items (next 30 days), grouped by their stored days-to-expiry bucket
+        expiring_items = await db.inventory.find(
+            {"expiry_date": {"$lte": expiry_threshold()}},
+            {**projection, "expiry_date": 1, "expiry_bucket": 1}
+        ).sort("expiry_date", 1).to_list(None)
         
         return {
             "low_stock_items": low_stock_items,
@@ -1548,9 +2716,132 @@ async def get_inventory_alerts(current_user: dict = Depends(get_current_user)):
             "error": str(e)
         }
 
+def inventory_filters(category: Optional[str], location: Optional[str], low_stock: Optional[bool], expiring_soon: Optional[bool]) -> dict:
+    """Match stages per inventory filter, keyed by facet name"""
+    filters = {}
+    if category:
+        filters["category"] = {"category": category}
+    if location:
+        filters["location"] = {"location": location}
+    if low_stock:
+        filters["low_stock"] = {"low_stock": True}
+    if expiring_soon:
+        filters["expiring_soon"] = {"expiry_date": {"$lte": expiry_threshold()}}
+    return filters
+
+def combine_filters(filters: dict, exclude: Optional[str] = None) -> dict:
+    clauses = [clause for name, clause in filters.items() if name != exclude]
+    if not clauses:
+        return {}
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+@app.get("/api/inventory/search")
+async def search_inventory(
+    q: Optional[str] = None,
+    category: Optional[str] = None,
+    location: Optional[str] = None,
+    low_stock: Optional[bool] = None,
+    expiring_soon: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: dict = Depends(get_current_user)
+):
+    """A page of items sorted by name plus facet counts, in a single $facet aggregation.
+    
+    `q` is a full-text search over name, supplier and notes. Each facet is counted with every
+    filter except its own, so the counts show what selecting another value would return.
+    """
+    base = {"$text": {"$search": q}} if q and q.strip() else {}
+    filters = inventory_filters(category, location, low_stock, expiring_soon)
+    selected = combine_filters(filters)
+    
+    page_match = selected
+    if cursor:
+        page_match = {"$and": [selected, keyset_condition("name", decode_cursor(cursor), direction=1)]}
+    
+    pipeline = [
+        {"$match": base},
+        {"$facet": {
+            "items": [
+                {"$match": page_match},
+                {"$sort": {"name": 1, "id": 1}},
+                {"$limit": limit + 1},
+                {"$project": {"_id": 0}}
+            ],
+            "total": [{"$match": selected}, {"$count": "n"}],
+            "categories": [
+                {"$match": combine_filters(filters, exclude="category")},
+                {"$group": {"_id": "$category", "count": {"$sum": 1}}},
+                {"$sort": {"_id": 1}}
+            ],
+            "locations": [
+                {"$match": combine_filters(filters, exclude="location")},
+                {"$group": {"_id": "$location", "count": {"$sum": 1}}},
+                {"$sort": {"_id": 1}}
+            ],
+            "low_stock": [
+                {"$match": combine_filters(filters, exclude="low_stock")},
+                {"$match": {"low_stock": True}},
+                {"$count": "n"}
+            ],
+            "expiring_soon": [
+                {"$match": combine_filters(filters, exclude="expiring_soon")},
+                {"$match": {"expiry_date": {"$lte": expiry_threshold()}}},
+                {"$count": "n"}
+            ]
+        }}
+    ]
+    result = await db.inventory.aggregate(pipeline).to_list(None)
+    facets = result[0] if result else {}
+    
+    items = facets.get("items", [])
+    has_more = len(items) > limit
+    items = items[:limit]
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor({"name": items[-1]["name"], "id": items[-1]["id"]})
+    
+    return {
+        "items": items,
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+        "limit": limit,
+        "total": facet_count(facets, "total"),
+        "facets": {
+            "categories": [{"value": entry["_id"], "count": entry["count"]} for entry in facets.get("categories", [])],
+            "locations": [{"value": entry["_id"], "count": entry["count"]} for entry in facets.get("locations", [])],
+            "low_stock": facet_count(facets, "low_stock"),
+            "expiring_soon": facet_count(facets, "expiring_soon")
+        }
+    }
+
+# Registered before /api/inventory/{item_id}, which would otherwise match these paths
+@app.get("/api/inventory/categories")
+async def get_inventory_categories(current_user: dict = Depends(get_current_user)):
+    categories = await db.inventory.distinct("category")
+    return {"categories": categories}
+
+@app.get("/api/inventory/locations")
+async def get_inventory_locations(current_user: dict = Depends(get_current_user)):
+    locations = await db.inventory.distinct("location")
+    return {"locations": locations}
+
+@app.get("/api/inventory/stock-at")
+async def get_stock_at(
+    timestamp: str,
+    location: Optional[str] = None,
+    item_id: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Stock per item (optionally of one location or item) as it was at `timestamp`"""
+    at = normalize_datetime(timestamp)
+    if at is None:
+        raise HTTPException(status_code=400, detail="Data non valida")
+    return await stock_at(at, item_id=item_id, location=location)
+
 @app.get("/api/inventory/{item_id}")
 async def get_inventory_item(item_id: str, current_user: dict = Depends(get_current_user)):
-    item = db.inventory.find_one({"id": item_id}, {"_id": 0})
+    item = await db.inventory.find_one({"id": item_id}, {"_id": 0})
     if not item:
         raise HTTPException(status_code=404, detail="Articolo non trovato")
     return item
@@ -1564,12 +2855,30 @@ async def update_inventory_item(item_id: str, item: InventoryItem, current_user:
         raise HTTPException(status_code=403, detail="Permessi insufficienti")
     
     item_data = item.dict()
+    item_data["expiry_date"] = normalize_expiry_date(item_data["expiry_date"])
     item_data["updated_at"] = datetime.now()
     item_data["last_updated_by"] = current_user["username"]
+    item_data.update(inventory_alert_state(item_data))
     
-    result = db.inventory.update_one({"id": item_id}, {"$set": item_data})
-    if result.matched_count == 0:
+    previous_item = await db.inventory.find_one_and_update(
+        {"id": item_id},
+        {"$set": item_data, "$inc": {"stock_sequence": 1}},
+        return_document=ReturnDocument.BEFORE
+    )
+    if previous_item is None:
         raise HTTPException(status_code=404, detail="Articolo non trovato")
+    quantity_change = item_data["quantity"] - previous_item.get("quantity", 0)
+    if quantity_change or item_data["location"] != previous_item.get("location"):
+        stock_sequence = previous_item.get("stock_sequence", 0) + 1
+        await db.stock_movements.insert_one(stock_movement(
+            {**item_data, "id": item_id, "stock_sequence": stock_sequence},
+            quantity_change, "Modifica articolo", current_user["username"], "modifica"
+        ))
+    await increment_dashboard_counters(counters_delta(
+        inventory_counters(previous_item),
+        inventory_counters({**previous_item, **item_data})
+    ))
+    await bump_data_version("inventory")
     
     return {"message": "Articolo aggiornato con successo"}
 
@@ -1579,39 +2888,57 @@ async def delete_inventory_item(item_id: str, current_user: dict = Depends(get_c
     if current_user["role"] not in ["admin", "coordinator"]:
         raise HTTPException(status_code=403, detail="Permessi insufficienti")
     
-    result = db.inventory.delete_one({"id": item_id})
-    if result.deleted_count == 0:
+    deleted_item = await db.inventory.find_one_and_delete({"id": item_id})
+    if deleted_item is None:
         raise HTTPException(status_code=404, detail="Articolo non trovato")
+    await db.stock_movements.insert_one(stock_movement(
+        {**deleted_item, "quantity": 0, "stock_sequence": deleted_item.get("stock_sequence", 0) + 1},
+        -deleted_item.get("quantity", 0), "Articolo eliminato", current_user["username"], "eliminazione"
+    ))
+    await increment_dashboard_counters(counters_delta(inventory_counters(deleted_item), {}))
+    await bump_data_version("inventory")
     
     return {"message": "Articolo eliminato con successo"}
 
-@app.post("/api/inventory/{item_id}/update-quantity")
-async def update_inventory_quantity(item_id: str, update: InventoryUpdate, current_user: dict = Depends(get_current_user)):
-    # Check permissions
-    if current_user["role"] not in ["admin", "coordinator", "warehouse"]:
-        raise HTTPException(status_code=403, detail="Permessi insufficienti")
+async def apply_quantity_change(item_id: str, update: InventoryUpdate, username: str) -> dict:
+    """Apply a stock movement with one conditional increment and return the updated item.
     
-    # Get current item
-    item = db.inventory.find_one({"id": item_id})
-    if not item:
-        raise HTTPException(status_code=404, detail="Articolo non trovato")
-    
-    # Calculate new quantity
-    new_quantity = item["quantity"] + update.quantity_change
-    if new_quantity < 0:
-        raise HTTPException(status_code=400, detail="La quantità non può essere negativa")
+    The non-negative guard is part of the filter, so concurrent movements on the same item
+    can neither lose updates nor drive the quantity below zero. The update is a pipeline so
+    the alert fields are recomputed from the new quantity in the same write.
+    """
+    query = {"id": item_id}
+    if update.quantity_change < 0:
+        query["quantity"] = {"$gte": -update.quantity_change}
     
-    # Update item
     update_data = {
-        "quantity": new_quantity,
         "updated_at": datetime.now(),
-        "last_updated_by": current_user["username"]
+        "last_updated_by": username
     }
-    
     if update.location:
         update_data["location"] = update.location
     
-    db.inventory.update_one({"id": item_id}, {"$set": update_data})
+    item = await db.inventory.find_one_and_update(
+        query,
+        quantity_update_pipeline(update.quantity_change, update_data),
+        return_document=ReturnDocument.AFTER
+    )
+    if item is None:
+        # Either the item does not exist or the guard rejected the movement
+        if await db.inventory.count_documents({"id": item_id}, limit=1) == 0:
+            raise HTTPException(status_code=404, detail="Articolo non trovato")
+        raise HTTPException(status_code=400, detail="La quantità non può essere negativa")
+    return item
+
+@app.post("/api/inventory/{item_id}/update-quantity")
+async def update_inventory_quantity(item_id: str, update: InventoryUpdate, current_user: dict = Depends(get_current_user)):
+    # Check permissions
+    if current_user["role"] not in ["admin", "coordinator", "warehouse"]:
+        raise HTTPException(status_code=403, detail="Permessi insufficienti")
+    
+    item = await apply_quantity_change(item_id, update, current_user["username"])
+    new_quantity = item["quantity"]
+    previous_quantity = new_quantity - update.quantity_change
     
     # Log the change
     log_data = {
@@ -1619,28 +2946,186 @@ async def update_inventory_quantity(item_id: str, update: InventoryUpdate, curre
         "timestamp": datetime.now(),
         "operator": current_user["username"],
         "action": f"Aggiornamento inventario: {item['name']}",
-        "details": f"{update.reason}. Quantità: {item['quantity']} → {new_quantity} ({'+' if update.quantity_change > 0 else ''}{update.quantity_change})",
+        "details": f"{update.reason}. Quantità: {previous_quantity} → {new_quantity} ({'+' if update.quantity_change > 0 else ''}{update.quantity_change})",
         "priority": "normale"
     }
-    db.logs.insert_one(log_data)
+    
+    # The follow-up writes are independent of each other: one round-trip instead of four
+    await asyncio.gather(
+        db.stock_movements.insert_one(
+            stock_movement(item, update.quantity_change, update.reason, current_user["username"], "movimento")
+        ),
+        increment_dashboard_counters(counters_delta(
+            inventory_counters({**item, "quantity": previous_quantity}),
+            inventory_counters(item)
+        )),
+        bump_data_version("inventory"),
+        insert_log(log_data)
+    )
     
     return {"message": "Quantità aggiornata con successo", "new_quantity": new_quantity}
 
-@app.get("/api/inventory/categories")
-async def get_inventory_categories(current_user: dict = Depends(get_current_user)):
-    categories = db.inventory.distinct("category")
-    return {"categories": categories}
+@app.get("/api/inventory/{item_id}/movements")
+async def get_stock_movements(
+    item_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: dict = Depends(get_current_user)
+):
+    """Ledger of an item's quantity and location changes, newest first, with keyset pagination"""
+    query = {"item_id": item_id}
+    if cursor:
+        query = {"$and": [query, keyset_condition("timestamp", decode_cursor(cursor))]}
+    
+    movements = await db.stock_movements.find(query, {"_id": 0}).sort(
+        [("timestamp", -1), ("id", -1)]
+    ).limit(limit + 1).to_list(None)
+    
+    has_more = len(movements) > limit
+    movements = movements[:limit]
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor({"timestamp": movements[-1]["timestamp"], "id": movements[-1]["id"]})
+    return {"movements": movements, "next_cursor": next_cursor, "has_more": has_more, "limit": limit}
 
-@app.get("/api/inventory/locations")
-async def get_inventory_locations(current_user: dict = Depends(get_current_user)):
-    locations = db.inventory.distinct("location")
-    return {"locations": locations}
+def plan_movements(movements: List[InventoryMovement], items: dict):
+    """Decide each line against the current stock, in request order.
+    
+    Returns per-line results and, per item, the net change of the accepted lines together with
+    the lowest starting quantity that keeps every accepted line non-negative.
+    """
+    results = []
+    plans = {}
+    for index, movement in enumerate(movements):
+        result = {"index": index, "item_id": movement.item_id, "quantity_change": movement.quantity_change}
+        item = items.get(movement.item_id)
+        if item is None:
+            results.append({**result, "status": 404, "detail": "Articolo non trovato"})
+            continue
+        
+        plan = plans.setdefault(movement.item_id, {"lines": [], "net": 0, "required": 0, "location": None})
+        running = item["quantity"] + plan["net"] + movement.quantity_change
+        if running < 0:
+            results.append({**result, "status": 400, "detail": "La quantità non può essere negativa"})
+            continue
+        
+        plan["lines"].append(index)
+        plan["net"] += movement.quantity_change
+        plan["required"] = max(plan["required"], -plan["net"])
+        if movement.location:
+            plan["location"] = movement.location
+        results.append({**result, "status": 200, "new_quantity": running})
+    return results, plans
+
+@app.post("/api/inventory/movements:batch")
+async def batch_inventory_movements(batch: InventoryMovementBatch, current_user: dict = Depends(get_current_user)):
+    """Apply many stock movements in one request.
+    
+    Lines on the same item are folded into one guarded update, and the items are written
+    concurrently. Each write returns the stock it applied to, so quantities reported per line
+    are exact. Items whose stock changed concurrently so that the guard no longer holds are
+    replayed line by line.
+    """
+    if current_user["role"] not in ["admin", "coordinator", "warehouse"]:
+        raise HTTPException(status_code=403, detail="Permessi insufficienti")
+    
+    item_ids = list({movement.item_id for movement in batch.movements})
+    items = {
+        item["id"]: item
+        for item in await db.inventory.find({"id": {"$in": item_ids}}, {"_id": 0}).to_list(None)
+    }
+    results, plans = plan_movements(batch.movements, items)
+    
+    now = datetime.now()
+    
+    async def apply_plan(item_id: str, plan: dict) -> Optional[dict]:
+        update_data = {"updated_at": now, "last_updated_by": current_user["username"]}
+        if plan["location"]:
+            update_data["location"] = plan["location"]
+        return await db.inventory.find_one_and_update(
+            {"id": item_id, "quantity": {"$gte": plan["required"]}},
+            quantity_update_pipeline(plan["net"], update_data),
+            projection={"_id": 0},
+            return_document=ReturnDocument.BEFORE
+        )
+    
+    planned_ids = list(plans)
+    previous_items = await asyncio.gather(*(apply_plan(item_id, plans[item_id]) for item_id in planned_ids))
+    
+    counter_deltas = {}
+    ledger = []
+    
+    def record(index: int, before: dict, after: dict):
+        """Report one applied line from the stock just before and just after it"""
+        movement = batch.movements[index]
+        results[index]["new_quantity"] = after["quantity"]
+        ledger.append(stock_movement(after, movement.quantity_change, movement.reason, current_user["username"], "movimento"))
+        for key, value in counters_delta(inventory_counters(before), inventory_counters(after)).items():
+            counter_deltas[key] = counter_deltas.get(key, 0) + value
+    
+    conflicts = []
+    for item_id, previous_item in zip(planned_ids, previous_items):
+        if previous_item is None:
+            # Deleted, or the stock dropped below what the lines need: replay them one by one
+            conflicts.append(item_id)
+            continue
+        # The lines were applied as one write on top of `previous_item`: walk them in order
+        state = previous_item
+        stock_sequence = previous_item.get("stock_sequence", 0) + 1
+        for index in plans[item_id]["lines"]:
+            movement = batch.movements[index]
+            after = {**state, "quantity": state["quantity"] + movement.quantity_change, "stock_sequence": stock_sequence}
+            if movement.location:
+                after["location"] = movement.location
+            record(index, state, after)
+            state = after
+    
+    for item_id in conflicts:
+        for index in plans[item_id]["lines"]:
+            movement = batch.movements[index]
+            try:
+                item = await apply_quantity_change(item_id, movement, current_user["username"])
+            except HTTPException as e:
+                results[index].update({"status": e.status_code, "detail": e.detail})
+                results[index].pop("new_quantity", None)
+                continue
+            record(index, {**item, "quantity": item["quantity"] - movement.quantity_change}, item)
+    
+    applied = [result for result in results if result["status"] == 200]
+    if applied:
+        # One grouped log entry for the whole batch
+        names = {item_id: item["name"] for item_id, item in items.items()}
+        lines = [
+            f"{names[result['item_id']]}: {'+' if result['quantity_change'] > 0 else ''}{result['quantity_change']} → {result['new_quantity']}"
+            for result in applied
+        ]
+        log_data = {
+            "id": str(uuid.uuid4()),
+            "timestamp": datetime.now(),
+            "operator": current_user["username"],
+            "action": f"Movimentazione inventario: {len(applied)} movimenti",
+            "details": f"{batch.reason or 'Movimentazione in blocco'}. " + "; ".join(lines),
+            "priority": "normale"
+        }
+        await asyncio.gather(
+            increment_dashboard_counters(counter_deltas),
+            bump_data_version("inventory"),
+            db.stock_movements.insert_many(ledger),
+            insert_log(log_data)
+        )
+    
+    return {
+        "message": f"{len(applied)} movimenti su {len(results)} applicati",
+        "applied": len(applied),
+        "rejected": len(results) - len(applied),
+        "results": results
+    }
 
 # Event Types Management endpoints
 @app.get("/api/event-types")
 async def get_event_types(current_user: dict = Depends(get_current_user)):
     """Get all event types"""
-    event_types = list(db.event_types.find({}, {"_id": 0}).sort("name", 1))
+    event_types = await db.event_types.find({}, {"_id": 0}).sort("name", 1).to_list(None)
     return event_types
 
 @app.post("/api/event-types")
@@ -1650,7 +3135,7 @@ async def create_event_type(event_type: EventTypeCreate, current_user: dict = De
         raise HTTPException(status_code=403, detail="Permessi insufficienti")
     
     # Check if event type already exists
-    existing = db.event_types.find_one({"name": event_type.name.lower()})
+    existing = await db.event_types.find_one({"name": event_type.name.lower()})
     if existing:
         raise HTTPException(status_code=400, detail="Tipo di evento già esistente")
     
@@ -1663,7 +3148,7 @@ async def create_event_type(event_type: EventTypeCreate, current_user: dict = De
         "created_by": current_user["username"]
     }
     
-    db.event_types.insert_one(event_type_data)
+    await db.event_types.insert_one(event_type_data)
     
     # Create log entry
     log_data = {
@@ -1674,7 +3159,7 @@ async def create_event_type(event_type: EventTypeCreate, current_user: dict = De
         "details": f"Nuovo tipo di evento '{event_type.name}' aggiunto al sistema",
         "priority": "normale"
     }
-    db.logs.insert_one(log_data)
+    await insert_log(log_data)
     
     # Return the created event type without datetime objects
     return {"message": "Tipo di evento creato con successo", "event_type": {
@@ -1691,12 +3176,12 @@ async def update_event_type(event_type_id: str, event_type: EventTypeCreate, cur
     if current_user["role"] not in ["admin", "coordinator"]:
         raise HTTPException(status_code=403, detail="Permessi insufficienti")
     
-    existing = db.event_types.find_one({"id": event_type_id})
+    existing = await db.event_types.find_one({"id": event_type_id})
     if not existing:
         raise HTTPException(status_code=404, detail="Tipo di evento non trovato")
     
     # Check if name conflicts with another event type
-    name_conflict = db.event_types.find_one({"name": event_type.name.lower(), "id": {"$ne": event_type_id}})
+    name_conflict = await db.event_types.find_one({"name": event_type.name.lower(), "id": {"$ne": event_type_id}})
     if name_conflict:
         raise HTTPException(status_code=400, detail="Nome tipo di evento già in uso")
     
@@ -1705,7 +3190,7 @@ async def update_event_type(event_type_id: str, event_type: EventTypeCreate, cur
         "description": event_type.description
     }
     
-    db.event_types.update_one({"id": event_type_id}, {"$set": update_data})
+    await db.event_types.update_one({"id": event_type_id}, {"$set": update_data})
     
     # Create log entry
     log_data = {
@@ -1716,7 +3201,7 @@ async def update_event_type(event_type_id: str, event_type: EventTypeCreate, cur
         "details": f"Tipo di evento modificato da '{existing['name']}' a '{event_type.name}'",
         "priority": "normale"
     }
-    db.logs.insert_one(log_data)
+    await insert_log(log_data)
     
     return {"message": "Tipo di evento aggiornato con successo"}
 
@@ -1726,7 +3211,7 @@ async def delete_event_type(event_type_id: str, current_user: dict = Depends(get
     if current_user["role"] not in ["admin", "coordinator"]:
         raise HTTPException(status_code=403, detail="Permessi insufficienti")
     
-    existing = db.event_types.find_one({"id": event_type_id})
+    existing = await db.event_types.find_one({"id": event_type_id})
     if not existing:
         raise HTTPException(status_code=404, detail="Tipo di evento non trovato")
     
@@ -1734,11 +3219,11 @@ async def delete_event_type(event_type_id: str, current_user: dict = Depends(get
         raise HTTPException(status_code=400, detail="Impossibile eliminare un tipo di evento predefinito")
     
     # Check if the event type is in use
-    events_using_type = db.events.count_documents({"event_type": existing["name"]})
+    events_using_type = await db.events.count_documents({"event_type": existing["name"]})
     if events_using_type > 0:
         raise HTTPException(status_code=400, detail=f"Impossibile eliminare: {events_using_type} eventi utilizzano questo tipo")
     
-    db.event_types.delete_one({"id": event_type_id})
+    await db.event_types.delete_one({"id": event_type_id})
     
     # Create log entry
     log_data = {
@@ -1749,7 +3234,7 @@ async def delete_event_type(event_type_id: str, current_user: dict = Depends(get
         "details": f"Tipo di evento '{existing['name']}' eliminato dal sistema",
         "priority": "alta"
     }
-    db.logs.insert_one(log_data)
+    await insert_log(log_data)
     
     return {"message": "Tipo di evento eliminato con successo"}
 
@@ -1757,7 +3242,7 @@ async def delete_event_type(event_type_id: str, current_user: dict = Depends(get
 @app.get("/api/inventory-categories")
 async def get_inventory_categories(current_user: dict = Depends(get_current_user)):
     """Get all inventory categories"""
-    categories = list(db.inventory_categories.find({}, {"_id": 0}).sort("name", 1))
+    categories = await db.inventory_categories.find({}, {"_id": 0}).sort("name", 1).to_list(None)
     return categories
 
 @app.post("/api/inventory-categories")
@@ -1767,7 +3252,7 @@ async def create_inventory_category(category: InventoryCategoryCreate, current_u
         raise HTTPException(status_code=403, detail="Solo gli amministratori possono gestire le categorie inventario")
     
     # Check if category already exists
-    existing = db.inventory_categories.find_one({"name": category.name.lower()})
+    existing = await db.inventory_categories.find_one({"name": category.name.lower()})
     if existing:
         raise HTTPException(status_code=400, detail="Categoria già esistente")
     
@@ -1780,7 +3265,7 @@ async def create_inventory_category(category: InventoryCategoryCreate, current_u
         "created_by": current_user["username"]
     }
     
-    db.inventory_categories.insert_one(category_data)
+    await db.inventory_categories.insert_one(category_data)
     
     # Create log entry
     log_data = {
@@ -1791,7 +3276,7 @@ async def create_inventory_category(category: InventoryCategoryCreate, current_u
         "details": f"Nuova categoria '{category.name}' aggiunta all'inventario",
         "priority": "normale"
     }
-    db.logs.insert_one(log_data)
+    await insert_log(log_data)
     
     # Return the created category without datetime objects
     return {"message": "Categoria creata con successo", "category": {
@@ -1808,12 +3293,12 @@ async def update_inventory_category(category_id: str, category: InventoryCategor
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Solo gli amministratori possono gestire le categorie inventario")
     
-    existing = db.inventory_categories.find_one({"id": category_id})
+    existing = await db.inventory_categories.find_one({"id": category_id})
     if not existing:
         raise HTTPException(status_code=404, detail="Categoria non trovata")
     
     # Check if name conflicts with another category
-    name_conflict = db.inventory_categories.find_one({"name": category.name.lower(), "id": {"$ne": category_id}})
+    name_conflict = await db.inventory_categories.find_one({"name": category.name.lower(), "id": {"$ne": category_id}})
     if name_conflict:
         raise HTTPException(status_code=400, detail="Nome categoria già in uso")
     
@@ -1823,7 +3308,7 @@ async def update_inventory_category(category_id: str, category: InventoryCategor
         "icon": category.icon or existing.get("icon", "📦")
     }
     
-    db.inventory_categories.update_one({"id": category_id}, {"$set": update_data})
+    await db.inventory_categories.update_one({"id": category_id}, {"$set": update_data})
     
     # Create log entry
     log_data = {
@@ -1834,7 +3319,7 @@ async def update_inventory_category(category_id: str, category: InventoryCategor
         "details": f"Categoria modificata da '{existing['name']}' a '{category.name}'",
         "priority": "normale"
     }
-    db.logs.insert_one(log_data)
+    await insert_log(log_data)
     
     return {"message": "Categoria aggiornata con successo"}
 
@@ -1844,16 +3329,16 @@ async def delete_inventory_category(category_id: str, current_user: dict = Depen
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Solo gli amministratori possono gestire le categorie inventario")
     
-    existing = db.inventory_categories.find_one({"id": category_id})
+    existing = await db.inventory_categories.find_one({"id": category_id})
     if not existing:
         raise HTTPException(status_code=404, detail="Categoria non trovata")
     
     # Check if the category is in use
-    items_using_category = db.inventory.count_documents({"category": existing["name"]})
+    items_using_category = await db.inventory.count_documents({"category": existing["name"]})
     if items_using_category > 0:
         raise HTTPException(status_code=400, detail=f"Impossibile eliminare: {items_using_category} articoli utilizzano questa categoria")
     
-    db.inventory_categories.delete_one({"id": category_id})
+    await db.inventory_categories.delete_one({"id": category_id})
     
     # Create log entry
     log_data = {
@@ -1864,7 +3349,7 @@ async def delete_inventory_category(category_id: str, current_user: dict = Depen
         "details": f"Categoria '{existing['name']}' eliminata dall'inventario",
         "priority": "alta"
     }
-    db.logs.insert_one(log_data)
+    await insert_log(log_data)
     
     return {"message": "Categoria eliminata con successo"}
 
@@ -1880,13 +3365,84 @@ async def create_operational_log(log: OperationalLog, current_user: dict = Depen
     log_data = log.dict()
     log_data["operator"] = current_user["username"]
     
-    result = db.logs.insert_one(log_data)
+    # The entry is what the caller is creating: acknowledge it only once it is stored
+    await insert_log(log_data, durable=True)
     return {"message": "Log creato con successo", "log_id": log.id}
 
 @app.get("/api/logs")
-async def get_operational_logs(current_user: dict = Depends(get_current_user)):
-    logs = list(db.logs.find({}, {"_id": 0}).sort("timestamp", -1).limit(100))
-    return logs
+async def get_operational_logs(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    operator: Optional[str] = None,
+    priority: Optional[str] = None,
+    event_id: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    include_total: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get a page of logs using keyset pagination on (timestamp, id), newest first unless order=asc.
+    
+    Each equality filter is the prefix of a (field, timestamp, id) index, so filtered pages are
+    read straight off the index in sort order. The operator filter is an exact match on the
+    username, like the log report's. Months moved out of the hot window are read from
+    their archive files and merged into the same ordering.
+    """
+    query = {}
+    if operator and operator.strip():
+        query["operator"] = operator.strip()
+    if priority:
+        query["priority"] = priority
+    if event_id:
+        query["event_id"] = event_id
+    
+    date_range = build_date_range(start_date, end_date)
+    if date_range:
+        query["timestamp"] = date_range
+    
+    direction = -1 if order == "desc" else 1
+    page_query = query
+    cursor_values = None
+    if cursor:
+        cursor_values = decode_cursor(cursor)
+        page_query = {"$and": [query, keyset_condition("timestamp", cursor_values, direction)]}
+    
+    # Fetch one extra document to know whether another page exists
+    logs = await db.logs.find(page_query, {"_id": 0}).sort(
+        [("timestamp", direction), ("id", direction)]
+    ).limit(limit + 1).to_list(None)
+    
+    archives = await find_log_archives(query, direction)
+    if len(logs) > limit:
+        # A full hot page only needs the archived months that sort before its last entry
+        boundary = logs[-1]["timestamp"]
+        archives = [
+            archive for archive in archives
+            if (archive["end"] > boundary if direction < 0 else archive["start"] <= boundary)
+        ]
+    if archives:
+        archived = await asyncio.to_thread(take_archived_logs, archives, query, direction, cursor_values, limit + 1)
+        logs = sorted(logs + archived, key=log_sort_key, reverse=direction < 0)[:limit + 1]
+    
+    has_more = len(logs) > limit
+    logs = logs[:limit]
+    
+    next_cursor = None
+    if has_more:
+        last_log = logs[-1]
+        next_cursor = encode_cursor({"timestamp": last_log["timestamp"], "id": last_log["id"]})
+    
+    page = {
+        "logs": logs,
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+        "limit": limit
+    }
+    if include_total:
+        page["total"] = await count_logs(query)
+    
+    return page
 
 # Trained Resources endpoints
 @app.post("/api/resources")
@@ -1896,57 +3452,88 @@ async def create_trained_resource(resource: TrainedResource, current_user: dict
         raise HTTPException(status_code=403, detail="Permessi insufficienti")
     
     resource_data = resource.dict()
-    result = db.resources.insert_one(resource_data)
+    result = await db.resources.insert_one(resource_data)
+    await increment_dashboard_counters({"trained_resources": 1})
     return {"message": "Risorsa creata con successo", "resource_id": resource.id}
 
 @app.get("/api/resources")
 async def get_trained_resources(current_user: dict = Depends(get_current_user)):
-    resources = list(db.resources.find({}, {"_id": 0}).sort("full_name", 1))
+    resources = await db.resources.find({}, {"_id": 0}).sort("full_name", 1).to_list(None)
     return resources
 
 # Dashboard stats endpoint
-@app.get("/api/dashboard/stats")
-async def get_dashboard_stats(current_user: dict = Depends(get_current_user)):
-    total_events = db.events.count_documents({})
-    open_events = db.events.count_documents({"status": "aperto"})
-    critical_events = db.events.count_documents({"severity": "critica"})
-    inventory_items = db.inventory.count_documents({})
-    trained_resources = db.resources.count_documents({})
-    total_logs = db.logs.count_documents({})
-    
-    # Inventory alerts
-    low_stock_count = db.inventory.count_documents({
-        "$expr": {"$lt": ["$quantity", "$min_quantity"]}
-    })
-    
-    # Count expiring items (next 30 days)
-    today = datetime.now()
-    thirty_days_from_now = today + timedelta(days=30)
-    expiring_count = 0
-    
-    try:
-        all_items_with_expiry = list(db.inventory.find({"expiry_date": {"$exists": True, "$ne": None}}, {"expiry_date": 1}))
-        for item in all_items_with_expiry:
-            expiry_date = item.get('expiry_date')
-            if expiry_date:
-                if isinstance(expiry_date, str):
-                    try:
-                        expiry_date = datetime.fromisoformat(expiry_date.replace('Z', ''))
-                    except:
-                        continue
-                
-                if expiry_date <= thirty_days_from_now:
-                    expiring_count += 1
-    except:
-        expiring_count = 0
+
+def facet_count(facet_result: dict, name: str) -> int:
+    """Read a {"$count": "n"} sub-pipeline result out of a $facet document"""
+    counts = facet_result.get(name) or []
+    return counts[0]["n"] if counts else 0
+
+async def compute_dashboard_stats() -> dict:
+    """Compute dashboard counters with one $facet aggregation per collection"""
+    events_pipeline = [{"$facet": {
+        "total": [{"$count": "n"}],
+        "open": [{"$match": {"status": "aperto"}}, {"$count": "n"}],
+        "critical": [{"$match": {"severity": "critica"}}, {"$count": "n"}]
+    }}]
+    
+    # Independent round-trips run concurrently; plain totals come from collection metadata.
+    # Expiry dates are BSON dates, so expiring-soon is a range count on the expiry_date index,
+    # and low stock is a count on the stored flag's partial index.
+    events_facets, inventory_items, low_stock_count, expiring_count, trained_resources, hot_logs, archived_logs = await asyncio.gather(
+        db.events.aggregate(events_pipeline).to_list(None),
+        db.inventory.count_documents({}),
+        db.inventory.count_documents({"low_stock": True}),
+        db.inventory.count_documents({"expiry_date": {"$lte": expiry_threshold()}}),
+        db.resources.estimated_document_count(),
+        db.logs.estimated_document_count(),
+        archived_logs_count()
+    )
+    events_facets = events_facets[0] if events_facets else {}
     
     return {
-        "total_events": total_events,
-        "open_events": open_events,
-        "critical_events": critical_events,
+        "total_events": facet_count(events_facets, "total"),
+        "open_events": facet_count(events_facets, "open"),
+        "critical_events": facet_count(events_facets, "critical"),
         "inventory_items": inventory_items,
         "trained_resources": trained_resources,
-        "total_logs": total_logs,
+        "total_logs": hot_logs + archived_logs,
+        "inventory_alerts": {
+            "low_stock": low_stock_count,
+            "expiring_soon": expiring_count,
+            "total": low_stock_count + expiring_count
+        }
+    }
+
+DASHBOARD_COUNTER_FIELDS = [
+    "total_events", "open_events", "critical_events", "inventory_items",
+    "trained_resources", "total_logs", "low_stock", "expiring_soon"
+]
+
+async def reconcile_dashboard_counters() -> dict:
+    """Recompute the materialized counters from the collections, repairing any drift"""
+    stats = await compute_dashboard_stats()
+    counters = {key: stats[key] for key in DASHBOARD_COUNTER_FIELDS if key in stats}
+    counters["low_stock"] = stats["inventory_alerts"]["low_stock"]
+    counters["expiring_soon"] = stats["inventory_alerts"]["expiring_soon"]
+    counters["reconciled_at"] = datetime.now()
+    
+    await db.dashboard_counters.update_one(
+        {"_id": DASHBOARD_COUNTERS_ID},
+        {"$set": counters},
+        upsert=True
+    )
+    return counters
+
+def dashboard_stats_from_counters(counters: dict) -> dict:
+    low_stock_count = max(counters.get("low_stock", 0), 0)
+    expiring_count = max(counters.get("expiring_soon", 0), 0)
+    return {
+        "total_events": counters.get("total_events", 0),
+        "open_events": counters.get("open_events", 0),
+        "critical_events": counters.get("critical_events", 0),
+        "inventory_items": counters.get("inventory_items", 0),
+        "trained_resources": counters.get("trained_resources", 0),
+        "total_logs": counters.get("total_logs", 0),
         "inventory_alerts": {
             "low_stock": low_stock_count,
             "expiring_soon": expiring_count,
@@ -1954,124 +3541,621 @@ async def get_dashboard_stats(current_user: dict = Depends(get_current_user)):
         }
     }
 
+async def run_periodically(interval: float, job, name: str):
+    """Run an async job every `interval` seconds until cancelled, logging failures"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await job()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ Errore job periodico {name}: {str(e)}")
+
+async def run_daily_at_midnight(job, name: str):
+    """Run an async job at every local midnight until cancelled, logging failures"""
+    while True:
+        now = datetime.now()
+        # A second past midnight, so the job never wakes up early and sees the previous day
+        next_run = now.replace(hour=0, minute=0, second=1, microsecond=0) + timedelta(days=1)
+        await asyncio.sleep((next_run - now).total_seconds())
+        try:
+            await job()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ Errore job giornaliero {name}: {str(e)}")
+
+@app.get("/api/dashboard/stats")
+async def get_dashboard_stats(current_user: dict = Depends(get_current_user)):
+    counters = await db.dashboard_counters.find_one({"_id": DASHBOARD_COUNTERS_ID})
+    # Counters upserted by an increment before the first reconciliation are incomplete
+    if counters is None or "reconciled_at" not in counters:
+        counters = await reconcile_dashboard_counters()
+    return dashboard_stats_from_counters(counters)
+
 @app.get("/api/health")
 async def health_check():
     return {"status": "OK", "service": "Emergency Management System"}
 
-# Report endpoints
-@app.post("/api/reports/generate")
-async def generate_report(report_request: ReportRequest, current_user: dict = Depends(get_current_user)):
-    """Generate and download reports in various formats"""
+# Report pipeline
+REPORT_BATCH_SIZE = int(os.environ.get('REPORT_BATCH_SIZE', 1000))
+REPORT_CHUNK_SIZE = 64 * 1024
+REPORT_SPOOL_MEMORY = 8 * 1024 * 1024  # rendered reports larger than this spill to a temp file
+
+REPORT_FORMATS = {
+    'pdf': ('pdf', 'application/pdf'),
+    'excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'csv': ('csv', 'text/csv; charset=utf-8'),
+    'ndjson': ('ndjson', 'application/x-ndjson'),
+    'parquet': ('parquet', 'application/vnd.apache.parquet')
+}
+REPORT_FILENAME_PREFIXES = {
+    'events': 'report_eventi',
+    'logs': 'report_log',
+    'statistics': 'report_statistiche',
+    'inventory': 'export_inventario',
+    'resources': 'export_risorse'
+}
+# Formats available for each report type
+REPORT_TYPE_FORMATS = {
+    'events': ('pdf', 'excel', 'parquet') + EXPORT_FORMATS,
+    'logs': ('pdf', 'excel', 'parquet') + EXPORT_FORMATS,
+    'statistics': ('pdf', 'excel'),
+    'inventory': ('parquet',) + EXPORT_FORMATS,
+    'resources': EXPORT_FORMATS
+}
+
+def iterate_in_thread(cursor, loop, batch_size: int = REPORT_BATCH_SIZE):
+    """Pull documents from a Motor cursor inside a worker thread, one event-loop round-trip per batch"""
+    while True:
+        batch = asyncio.run_coroutine_threadsafe(cursor.to_list(length=batch_size), loop).result()
+        if not batch:
+            return
+        yield from batch
+
+def read_in_chunks(file, chunk_size: int = REPORT_CHUNK_SIZE):
+    """Yield a rendered report in fixed-size chunks and release the file afterwards"""
     try:
-        # Prepare filters
-        filters = {
-            'start_date': report_request.start_date,
-            'end_date': report_request.end_date,
-            'event_type': report_request.event_type,
-            'severity': report_request.severity,
-            'priority': report_request.priority,
-            'operator': report_request.operator,
-            'status': report_request.status
-        }
-        
-        # Get data based on report type
-        if report_request.report_type == 'events':
-            # Get events data
-            query = {}
-            if report_request.event_type:
-                query['event_type'] = report_request.event_type
-            if report_request.severity:
-                query['severity'] = report_request.severity
-            if report_request.status:
-                query['status'] = report_request.status
-                
-            events_data = list(db.events.find(query, {"_id": 0}).sort("created_at", -1))
-            
-            # Filter by date
-            if report_request.start_date or report_request.end_date:
-                events_data = filter_data_by_date(events_data, report_request.start_date, report_request.end_date)
-            
-            # Generate report
-            if report_request.format == 'pdf':
-                buffer = generate_events_pdf(events_data, filters)
-                filename = f"report_eventi_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf"
-                media_type = 'application/pdf'
-            elif report_request.format == 'excel':
-                buffer = generate_excel_report(events_data, 'events', filters)
-                filename = f"report_eventi_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
-                media_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            else:
-                raise HTTPException(status_code=400, detail="Formato non supportato")
-        
-        elif report_request.report_type == 'logs':
-            # Get logs data
-            query = {}
-            if report_request.priority:
-                query['priority'] = report_request.priority
-            if report_request.operator:
-                query['operator'] = report_request.operator
-                
-            logs_data = list(db.logs.find(query, {"_id": 0}).sort("timestamp", -1))
-            
-            # Filter by date
-            if report_request.start_date or report_request.end_date:
-                logs_data = filter_data_by_date(logs_data, report_request.start_date, report_request.end_date, 'timestamp')
-            
-            # Generate report
-            if report_request.format == 'pdf':
-                buffer = generate_logs_pdf(logs_data, filters)
-                filename = f"report_log_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf"
-                media_type = 'application/pdf'
-            elif report_request.format == 'excel':
-                buffer = generate_excel_report(logs_data, 'logs', filters)
-                filename = f"report_log_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
-                media_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            else:
-                raise HTTPException(status_code=400, detail="Formato non supportato")
-        
-        elif report_request.report_type == 'statistics':
-            # Get statistics data
-            total_events = db.events.count_documents({})
-            open_events = db.events.count_documents({"status": "aperto"})
-            critical_events = db.events.count_documents({"severity": "critica"})
-            inventory_items = db.inventory.count_documents({})
-            trained_resources = db.resources.count_documents({})
-            total_logs = db.logs.count_documents({})
-            
-            stats_data = {
-                "total_events": total_events,
-                "open_events": open_events,
-                "critical_events": critical_events,
-                "inventory_items": inventory_items,
-                "trained_resources": trained_resources,
-                "total_logs": total_logs
-            }
-            
-            # Generate report
-            if report_request.format == 'pdf':
-                buffer = generate_statistics_pdf(stats_data)
-                filename = f"report_statistiche_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf"
-                media_type = 'application/pdf'
-            elif report_request.format == 'excel':
-                buffer = generate_excel_report(stats_data, 'statistics', filters)
-                filename = f"report_statistiche_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
-                media_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        file.seek(0)
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        file.close()
+
+def report_file_info(report_request: ReportRequest):
+    """Filename and media type for a report, validating type and format"""
+    if report_request.report_type not in REPORT_FILENAME_PREFIXES:
+        raise HTTPException(status_code=400, detail="Tipo di report non supportato")
+    if report_request.format not in REPORT_TYPE_FORMATS[report_request.report_type]:
+        raise HTTPException(status_code=400, detail="Formato non supportato")
+    if report_request.format == 'parquet' and pa is None:
+        raise HTTPException(status_code=400, detail="Export parquet non disponibile: pyarrow non installato")
+    
+    extension = report_extension(report_request)
+    media_type = REPORT_FORMATS[report_request.format][1]
+    if report_request.compress and report_request.format in EXPORT_FORMATS:
+        media_type = 'application/gzip'
+    prefix = REPORT_FILENAME_PREFIXES[report_request.report_type]
+    filename = f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M')}.{extension}"
+    return filename, media_type
+
+def report_extension(report_request: ReportRequest) -> str:
+    extension = REPORT_FORMATS[report_request.format][0]
+    if report_request.compress and report_request.format in EXPORT_FORMATS:
+        extension += '.gz'
+    return extension
+
+# Filters that affect the content of each report type
+REPORT_FILTER_FIELDS = {
+    'events': ['start_date', 'end_date', 'event_type', 'severity', 'status'],
+    'logs': ['start_date', 'end_date', 'priority', 'operator'],
+    'statistics': [],
+    'inventory': [],
+    'resources': []
+}
+
+def normalize_report_request(report_request: ReportRequest) -> ReportRequest:
+    """Drop filters that do not apply to the report type and blank values, so equal reports compare equal"""
+    relevant = REPORT_FILTER_FIELDS.get(report_request.report_type, [])
+    normalized = {
+        "report_type": report_request.report_type,
+        "format": report_request.format,
+        "compress": report_request.compress and report_request.format in EXPORT_FORMATS
+    }
+    for field in relevant:
+        value = getattr(report_request, field)
+        if isinstance(value, str):
+            value = value.strip() or None
+        normalized[field] = value
+    return ReportRequest(**normalized)
+
+def report_filters(report_request: ReportRequest) -> dict:
+    """Filters echoed in the report header"""
+    return {
+        'start_date': report_request.start_date,
+        'end_date': report_request.end_date,
+        'event_type': report_request.event_type,
+        'severity': report_request.severity,
+        'priority': report_request.priority,
+        'operator': report_request.operator,
+        'status': report_request.status
+    }
+
+def build_report_query(report_request: ReportRequest):
+    """Collection, query, projection and sort field for a report read from a collection"""
+    if report_request.report_type in ('inventory', 'resources'):
+        return report_request.report_type, {}, {"_id": 0}, 'created_at'
+    
+    if report_request.report_type == 'events':
+        query = {}
+        if report_request.event_type:
+            query['event_type'] = report_request.event_type
+        if report_request.severity:
+            query['severity'] = report_request.severity
+        if report_request.status:
+            query['status'] = report_request.status
+        date_range = build_date_range(report_request.start_date, report_request.end_date)
+        if date_range:
+            query['created_at'] = date_range
+        return 'events', query, {"_id": 0, "location": 0}, 'created_at'
+    
+    query = {}
+    if report_request.priority:
+        query['priority'] = report_request.priority
+    if report_request.operator:
+        query['operator'] = report_request.operator
+    date_range = build_date_range(report_request.start_date, report_request.end_date)
+    if date_range:
+        query['timestamp'] = date_range
+    return 'logs', query, {"_id": 0}, 'timestamp'
+
+async def report_statistics() -> dict:
+    dashboard_stats = await compute_dashboard_stats()
+    return {
+        key: dashboard_stats[key]
+        for key in ["total_events", "open_events", "critical_events", "inventory_items", "trained_resources", "total_logs"]
+    }
+
+def render_report_data(report_request: ReportRequest, data, output, total: Optional[int] = None):
+    """Lay out a report (blocking): `data` is an iterable of documents, or the stats dict for statistics.
+    
+    `total` is the number of documents in `data`, which lets PDF reports lay out rows as they are read.
+    """
+    filters = report_filters(report_request)
+    if report_request.format in EXPORT_FORMATS:
+        generate_export(data, report_request.report_type, report_request.format, output,
+                        compress=report_request.compress, batch_size=REPORT_BATCH_SIZE)
+    elif report_request.format == 'parquet':
+        generate_parquet_export(data, report_request.report_type, output)
+    elif report_request.report_type == 'events':
+        if report_request.format == 'pdf':
+            generate_events_pdf(data, filters, output, total=total)
+        else:
+            generate_excel_report(data, 'events', filters, output)
+    elif report_request.report_type == 'logs':
+        if report_request.format == 'pdf':
+            generate_logs_pdf(data, filters, output, total=total)
+        else:
+            generate_excel_report(data, 'logs', filters, output)
+    elif report_request.report_type == 'statistics':
+        if report_request.format == 'pdf':
+            generate_statistics_pdf(data, output)
+        else:
+            generate_excel_report(data, 'statistics', filters, output)
+
+async def render_report(report_request: ReportRequest, output, stats_data: Optional[dict] = None):
+    """Render a report into the binary file object `output`.
+    
+    Documents are pulled from the cursor in batches by the renderer, which runs in a worker
+    thread so that report layout never blocks the event loop. Log reports continue into the
+    archived months once the hot collection is exhausted. PDF headers show the total, which is
+    counted with the same query up front rather than by holding every row until layout.
+    """
+    total = None
+    if report_request.report_type == 'statistics':
+        data = stats_data if stats_data is not None else await report_statistics()
+    else:
+        collection_name, query, projection, sort_field = build_report_query(report_request)
+        if report_request.format == 'pdf':
+            total = await (count_logs(query) if collection_name == 'logs' else db[collection_name].count_documents(query))
+        cursor = db[collection_name].find(query, projection).sort(sort_field, -1).batch_size(REPORT_BATCH_SIZE)
+        data = iterate_in_thread(cursor, asyncio.get_running_loop())
+        if collection_name == 'logs':
+            data = itertools.chain(data, iter_archived_logs(await find_log_archives(query), query))
+    
+    await asyncio.to_thread(render_report_data, report_request, data, output, total)
+
+# Report cache
+class ReportCache:
+    """Size-bounded LRU of rendered report files on disk, keyed by a content hash of the request and data version"""
+    
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (path, size), least recently used first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+    
+    def load(self):
+        """Index files left by a previous run, oldest access first"""
+        os.makedirs(self.directory, exist_ok=True)
+        self.entries.clear()
+        self.total_bytes = 0
+        files = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith('.') or not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            files.append((stat.st_mtime, name.split('.')[0], path, stat.st_size))
+        for _, key, path, size in sorted(files):
+            self.entries[key] = (path, size)
+            self.total_bytes += size
+        self.evict()
+    
+    def open(self, key: str):
+        """Open a cached report for reading, or return None on a miss"""
+        entry = self.entries.get(key)
+        if entry is not None:
+            path, size = entry
+            try:
+                file = open(path, 'rb')
+            except FileNotFoundError:
+                self.entries.pop(key, None)
+                self.total_bytes -= size
             else:
-                raise HTTPException(status_code=400, detail="Formato non supportato")
-        
+                # Keep the on-disk access order in step for the next load()
+                os.utime(path)
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return file
+        self.misses += 1
+        return None
+    
+    def write_file(self, key: str, extension: str, source) -> tuple:
+        """Copy a rendered report (path or binary file object) into the cache directory; blocking"""
+        path = os.path.join(self.directory, f"{key}.{extension}")
+        temp_path = os.path.join(self.directory, f".{key}.{uuid.uuid4().hex}")
+        if isinstance(source, str):
+            shutil.copyfile(source, temp_path)
         else:
-            raise HTTPException(status_code=400, detail="Tipo di report non supportato")
-        
-        # Return file as streaming response
+            source.seek(0)
+            with open(temp_path, 'wb') as target:
+                shutil.copyfileobj(source, target)
+            source.seek(0)
+        os.replace(temp_path, path)
+        return path, os.path.getsize(path)
+    
+    async def store(self, key: str, extension: str, source):
+        if self.max_bytes <= 0:
+            return
+        path, size = await asyncio.to_thread(self.write_file, key, extension, source)
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.total_bytes -= previous[1]
+        self.entries[key] = (path, size)
+        self.total_bytes += size
+        self.stores += 1
+        self.evict()
+    
+    def evict(self):
+        while self.entries and self.total_bytes > self.max_bytes:
+            _, (path, size) = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "size_bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions
+        }
+
+report_cache = ReportCache(
+    directory=os.environ.get('REPORT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'emergency_report_cache')),
+    max_bytes=int(float(os.environ.get('REPORT_CACHE_MAX_MB', 512)) * 1024 * 1024)
+)
+
+async def report_cache_key(report_request: ReportRequest, stats_data: Optional[dict] = None) -> str:
+    """Hash of what a report's bytes depend on: database, type, format, filters and source data version.
+    
+    Statistics reports are keyed by the figures themselves. The data version is read before the
+    report is rendered, so a write racing with rendering leaves the entry under a stale key.
+    """
+    if report_request.report_type == 'statistics':
+        source = stats_data
+    else:
+        collection_name = build_report_query(report_request)[0]
+        source = await get_data_version(collection_name)
+    
+    payload = {
+        "database": [current_mongo_url, current_database_name],
+        "report_type": report_request.report_type,
+        "format": report_request.format,
+        "compress": report_request.compress,
+        "filters": report_filters(report_request),
+        "source": source
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+async def stream_export(report_request: ReportRequest, collection_name: str, query: dict, projection: dict, sort_field: str):
+    """Stream a CSV/NDJSON export straight from the cursor, one encoded (optionally gzipped) chunk per batch"""
+    columns = REPORT_COLUMNS[report_request.report_type]
+    compressor = zlib.compressobj(wbits=31) if report_request.compress else None  # wbits=31: gzip container
+    cursor = db[collection_name].find(query, projection).sort(sort_field, -1).batch_size(REPORT_BATCH_SIZE)
+    archived = None
+    
+    text = export_header(report_request.format, columns)
+    while True:
+        batch = await cursor.to_list(length=REPORT_BATCH_SIZE) if archived is None else []
+        if not batch and collection_name == 'logs':
+            # Hot logs exhausted: carry on with the archived months, newest first
+            if archived is None:
+                archived = iter_archived_logs(await find_log_archives(query), query)
+            batch = await asyncio.to_thread(list, itertools.islice(archived, REPORT_BATCH_SIZE))
+        if batch:
+            text += export_batch(report_request.format, columns, batch)
+        chunk = text.encode('utf-8')
+        if compressor:
+            chunk = compressor.compress(chunk) + (b"" if batch else compressor.flush())
+        if chunk:
+            yield chunk
+        if not batch:
+            return
+        text = ""
+
+async def build_report_response(report_request: ReportRequest) -> StreamingResponse:
+    """Serve a report from the cache, or render it into a spooled file, cache it and stream it back in chunks.
+    
+    CSV/NDJSON exports skip both: they are encoded batch by batch as the cursor is read.
+    """
+    report_request = normalize_report_request(report_request)
+    filename, media_type = report_file_info(report_request)
+    extension = report_extension(report_request)
+    
+    if report_request.format in EXPORT_FORMATS:
         return StreamingResponse(
-            io.BytesIO(buffer.read()),
+            stream_export(report_request, *build_report_query(report_request)),
             media_type=media_type,
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
+    
+    stats_data = await report_statistics() if report_request.report_type == 'statistics' else None
+    cache_key = await report_cache_key(report_request, stats_data)
+    output = report_cache.open(cache_key)
+    if output is None:
+        output = tempfile.SpooledTemporaryFile(max_size=REPORT_SPOOL_MEMORY)
+        try:
+            await render_report(report_request, output, stats_data)
+            await report_cache.store(cache_key, extension, output)
+        except Exception:
+            output.close()
+            raise
+    
+    return StreamingResponse(
+        read_in_chunks(output),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+# Background report jobs
+REPORT_JOB_WORKERS = int(os.environ.get('REPORT_JOB_WORKERS', 2))
+REPORT_JOBS_DIR = os.environ.get('REPORT_JOBS_DIR', os.path.join(tempfile.gettempdir(), 'emergency_reports'))
+REPORT_JOB_TTL_HOURS = float(os.environ.get('REPORT_JOB_TTL_HOURS', 24))
+REPORT_JOB_CLEANUP_INTERVAL = 3600
+REPORT_JOB_READ_SHARE = 80  # progress percentage covered by reading documents, the rest is layout
+
+report_job_pool = None
+report_job_tasks = set()
+
+def get_report_job_pool() -> ProcessPoolExecutor:
+    """Lazily start the worker processes that lay out queued reports"""
+    global report_job_pool
+    if report_job_pool is None:
+        report_job_pool = ProcessPoolExecutor(
+            max_workers=REPORT_JOB_WORKERS,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return report_job_pool
+
+def track_report_progress(documents, jobs, job_id: str, total_rows: int):
+    """Pass documents through, recording read progress on the job once per batch"""
+    rows = 0
+    for document in documents:
+        rows += 1
+        if rows % REPORT_BATCH_SIZE == 0:
+            jobs.update_one({"id": job_id}, {"$set": {
+                "rows_done": rows,
+                "progress": min(REPORT_JOB_READ_SHARE, rows * REPORT_JOB_READ_SHARE // max(total_rows, 1))
+            }})
+        yield document
+    jobs.update_one({"id": job_id}, {"$set": {"rows_done": rows, "progress": REPORT_JOB_READ_SHARE, "phase": "impaginazione"}})
+
+def run_report_job(job_id: str, report_request_data: dict, stats_data: Optional[dict],
+                   mongo_url: str, database_name: str, output_path: str) -> int:
+    """Render a queued report to `output_path` inside a worker process; returns the file size"""
+    client = MongoClient(mongo_url)
+    try:
+        database = client[database_name]
+        report_request = ReportRequest(**report_request_data)
+        
+        with open(output_path, 'wb') as output:
+            if report_request.report_type == 'statistics':
+                render_report_data(report_request, stats_data, output)
+            else:
+                collection_name, query, projection, sort_field = build_report_query(report_request)
+                collection = database[collection_name]
+                total_rows = collection.count_documents(query)
+                total = total_rows
+                documents = collection.find(query, projection).sort(sort_field, -1).batch_size(REPORT_BATCH_SIZE)
+                if collection_name == 'logs':
+                    archives = list(database.log_archives.find(log_archive_filter(query)).sort("start", -1))
+                    # Archived months are not indexed: their full size bounds the progress estimate
+                    archived_rows = sum(archive["count"] for archive in archives)
+                    total_rows += archived_rows
+                    if query and report_request.format == 'pdf':
+                        # The PDF header shows the exact total
+                        archived_rows = sum(1 for _ in iter_archived_logs(archives, query))
+                    total += archived_rows
+                    documents = itertools.chain(documents, iter_archived_logs(archives, query))
+                database.report_jobs.update_one({"id": job_id}, {"$set": {"total_rows": total_rows, "phase": "lettura"}})
+                
+                render_report_data(report_request, track_report_progress(documents, database.report_jobs, job_id, total_rows), output, total)
+        
+        return os.path.getsize(output_path)
+    finally:
+        client.close()
+
+def report_job_response(job: dict) -> dict:
+    """Public view of a job document: the download token is only exposed once the file is ready"""
+    job = {key: value for key, value in job.items() if key not in ("_id", "file_path")}
+    job_token = job.pop("download_token", None)
+    if job["status"] == "completato" and job_token:
+        job["download_url"] = f"/api/reports/download/{job_token}"
+    return job
+
+async def execute_report_job(job_id: str, report_request: ReportRequest, output_path: str):
+    """Hand a queued job to the process pool and record its outcome"""
+    try:
+        await db.report_jobs.update_one({"id": job_id}, {"$set": {"status": "in_corso", "started_at": datetime.now()}})
+        stats_data = await report_statistics() if report_request.report_type == 'statistics' else None
+        
+        cache_key = await report_cache_key(report_request, stats_data)
+        cached = report_cache.open(cache_key)
+        if cached is not None:
+            with cached, open(output_path, 'wb') as target:
+                await asyncio.to_thread(shutil.copyfileobj, cached, target)
+            size = os.path.getsize(output_path)
+        else:
+            loop = asyncio.get_running_loop()
+            size = await loop.run_in_executor(
+                get_report_job_pool(), run_report_job,
+                job_id, report_request.dict(), stats_data, current_mongo_url, current_database_name, output_path
+            )
+            await report_cache.store(cache_key, report_extension(report_request), output_path)
         
+        completed_at = datetime.now()
+        await db.report_jobs.update_one({"id": job_id}, {"$set": {
+            "status": "completato",
+            "cached": cached is not None,
+            "progress": 100,
+            "phase": "completato",
+            "size": size,
+            "completed_at": completed_at,
+            "expires_at": completed_at + timedelta(hours=REPORT_JOB_TTL_HOURS)
+        }})
+    except Exception as e:
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        await db.report_jobs.update_one({"id": job_id}, {"$set": {
+            "status": "errore",
+            "error": f"Errore durante la generazione del report: {str(e)}",
+            "completed_at": datetime.now(),
+            "expires_at": datetime.now() + timedelta(hours=REPORT_JOB_TTL_HOURS)
+        }})
+
+async def cleanup_report_jobs():
+    """Delete expired jobs together with their files"""
+    async for job in db.report_jobs.find({"expires_at": {"$lt": datetime.now()}}, {"_id": 0, "id": 1, "file_path": 1}):
+        if job.get("file_path") and os.path.exists(job["file_path"]):
+            os.remove(job["file_path"])
+        await db.report_jobs.delete_one({"id": job["id"]})
+
+async def fail_interrupted_report_jobs() -> int:
+    """Jobs queued or running when the server stopped will never finish"""
+    result = await db.report_jobs.update_many(
+        {"status": {"$in": ["in_coda", "in_corso"]}},
+        {"$set": {
+            "status": "errore",
+            "error": "Generazione interrotta dal riavvio del server",
+            "expires_at": datetime.now() + timedelta(hours=REPORT_JOB_TTL_HOURS)
+        }}
+    )
+    return result.modified_count
+
+# Report endpoints
+@app.post("/api/reports/generate")
+async def generate_report(report_request: ReportRequest, current_user: dict = Depends(get_current_user)):
+    """Generate and download reports in various formats"""
+    try:
+        return await build_report_response(report_request)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Errore durante la generazione del report: {str(e)}")
 
+@app.post("/api/reports/jobs")
+async def create_report_job(report_request: ReportRequest, current_user: dict = Depends(get_current_user)):
+    """Queue a report for background generation"""
+    report_request = normalize_report_request(report_request)
+    filename, media_type = report_file_info(report_request)
+    if report_request.report_type != 'statistics':
+        # Reject malformed filters now rather than in the worker
+        build_report_query(report_request)
+    
+    job_id = str(uuid.uuid4())
+    extension = report_extension(report_request)
+    output_path = os.path.join(REPORT_JOBS_DIR, f"{job_id}.{extension}")
+    job = {
+        "id": job_id,
+        "status": "in_coda",
+        "phase": "in_coda",
+        "progress": 0,
+        "rows_done": 0,
+        "total_rows": None,
+        "report_type": report_request.report_type,
+        "format": report_request.format,
+        "compress": report_request.compress,
+        "filters": report_filters(report_request),
+        "filename": filename,
+        "media_type": media_type,
+        "file_path": output_path,
+        "download_token": secrets.token_urlsafe(32),
+        "created_by": current_user["username"],
+        "created_at": datetime.now()
+    }
+    await db.report_jobs.insert_one(job)
+    
+    os.makedirs(REPORT_JOBS_DIR, exist_ok=True)
+    task = asyncio.create_task(execute_report_job(job_id, report_request, output_path))
+    report_job_tasks.add(task)
+    task.add_done_callback(report_job_tasks.discard)
+    
+    return report_job_response(job)
+
+@app.get("/api/reports/jobs/{job_id}")
+async def get_report_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    """Get status and progress of a report job"""
+    job = await db.report_jobs.find_one({"id": job_id})
+    if not job or (job["created_by"] != current_user["username"] and current_user["role"] != "admin"):
+        raise HTTPException(status_code=404, detail="Report non trovato")
+    return report_job_response(job)
+
+@app.get("/api/reports/download/{token}")
+async def download_report(token: str):
+    """Download a finished report; the token in the URL is the credential"""
+    job = await db.report_jobs.find_one({"download_token": token, "status": "completato"})
+    if not job or job["expires_at"] < datetime.now() or not os.path.exists(job["file_path"]):
+        raise HTTPException(status_code=404, detail="Report non trovato o scaduto")
+    return FileResponse(job["file_path"], media_type=job["media_type"], filename=job["filename"])
+
 @app.get("/api/reports/templates")
 async def get_report_templates(current_user: dict = Depends(get_current_user)):
     """Get available report templates and options"""
@@ -2080,19 +4164,31 @@ async def get_report_templates(current_user: dict = Depends(get_current_user)):
             "name": "Report Eventi di Emergenza",
             "description": "Report dettagliato di tutti gli eventi di emergenza",
             "filters": ["start_date", "end_date", "event_type", "severity", "status"],
-            "formats": ["pdf", "excel"]
+            "formats": ["pdf", "excel", "csv", "ndjson", "parquet"]
         },
         "logs": {
             "name": "Report Log Operativi", 
             "description": "Report delle attività operative registrate",
             "filters": ["start_date", "end_date", "priority", "operator"],
-            "formats": ["pdf", "excel"]
+            "formats": ["pdf", "excel", "csv", "ndjson", "parquet"]
         },
         "statistics": {
             "name": "Report Statistiche Generali",
             "description": "Riepilogo statistico del sistema",
             "filters": [],
             "formats": ["pdf", "excel"]
+        },
+        "inventory": {
+            "name": "Export Inventario",
+            "description": "Estrazione completa degli articoli di inventario",
+            "filters": [],
+            "formats": ["csv", "ndjson", "parquet"]
+        },
+        "resources": {
+            "name": "Export Risorse Formate",
+            "description": "Estrazione completa delle risorse formate",
+            "filters": [],
+            "formats": ["csv", "ndjson"]
         }
     }
     
@@ -2102,7 +4198,7 @@ async def get_report_templates(current_user: dict = Depends(get_current_user)):
         "severities": ["bassa", "media", "alta", "critica"],
         "priorities": ["bassa", "normale", "alta"],
         "statuses": ["aperto", "in_corso", "risolto", "chiuso"],
-        "operators": list(set([log.get('operator') for log in db.logs.find({}, {"operator": 1, "_id": 0}) if log.get('operator')]))
+        "operators": [operator for operator in await db.logs.distinct("operator") if operator]
     }
     
     return {
@@ -2117,7 +4213,7 @@ async def get_all_users(current_user: dict = Depends(get_current_user)):
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Solo gli amministratori possono accedere a questa funzione")
     
-    users = list(db.users.find({}, {"_id": 0, "password": 0}).sort("username", 1))
+    users = await db.users.find({}, {"_id": 0, "password": 0}).sort("username", 1).to_list(None)
     return users
 
 @app.post("/api/admin/users")
@@ -2127,10 +4223,10 @@ async def create_user_admin(user: UserManagement, current_user: dict = Depends(g
         raise HTTPException(status_code=403, detail="Solo gli amministratori possono creare utenti")
     
     # Check if user exists
-    if db.users.find_one({"username": user.username}):
+    if await db.users.find_one({"username": user.username}):
         raise HTTPException(status_code=400, detail="Username già esistente")
     
-    if db.users.find_one({"email": user.email}):
+    if await db.users.find_one({"email": user.email}):
         raise HTTPException(status_code=400, detail="Email già registrata")
     
     # Validate role
@@ -2149,7 +4245,7 @@ async def create_user_admin(user: UserManagement, current_user: dict = Depends(g
         "created_by": current_user["username"]
     }
     
-    db.users.insert_one(user_data)
+    await db.users.insert_one(user_data)
     return {"message": "Utente creato con successo"}
 
 @app.put("/api/admin/users/{username}")
@@ -2163,7 +4259,7 @@ async def update_user_admin(username: str, user_update: UserUpdate, current_user
         raise HTTPException(status_code=400, detail="Non puoi modificare il tuo account tramite questa funzione")
     
     # Check if user exists
-    existing_user = db.users.find_one({"username": username})
+    existing_user = await db.users.find_one({"username": username})
     if not existing_user:
         raise HTTPException(status_code=404, detail="Utente non trovato")
     
@@ -2172,7 +4268,7 @@ async def update_user_admin(username: str, user_update: UserUpdate, current_user
     
     if user_update.email is not None:
         # Check if email already exists for another user
-        email_check = db.users.find_one({"email": user_update.email, "username": {"$ne": username}})
+        email_check = await db.users.find_one({"email": user_update.email, "username": {"$ne": username}})
         if email_check:
             raise HTTPException(status_code=400, detail="Email già utilizzata da un altro utente")
         update_data["email"] = user_update.email
@@ -2192,7 +4288,8 @@ async def update_user_admin(username: str, user_update: UserUpdate, current_user
         update_data["password"] = hash_password(user_update.new_password)
     
     # Update user
-    result = db.users.update_one({"username": username}, {"$set": update_data})
+    result = await db.users.update_one({"username": username}, {"$set": update_data})
+    user_cache.invalidate(username)
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Utente non trovato")
     
@@ -2209,14 +4306,15 @@ async def delete_user_admin(username: str, current_user: dict = Depends(get_curr
         raise HTTPException(status_code=400, detail="Non puoi eliminare il tuo account")
     
     # Cannot delete admin users (safety measure)
-    user_to_delete = db.users.find_one({"username": username})
+    user_to_delete = await db.users.find_one({"username": username})
     if not user_to_delete:
         raise HTTPException(status_code=404, detail="Utente non trovato")
     
     if user_to_delete["role"] == "admin":
         raise HTTPException(status_code=400, detail="Non è possibile eliminare account amministratore")
     
-    result = db.users.delete_one({"username": username})
+    result = await db.users.delete_one({"username": username})
+    user_cache.invalidate(username)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Utente non trovato")
     
@@ -2229,14 +4327,14 @@ async def reset_user_password(username: str, current_user: dict = Depends(get_cu
         raise HTTPException(status_code=403, detail="Solo gli amministratori possono resettare password")
     
     # Check if user exists
-    if not db.users.find_one({"username": username}):
+    if not await db.users.find_one({"username": username}):
         raise HTTPException(status_code=404, detail="Utente non trovato")
     
     # Reset password to default
     new_password = "reset123"
     hashed_password = hash_password(new_password)
     
-    db.users.update_one(
+    await db.users.update_one(
         {"username": username},
         {"$set": {
             "password": hashed_password,
@@ -2244,6 +4342,7 @@ async def reset_user_password(username: str, current_user: dict = Depends(get_cu
             "password_reset_by": current_user["username"]
         }}
     )
+    user_cache.invalidate(username)
     
     return {"message": f"Password resettata con successo. Nuova password: {new_password}"}
 
@@ -2254,21 +4353,21 @@ async def get_admin_stats(current_user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="Solo gli amministratori possono accedere a queste statistiche")
     
     # User statistics
-    total_users = db.users.count_documents({})
-    active_users = db.users.count_documents({"active": True})
+    total_users = await db.users.count_documents({})
+    active_users = await db.users.count_documents({"active": True})
     users_by_role = {}
     for role in USER_ROLES.keys():
-        users_by_role[role] = db.users.count_documents({"role": role})
+        users_by_role[role] = await db.users.count_documents({"role": role})
     
     # System statistics
-    total_events = db.events.count_documents({})
-    total_logs = db.logs.count_documents({})
-    total_inventory = db.inventory.count_documents({})
+    total_events = await db.events.count_documents({})
+    total_logs = await db.logs.count_documents({}) + await archived_logs_count()
+    total_inventory = await db.inventory.count_documents({})
     
     # Recent activity (last 7 days)
     seven_days_ago = datetime.now() - timedelta(days=7)
-    recent_events = db.events.count_documents({"created_at": {"$gte": seven_days_ago.isoformat()}})
-    recent_logs = db.logs.count_documents({"timestamp": {"$gte": seven_days_ago.isoformat()}})
+    recent_events = await db.events.count_documents({"created_at": {"$gte": seven_days_ago}})
+    recent_logs = await db.logs.count_documents({"timestamp": {"$gte": seven_days_ago}})
     
     return {
         "users": {
@@ -2288,6 +4387,45 @@ async def get_admin_stats(current_user: dict = Depends(get_current_user)):
         }
     }
 
+@app.get("/api/admin/cache/stats")
+async def get_cache_stats(current_user: dict = Depends(get_current_user)):
+    """Get in-process cache counters for monitoring (admin only)"""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Solo gli amministratori possono accedere a queste statistiche")
+    
+    return {
+        "user_cache": user_cache.stats(),
+        "permission_table": permission_table.stats(),
+        "report_cache": report_cache.stats(),
+        "log_writer": log_writer.stats()
+    }
+
+@app.get("/api/admin/logs/archives")
+async def get_log_archives(current_user: dict = Depends(get_current_user)):
+    """List archived log months and the current hot window (admin only)"""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Solo gli amministratori possono accedere all'archivio dei log")
+    
+    archives = await db.log_archives.find({}, {"path": 0}).sort("start", -1).to_list(None)
+    for archive in archives:
+        archive["month"] = archive.pop("_id")
+    return {
+        "hot_months": LOG_HOT_MONTHS,
+        "hot_since": hot_logs_start(),
+        "hot_logs": await db.logs.estimated_document_count(),
+        "archived_logs": sum(archive["count"] for archive in archives),
+        "archives": archives
+    }
+
+@app.post("/api/admin/logs/archive")
+async def archive_logs_now(current_user: dict = Depends(get_current_user)):
+    """Archive every month older than the hot window right away (admin only)"""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Solo gli amministratori possono archiviare i log")
+    
+    archived = await archive_old_logs()
+    return {"message": f"{archived} log archiviati", "archived": archived}
+
 # Database Management endpoints
 @app.get("/api/admin/database/config")
 async def get_database_config(current_user: dict = Depends(get_current_user)):
@@ -2299,7 +4437,7 @@ async def get_database_config(current_user: dict = Depends(get_current_user)):
         "mongo_url": current_mongo_url,
         "database_name": current_database_name,
         "status": "connected",
-        "collections": db.list_collection_names()
+        "collections": await db.list_collection_names()
     }
 
 @app.post("/api/admin/database/test")
@@ -2308,7 +4446,7 @@ async def test_database_connection_endpoint(config: DatabaseConfig, current_user
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Solo gli amministratori possono testare connessioni database")
     
-    success, message = test_database_connection(config.mongo_url, config.database_name, config.connection_timeout)
+    success, message = await test_database_connection(config.mongo_url, config.database_name, config.connection_timeout)
     
     if success:
         return {"status": "success", "message": message}
@@ -2330,26 +4468,26 @@ async def update_database_config(config: DatabaseConfigUpdate, current_user: dic
         "details": f"Tentativo di cambio database da {current_database_name} a {config.database_name}",
         "priority": "alta"
     }
-    db.logs.insert_one(log_data)
+    await insert_log(log_data)
     
     # Test connection if requested
     if config.test_connection:
-        success, message = test_database_connection(config.mongo_url, config.database_name, config.connection_timeout)
+        success, message = await test_database_connection(config.mongo_url, config.database_name, config.connection_timeout)
         if not success:
             return {"status": "error", "message": f"Test connessione fallito: {message}"}
     
     try:
         # Test if database exists and is accessible
-        test_client = MongoClient(config.mongo_url)
+        test_client = AsyncIOMotorClient(config.mongo_url)
         test_db = test_client[config.database_name]
         
         # Check if database exists (has collections)
-        collections = test_db.list_collection_names()
+        collections = await test_db.list_collection_names()
         database_exists = len(collections) > 0
         
         if not database_exists and config.create_if_not_exists:
             # Initialize new database
-            init_success, init_message = initialize_new_database(test_db)
+            init_success, init_message = await initialize_new_database(test_db)
             if not init_success:
                 test_client.close()
                 return {"status": "error", "message": f"Errore inizializzazione database: {init_message}"}
@@ -2364,12 +4502,12 @@ async def update_database_config(config: DatabaseConfigUpdate, current_user: dic
                 "priority": "alta"
             }
             # Insert into the new database since we may have switched already
-            test_db.logs.insert_one(log_data)
+            await test_db.logs.insert_one(log_data)
         
         test_client.close()
         
         # Switch to new database
-        switch_success, switch_message = switch_database_connection(config.mongo_url, config.database_name)
+        switch_success, switch_message = await switch_database_connection(config.mongo_url, config.database_name)
         if not switch_success:
             return {"status": "error", "message": f"Errore cambio database: {switch_message}"}
         
@@ -2382,7 +4520,7 @@ async def update_database_config(config: DatabaseConfigUpdate, current_user: dic
             "details": f"Sistema ora connesso al database '{config.database_name}'",
             "priority": "alta"
         }
-        db.logs.insert_one(log_data)
+        await insert_log(log_data)
         
         # Update environment variable for persistence (optional)
         os.environ['MONGO_URL'] = config.mongo_url
@@ -2391,7 +4529,7 @@ async def update_database_config(config: DatabaseConfigUpdate, current_user: dic
             "status": "success",
             "message": f"Database aggiornato con successo a: {config.database_name}",
             "database_name": config.database_name,
-            "collections": db.list_collection_names(),
+            "collections": await db.list_collection_names(),
             "created_new": not database_exists
         }
         
@@ -2405,7 +4543,7 @@ async def update_database_config(config: DatabaseConfigUpdate, current_user: dic
             "details": f"Errore durante il cambio database: {str(e)}",
             "priority": "alta"
         }
-        db.logs.insert_one(log_data)
+        await insert_log(log_data)
         
         return {"status": "error", "message": f"Errore durante l'aggiornamento del database: {str(e)}"}
 
@@ -2417,12 +4555,12 @@ async def get_database_status(current_user: dict = Depends(get_current_user)):
     
     try:
         # Get database statistics
-        stats = current_client.admin.command("serverStatus")
+        stats = await current_client.admin.command("serverStatus")
         
         # Get collection statistics
-        collections_stats = {}
-        for collection_name in db.list_collection_names():
-            collections_stats[collection_name] = db[collection_name].count_documents({})
+        collection_names = await db.list_collection_names()
+        counts = await asyncio.gather(*(db[name].count_documents({}) for name in collection_names))
+        collections_stats = dict(zip(collection_names, counts))
         
         return {
             "status": "connected",
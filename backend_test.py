@@ -309,11 +309,49 @@ class EmergencySystemAPITester:
             200
         )
         if success:
-            print(f"Retrieved {len(response)} events")
-            if len(response) > 0:
-                print(f"First event: {json.dumps(response[0], indent=2)}")
-            return response
+            events = response.get("events", [])
+            print(f"Retrieved {len(events)} events (has_more: {response.get('has_more')})")
+            if len(events) > 0:
+                print(f"First event: {json.dumps(events[0], indent=2)}")
+            return events
         return []
+
+    def test_get_events_pagination(self, limit=2):
+        """Test keyset pagination of the events list"""
+        success, first_page = self.run_test(
+            f"Get events first page (limit={limit})",
+            "GET",
+            f"events?limit={limit}&include_total=true",
+            200
+        )
+        if not success:
+            return False
+        
+        if len(first_page["events"]) > limit:
+            print(f"❌ Page returned {len(first_page['events'])} events, limit was {limit}")
+            return False
+        
+        if not first_page.get("next_cursor"):
+            print(f"✅ Single page of {first_page.get('total')} events, nothing more to fetch")
+            return True
+        
+        success, second_page = self.run_test(
+            "Get events second page",
+            "GET",
+            f"events?limit={limit}&cursor={first_page['next_cursor']}",
+            200
+        )
+        if not success:
+            return False
+        
+        first_ids = {event["id"] for event in first_page["events"]}
+        overlap = [event["id"] for event in second_page["events"] if event["id"] in first_ids]
+        if overlap:
+            print(f"❌ Pages overlap on events: {overlap}")
+            return False
+        
+        print(f"✅ Pagination consistent: {len(first_page['events'])} + {len(second_page['events'])} of {first_page['total']} events")
+        return True
         
     def test_get_map_events(self, params=None):
         """Test getting events for map display with optional filters"""
@@ -374,20 +412,60 @@ class EmergencySystemAPITester:
         )
         return success
         
-    def test_get_logs(self):
+    def test_get_logs(self, params=None):
         """Test getting operational logs"""
+        endpoint = "logs"
+        if params:
+            endpoint += "?" + "&".join(f"{key}={value}" for key, value in params.items())
         success, response = self.run_test(
             "Get operational logs",
             "GET",
-            "logs",
+            endpoint,
             200
         )
         if success:
-            print(f"Retrieved {len(response)} operational logs")
-            if len(response) > 0:
-                print(f"First log: {json.dumps(response[0], indent=2)}")
-            return response
+            logs = response["logs"]
+            print(f"Retrieved {len(logs)} operational logs (has_more: {response['has_more']})")
+            if len(logs) > 0:
+                print(f"First log: {json.dumps(logs[0], indent=2)}")
+            return logs
         return []
+    
+    def test_get_logs_pagination(self, limit=2):
+        """Test keyset pagination and filtering of the logs list"""
+        success, first_page = self.run_test(
+            f"Get logs first page (limit={limit})",
+            "GET",
+            f"logs?limit={limit}&include_total=true",
+            200
+        )
+        if not success:
+            return False
+        
+        if first_page.get("next_cursor"):
+            success, second_page = self.run_test(
+                "Get logs second page",
+                "GET",
+                f"logs?limit={limit}&cursor={first_page['next_cursor']}",
+                200
+            )
+            if not success:
+                return False
+            
+            first_ids = {log["id"] for log in first_page["logs"]}
+            overlap = [log["id"] for log in second_page["logs"] if log["id"] in first_ids]
+            if overlap:
+                print(f"❌ Pages overlap on logs: {overlap}")
+                return False
+        
+        filtered = self.test_get_logs({"priority": "alta", "limit": 20})
+        mismatched = [log["id"] for log in filtered if log.get("priority") != "alta"]
+        if mismatched:
+            print(f"❌ Priority filter returned other priorities: {mismatched}")
+            return False
+        
+        print(f"✅ Logs pagination and filters consistent ({first_page['total']} logs)")
+        return True
         
     def test_create_log(self, log_data):
         """Test creating a new operational log"""
@@ -1506,6 +1584,8 @@ def main():
     # Test 1: Event Listing (for dropdown functionality)
     print("\n=== TEST 1: EVENT LISTING FOR DROPDOWN ===")
     events = tester.test_get_events()
+    tester.test_get_events_pagination()
+    tester.test_get_logs_pagination()
     if events and len(events) > 0:
         print("✅ Events endpoint is working correctly for dropdown functionality")
     else:
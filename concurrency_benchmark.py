@@ -0,0 +1,92 @@
+import requests
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class ConcurrencyBenchmark:
+    """A/B throughput benchmark: N simultaneous clients hammering read endpoints"""
+
+    def __init__(self, base_url="https://272455ba-030f-4132-83b6-fa2f9889fad1.preview.emergentagent.com", clients=200, requests_per_client=10):
+        self.base_url = base_url
+        self.clients = clients
+        self.requests_per_client = requests_per_client
+        self.token = None
+        self.endpoints = ["events", "dashboard/stats", "events/map", "inventory/alerts", "logs"]
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.errors = 0
+
+    def login(self, username="admin", password="admin123"):
+        response = requests.post(f"{self.base_url}/api/auth/login", json={"username": username, "password": password})
+        if response.status_code != 200:
+            print(f"❌ Login failed on {self.base_url}: {response.status_code}")
+            return False
+        self.token = response.json()["access_token"]
+        return True
+
+    def client_worker(self, client_index):
+        session = requests.Session()
+        session.headers.update({"Authorization": f"Bearer {self.token}"})
+        for i in range(self.requests_per_client):
+            endpoint = self.endpoints[(client_index + i) % len(self.endpoints)]
+            start = time.perf_counter()
+            try:
+                response = session.get(f"{self.base_url}/api/{endpoint}", timeout=60)
+                ok = response.status_code == 200
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.latencies.append(elapsed)
+                if not ok:
+                    self.errors += 1
+
+    def run(self):
+        print(f"\n🔍 Benchmark {self.base_url} - {self.clients} client simultanei x {self.requests_per_client} richieste")
+        if not self.login():
+            return None
+
+        self.latencies = []
+        self.errors = 0
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.clients) as executor:
+            list(executor.map(self.client_worker, range(self.clients)))
+        duration = time.perf_counter() - start
+
+        latencies = sorted(self.latencies)
+        total = len(latencies)
+        result = {
+            "requests": total,
+            "errors": self.errors,
+            "duration": duration,
+            "throughput": total / duration if duration else 0,
+            "p50": latencies[int(total * 0.50)] * 1000 if total else 0,
+            "p95": latencies[min(total - 1, int(total * 0.95))] * 1000 if total else 0,
+            "p99": latencies[min(total - 1, int(total * 0.99))] * 1000 if total else 0,
+        }
+        print(f"   Richieste: {result['requests']} (errori: {result['errors']}) in {result['duration']:.2f}s")
+        print(f"   Throughput: {result['throughput']:.1f} req/s")
+        print(f"   Latenza p50/p95/p99: {result['p50']:.0f} / {result['p95']:.0f} / {result['p99']:.0f} ms")
+        return result
+
+def main():
+    # Usage: python concurrency_benchmark.py <baseline_url> [<candidate_url>]
+    urls = sys.argv[1:] or [ConcurrencyBenchmark().base_url]
+
+    results = []
+    for url in urls:
+        result = ConcurrencyBenchmark(base_url=url.rstrip("/")).run()
+        if result is None:
+            return 1
+        results.append(result)
+
+    if len(results) == 2:
+        baseline, candidate = results
+        speedup = candidate["throughput"] / baseline["throughput"] if baseline["throughput"] else 0
+        print(f"\n📊 A/B: {baseline['throughput']:.1f} → {candidate['throughput']:.1f} req/s ({speedup:.2f}x)")
+
+    return 0 if all(r["errors"] == 0 for r in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import './App.css';
 import InventoryManagement from './components/InventoryManagement';
 import UserManagement from './components/UserManagement';
@@ -108,8 +108,10 @@ function App() {
 
   // States for different modules
   const [events, setEvents] = useState([]);
+  const [eventsCursor, setEventsCursor] = useState(null);
   const [inventory, setInventory] = useState([]);
   const [logs, setLogs] = useState([]);
+  const [logsCursor, setLogsCursor] = useState(null);
   const [resources, setResources] = useState([]);
   const [users, setUsers] = useState([]);
   const [dashboardStats, setDashboardStats] = useState({});
@@ -203,8 +205,12 @@ function App() {
     endDate: '',
     operator: ''
   });
+  // Operator filter as last applied with Enter: pages are always requested with the applied value
+  const [logOperator, setLogOperator] = useState('');
+  const logsRequest = useRef(0);
 
   const [inventoryFilters, setInventoryFilters] = useState({
+    q: '',
     category: '',
     location: '',
     low_stock: false,
@@ -225,6 +231,7 @@ function App() {
     status: ''
   });
   const [isGeneratingReport, setIsGeneratingReport] = useState(false);
+  const [reportProgress, setReportProgress] = useState(0);
 
   // Check authentication on mount
   useEffect(() => {
@@ -323,7 +330,7 @@ function App() {
     if (!token) return;
     
     try {
-      const [statsRes, eventsRes, logsRes, inventoryRes, alertsRes] = await Promise.all([
+      const [statsRes, eventsRes, logsRes, alertsRes] = await Promise.all([
         fetch(`${API_BASE_URL}/api/dashboard/stats`, {
           headers: { Authorization: `Bearer ${token}` }
         }),
@@ -333,9 +340,6 @@ function App() {
         fetch(`${API_BASE_URL}/api/logs`, {
           headers: { Authorization: `Bearer ${token}` }
         }),
-        fetch(`${API_BASE_URL}/api/inventory`, {
-          headers: { Authorization: `Bearer ${token}` }
-        }),
         fetch(`${API_BASE_URL}/api/inventory/alerts`, {
           headers: { Authorization: `Bearer ${token}` }
         })
@@ -348,17 +352,14 @@ function App() {
       
       if (eventsRes.ok) {
         const eventsData = await eventsRes.json();
-        setEvents(eventsData);
+        setEvents(eventsData.events);
+        setEventsCursor(eventsData.next_cursor);
       }
 
       if (logsRes.ok) {
         const logsData = await logsRes.json();
-        setLogs(logsData);
-      }
-
-      if (inventoryRes.ok) {
-        const inventoryData = await inventoryRes.json();
-        setInventory(inventoryData);
+        setLogs(logsData.logs);
+        setLogsCursor(logsData.next_cursor);
       }
 
       if (alertsRes.ok) {
@@ -370,6 +371,64 @@ function App() {
     }
   };
 
+  const loadMoreEvents = async () => {
+    if (!eventsCursor) return;
+    
+    try {
+      const response = await fetch(`${API_BASE_URL}/api/events?cursor=${encodeURIComponent(eventsCursor)}`, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      
+      if (response.ok) {
+        const eventsData = await response.json();
+        setEvents(prevEvents => [...prevEvents, ...eventsData.events]);
+        setEventsCursor(eventsData.next_cursor);
+      }
+    } catch (error) {
+      console.error('Failed to load more events:', error);
+    }
+  };
+
+  // Logs are filtered and paginated server-side
+  const logsQuery = (cursor) => {
+    const params = new URLSearchParams();
+    if (logFilters.priority) params.append('priority', logFilters.priority);
+    if (logOperator) params.append('operator', logOperator);
+    if (logFilters.startDate) params.append('start_date', logFilters.startDate);
+    if (logFilters.endDate) params.append('end_date', logFilters.endDate);
+    if (cursor) params.append('cursor', cursor);
+    return params.toString();
+  };
+
+  const loadLogs = async (cursor = null) => {
+    if (!token) return;
+    const request = ++logsRequest.current;
+    
+    try {
+      const response = await fetch(`${API_BASE_URL}/api/logs?${logsQuery(cursor)}`, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      
+      if (response.ok) {
+        const logsData = await response.json();
+        // A page requested before the filters changed belongs to the previous list
+        if (request !== logsRequest.current) return;
+        setLogs(prevLogs => cursor ? [...prevLogs, ...logsData.logs] : logsData.logs);
+        setLogsCursor(logsData.next_cursor);
+      }
+    } catch (error) {
+      console.error('Failed to load logs:', error);
+    }
+  };
+
+  useEffect(() => {
+    // Any filter change starts over from the first page: a cursor only belongs to its own filters
+    setLogsCursor(null);
+    if (currentView === 'logs') {
+      loadLogs();
+    }
+  }, [currentView, logFilters.priority, logFilters.startDate, logFilters.endDate, logOperator]);
+
   const createEvent = async (e) => {
     e.preventDefault();
     setLoading(true);
@@ -1019,13 +1078,7 @@ function App() {
     }
   };
 
-  const filteredLogs = logs.filter(log => {
-    const matchesPriority = !logFilters.priority || log.priority === logFilters.priority;
-    const matchesOperator = !logFilters.operator || log.operator.toLowerCase().includes(logFilters.operator.toLowerCase());
-    const matchesDate = (!logFilters.startDate || new Date(log.timestamp) >= new Date(logFilters.startDate)) &&
-                       (!logFilters.endDate || new Date(log.timestamp) <= new Date(logFilters.endDate));
-    return matchesPriority && matchesOperator && matchesDate;
-  });
+  const hasLogFilters = Boolean(logFilters.priority || logOperator || logFilters.startDate || logFilters.endDate);
 
   // Load report templates
   const loadReportTemplates = async () => {
@@ -1045,14 +1098,15 @@ function App() {
     }
   };
 
-  // Generate report
+  // Generate report: queue a background job, poll its progress, then download the file
   const generateReport = async (e) => {
     e.preventDefault();
     setIsGeneratingReport(true);
+    setReportProgress(0);
     setError('');
     
     try {
-      const response = await fetch(`${API_BASE_URL}/api/reports/generate`, {
+      const response = await fetch(`${API_BASE_URL}/api/reports/jobs`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -1061,28 +1115,37 @@ function App() {
         body: JSON.stringify(reportForm)
       });
       
-      if (response.ok) {
-        // Get filename from response headers
-        const contentDisposition = response.headers.get('content-disposition');
-        const filename = contentDisposition 
-          ? contentDisposition.split('filename=')[1].replace(/"/g, '')
-          : `report_${reportForm.report_type}_${new Date().getTime()}.${reportForm.format === 'pdf' ? 'pdf' : 'xlsx'}`;
-        
-        // Download file
-        const blob = await response.blob();
-        const url = window.URL.createObjectURL(blob);
+      let job = await response.json();
+      if (!response.ok) {
+        setError(job.detail || 'Errore durante la generazione del report');
+        return;
+      }
+      
+      while (job.status === 'in_coda' || job.status === 'in_corso') {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        const statusResponse = await fetch(`${API_BASE_URL}/api/reports/jobs/${job.id}`, {
+          headers: { Authorization: `Bearer ${token}` }
+        });
+        job = await statusResponse.json();
+        if (!statusResponse.ok) {
+          setError(job.detail || 'Errore durante la generazione del report');
+          return;
+        }
+        setReportProgress(job.progress || 0);
+      }
+      
+      if (job.status === 'completato') {
+        // The download URL carries its own token, so the browser can fetch it directly
         const a = document.createElement('a');
-        a.href = url;
-        a.download = filename;
+        a.href = `${API_BASE_URL}${job.download_url}`;
+        a.download = job.filename;
         document.body.appendChild(a);
         a.click();
-        window.URL.revokeObjectURL(url);
         document.body.removeChild(a);
         
         setSuccess('Report generato e scaricato con successo!');
       } else {
-        const data = await response.json();
-        setError(data.detail || 'Errore durante la generazione del report');
+        setError(job.error || 'Errore durante la generazione del report');
       }
     } catch (error) {
       setError('Errore di connessione al server');
@@ -1710,6 +1773,16 @@ function App() {
                       )}
                     </div>
                   ))}
+                  {eventsCursor && (
+                    <div className="flex justify-center">
+                      <button
+                        onClick={loadMoreEvents}
+                        className="px-4 py-2 bg-gray-100 text-gray-700 rounded-md text-sm hover:bg-gray-200"
+                      >
+                        Carica altri eventi
+                      </button>
+                    </div>
+                  )}
                 </div>
               )}
             </div>
@@ -2616,9 +2689,10 @@ function App() {
                   </select>
                   <input
                     type="text"
-                    placeholder="Filtra per operatore"
+                    placeholder="Username operatore (invio per filtrare)"
                     value={logFilters.operator}
                     onChange={(e) => setLogFilters({ ...logFilters, operator: e.target.value })}
+                    onKeyDown={(e) => e.key === 'Enter' && setLogOperator(logFilters.operator.trim())}
                     className="px-3 py-1 border border-gray-300 rounded-md text-sm"
                   />
                   <button
@@ -2632,13 +2706,13 @@ function App() {
               </div>
             </div>
             <div className="px-6 py-4">
-              {filteredLogs.length === 0 ? (
+              {logs.length === 0 ? (
                 <p className="text-gray-500">
-                  {logs.length === 0 ? 'Nessun log operativo presente' : 'Nessun log corrispondente ai filtri'}
+                  {hasLogFilters ? 'Nessun log corrispondente ai filtri' : 'Nessun log operativo presente'}
                 </p>
               ) : (
                 <div className="space-y-4">
-                  {filteredLogs.map((log) => (
+                  {logs.map((log) => (
                     <div key={log.id} className="border border-gray-200 rounded-lg p-4">
                       <div className="flex items-center justify-between mb-3">
                         <div className="flex items-center space-x-3">
@@ -2669,6 +2743,16 @@ function App() {
                       </div>
                     </div>
                   ))}
+                  {logsCursor && (
+                    <div className="flex justify-center">
+                      <button
+                        onClick={() => loadLogs(logsCursor)}
+                        className="px-4 py-2 bg-gray-100 text-gray-700 rounded-md text-sm hover:bg-gray-200"
+                      >
+                        Carica altri log
+                      </button>
+                    </div>
+                  )}
                 </div>
               )}
             </div>
@@ -2817,6 +2901,9 @@ function App() {
                       >
                         <option value="pdf">PDF (Stampa)</option>
                         <option value="excel">Excel (Analisi)</option>
+                        <option value="csv">CSV (Estrazione dati)</option>
+                        <option value="ndjson">NDJSON (Estrazione dati)</option>
+                        <option value="parquet">Parquet (Analisi dati)</option>
                       </select>
                     </div>
                   </div>
@@ -2950,7 +3037,7 @@ function App() {
                       {isGeneratingReport ? (
                         <>
                           <div className="animate-spin h-4 w-4 border-2 border-white border-t-transparent rounded-full"></div>
-                          <span>Generazione...</span>
+                          <span>Generazione... {reportProgress}%</span>
                         </>
                       ) : (
                         <>
@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { MapContainer, TileLayer, Marker, Popup } from 'react-leaflet';
+import { MapContainer, TileLayer, Marker, Popup, useMapEvents } from 'react-leaflet';
 import L from 'leaflet';
 import 'leaflet/dist/leaflet.css';
 
@@ -38,6 +38,58 @@ const createCustomIcon = (severity) => {
   });
 };
 
+// Cluster marker: sized by event count, colored by the most severe event it contains
+const createClusterIcon = (cluster) => {
+  const colors = {
+    'critica': '#dc2626',
+    'alta': '#ea580c',
+    'media': '#ca8a04',
+    'bassa': '#16a34a'
+  };
+  const worstSeverity = ['critica', 'alta', 'media', 'bassa'].find(level => cluster.severity[level] > 0);
+  const color = colors[worstSeverity] || '#6b7280';
+  const size = cluster.count < 10 ? 36 : cluster.count < 100 ? 44 : 52;
+  
+  return L.divIcon({
+    className: 'custom-marker',
+    html: `
+      <div style="
+        width: ${size}px;
+        height: ${size}px;
+        border-radius: 50%;
+        background-color: ${color};
+        opacity: 0.85;
+        border: 3px solid white;
+        box-shadow: 0 2px 6px rgba(0,0,0,0.3);
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        color: white;
+        font-weight: bold;
+        font-size: 13px;
+      ">${cluster.count}</div>
+    `,
+    iconSize: [size, size],
+    iconAnchor: [size / 2, size / 2]
+  });
+};
+
+// Reports the visible bounds and zoom whenever the user pans or zooms the map
+const ViewportWatcher = ({ onViewportChange }) => {
+  const map = useMapEvents({
+    moveend: () => {
+      const bounds = map.getBounds();
+      onViewportChange({
+        bbox: [bounds.getWest(), bounds.getSouth(), bounds.getEast(), bounds.getNorth()]
+          .map(value => value.toFixed(5))
+          .join(','),
+        zoom: map.getZoom()
+      });
+    }
+  });
+  return null;
+};
+
 const EmergencyEventsMap = ({ 
   token, 
   setError, 
@@ -46,6 +98,9 @@ const EmergencyEventsMap = ({
   eventTypes = []
 }) => {
   const [mapEvents, setMapEvents] = useState([]);
+  const [mapClusters, setMapClusters] = useState([]);
+  const [totalEvents, setTotalEvents] = useState(0);
+  const [hiddenEvents, setHiddenEvents] = useState(0);
   const [loading, setLoading] = useState(false);
   const [mapFilters, setMapFilters] = useState({
     status: 'active',
@@ -54,6 +109,7 @@ const EmergencyEventsMap = ({
   });
   const [mapCenter, setMapCenter] = useState([45.4642, 9.1900]); // Default to Milan
   const [mapZoom, setMapZoom] = useState(10);
+  const [viewport, setViewport] = useState(null);
 
   // Icons
   const MapIcon = () => (
@@ -78,6 +134,11 @@ const EmergencyEventsMap = ({
       Object.entries(mapFilters).forEach(([key, value]) => {
         if (value) params.append(key, value);
       });
+      // Once the user has moved the map, only fetch what is on screen
+      if (viewport) params.append('bbox', viewport.bbox);
+      // Let the server aggregate dense areas into clusters for the current zoom
+      params.append('cluster', 'true');
+      params.append('zoom', viewport ? viewport.zoom : mapZoom);
       
       const response = await fetch(`${API_BASE_URL}/api/events/map?${params}`, {
         headers: { Authorization: `Bearer ${token}` }
@@ -86,10 +147,15 @@ const EmergencyEventsMap = ({
       if (response.ok) {
         const data = await response.json();
         setMapEvents(data.events);
+        setMapClusters(data.clusters || []);
+        setTotalEvents(data.total);
+        // Cluster mode caps the number of cells: matches outside them are not drawn
+        setHiddenEvents(data.truncated ? data.total - data.shown : 0);
         
-        // Auto-fit map to show all events
-        if (data.events.length > 0) {
-          const bounds = data.events.map(event => [event.latitude, event.longitude]);
+        // Auto-fit map to show all events (first load only, afterwards the user drives the viewport)
+        const points = [...data.events, ...(data.clusters || [])];
+        if (!viewport && points.length > 0) {
+          const bounds = points.map(point => [point.latitude, point.longitude]);
           const avgLat = bounds.reduce((sum, coord) => sum + coord[0], 0) / bounds.length;
           const avgLng = bounds.reduce((sum, coord) => sum + coord[1], 0) / bounds.length;
           setMapCenter([avgLat, avgLng]);
@@ -109,7 +175,9 @@ const EmergencyEventsMap = ({
           setMapZoom(zoom);
         }
         
-        setSuccess(`${data.events.length} eventi caricati sulla mappa`);
+        if (!viewport) {
+          setSuccess(`${data.total} eventi caricati sulla mappa`);
+        }
       } else {
         const errorData = await response.json();
         setError(errorData.detail || 'Errore durante il caricamento eventi mappa');
@@ -151,7 +219,7 @@ const EmergencyEventsMap = ({
   // Load events on component mount and filter changes
   useEffect(() => {
     loadMapEvents();
-  }, [token, mapFilters]);
+  }, [token, mapFilters, viewport]);
 
   return (
     <div className="space-y-6">
@@ -163,8 +231,13 @@ const EmergencyEventsMap = ({
               <MapIcon className="h-6 w-6 text-blue-600" />
               <h3 className="text-lg font-medium text-gray-900">Mappa Eventi di Emergenza</h3>
               <span className="px-3 py-1 text-sm bg-blue-100 text-blue-800 rounded-full">
-                {mapEvents.length} eventi attivi
+                {totalEvents} eventi attivi
               </span>
+              {hiddenEvents > 0 && (
+                <span className="px-3 py-1 text-sm bg-yellow-100 text-yellow-800 rounded-full">
+                  {hiddenEvents} non visualizzati: aumenta lo zoom
+                </span>
+              )}
             </div>
             <button
               onClick={loadMapEvents}
@@ -239,7 +312,7 @@ const EmergencyEventsMap = ({
       {/* Map Display */}
       <div className="bg-white rounded-lg shadow">
         <div className="px-6 py-4">
-          {mapEvents.length === 0 ? (
+          {totalEvents === 0 && !viewport ? (
             <div className="text-center py-12">
               <MapIcon className="mx-auto h-12 w-12 text-gray-400" />
               <h3 className="mt-2 text-sm font-medium text-gray-900">Nessun evento geolocalizzato</h3>
@@ -280,11 +353,34 @@ const EmergencyEventsMap = ({
                   style={{ height: '100%', width: '100%' }}
                   key={`${mapCenter[0]}-${mapCenter[1]}-${mapZoom}`}
                 >
+                  <ViewportWatcher onViewportChange={setViewport} />
                   <TileLayer
                     attribution='&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors'
                     url="https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png"
                   />
                   
+                  {mapClusters.map((cluster) => (
+                    <Marker
+                      key={`cluster-${cluster.latitude}-${cluster.longitude}`}
+                      position={[cluster.latitude, cluster.longitude]}
+                      icon={createClusterIcon(cluster)}
+                    >
+                      <Popup maxWidth={250} className="custom-popup">
+                        <div className="p-2">
+                          <h4 className="font-bold text-gray-900 mb-2">{cluster.count} eventi in quest'area</h4>
+                          <div className="flex flex-wrap gap-2">
+                            {Object.entries(cluster.severity).filter(([, count]) => count > 0).map(([level, count]) => (
+                              <span key={level} className={`px-2 py-1 text-xs rounded-full ${getSeverityColor(level)}`}>
+                                {level}: {count}
+                              </span>
+                            ))}
+                          </div>
+                          <p className="text-xs text-gray-500 mt-2">Aumenta lo zoom per vedere i singoli eventi</p>
+                        </div>
+                      </Popup>
+                    </Marker>
+                  ))}
+                  
                   {mapEvents.map((event) => (
                     <Marker
                       key={event.id}
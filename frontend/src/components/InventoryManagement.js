@@ -26,6 +26,9 @@ const InventoryManagement = ({
   const [showAddCategory, setShowAddCategory] = useState(false);
   const [editingCategory, setEditingCategory] = useState(null);
   const [categoryForm, setCategoryForm] = useState({ name: '', description: '', icon: '' });
+  const [inventoryCursor, setInventoryCursor] = useState(null);
+  const [inventoryTotal, setInventoryTotal] = useState(0);
+  const [inventoryFacets, setInventoryFacets] = useState({ categories: [], locations: [], low_stock: 0, expiring_soon: 0 });
 
   // Icons
   const PlusIcon = () => (
@@ -52,24 +55,29 @@ const InventoryManagement = ({
     </svg>
   );
 
-  // Load inventory
-  const loadInventory = async () => {
+  // Load a page of inventory with facet counts; a cursor appends the next page
+  const loadInventory = async (cursor = null) => {
     if (!token) return;
     
     try {
       const params = new URLSearchParams();
+      if (inventoryFilters.q) params.append('q', inventoryFilters.q);
       if (inventoryFilters.category) params.append('category', inventoryFilters.category);
       if (inventoryFilters.location) params.append('location', inventoryFilters.location);
       if (inventoryFilters.low_stock) params.append('low_stock', 'true');
       if (inventoryFilters.expiring_soon) params.append('expiring_soon', 'true');
+      if (cursor) params.append('cursor', cursor);
       
-      const response = await fetch(`${API_BASE_URL}/api/inventory?${params}`, {
+      const response = await fetch(`${API_BASE_URL}/api/inventory/search?${params}`, {
         headers: { Authorization: `Bearer ${token}` }
       });
       
       if (response.ok) {
         const data = await response.json();
-        setInventory(data);
+        setInventory(cursor ? [...inventory, ...data.items] : data.items);
+        setInventoryCursor(data.next_cursor);
+        setInventoryTotal(data.total);
+        setInventoryFacets(data.facets);
       }
     } catch (error) {
       console.error('Failed to load inventory:', error);
@@ -203,14 +211,15 @@ const InventoryManagement = ({
     return '';
   };
 
-  // Filter inventory
-  const filteredInventory = inventory.filter(item => {
-    return true; // Filters are applied server-side
-  });
+  const facetCount = (facet, value) => {
+    const entry = inventoryFacets[facet].find((option) => option.value === value);
+    return entry ? entry.count : 0;
+  };
 
+  // The text search is applied on Enter, every other filter reloads right away
   useEffect(() => {
     loadInventory();
-  }, [inventoryFilters]);
+  }, [inventoryFilters.category, inventoryFilters.location, inventoryFilters.low_stock, inventoryFilters.expiring_soon]);
 
   // Check permissions
   const canEdit = user && ['admin', 'coordinator', 'warehouse'].includes(user.role);
@@ -644,6 +653,15 @@ const InventoryManagement = ({
         {/* Filters */}
         <div className="px-6 py-4 bg-gray-50">
           <div className="grid grid-cols-1 md:grid-cols-4 gap-4">
+            <input
+              type="text"
+              placeholder="Cerca nome, fornitore, note (invio)"
+              value={inventoryFilters.q}
+              onChange={(e) => setInventoryFilters({ ...inventoryFilters, q: e.target.value })}
+              onKeyDown={(e) => e.key === 'Enter' && loadInventory()}
+              className="px-3 py-2 border border-gray-300 rounded-md text-sm"
+            />
+            
             <select
               value={inventoryFilters.category}
               onChange={(e) => setInventoryFilters({ ...inventoryFilters, category: e.target.value })}
@@ -652,7 +670,7 @@ const InventoryManagement = ({
               <option value="">Tutte le categorie</option>
               {inventoryCategories.map((category) => (
                 <option key={category.id} value={category.name}>
-                  {category.icon} {category.name.charAt(0).toUpperCase() + category.name.slice(1)}
+                  {category.icon} {category.name.charAt(0).toUpperCase() + category.name.slice(1)} ({facetCount('categories', category.name)})
                 </option>
               ))}
             </select>
@@ -667,13 +685,18 @@ const InventoryManagement = ({
               </button>
             )}
             
-            <input
-              type="text"
-              placeholder="Filtra per posizione"
+            <select
               value={inventoryFilters.location}
               onChange={(e) => setInventoryFilters({ ...inventoryFilters, location: e.target.value })}
               className="px-3 py-2 border border-gray-300 rounded-md text-sm"
-            />
+            >
+              <option value="">Tutte le posizioni</option>
+              {inventoryFacets.locations.map((location) => (
+                <option key={location.value} value={location.value}>
+                  {location.value} ({location.count})
+                </option>
+              ))}
+            </select>
             
             <label className="flex items-center space-x-2">
               <input
@@ -682,7 +705,7 @@ const InventoryManagement = ({
                 onChange={(e) => setInventoryFilters({ ...inventoryFilters, low_stock: e.target.checked })}
                 className="rounded border-gray-300 text-blue-600 focus:ring-blue-500"
               />
-              <span className="text-sm text-gray-700">Solo scorte basse</span>
+              <span className="text-sm text-gray-700">Solo scorte basse ({inventoryFacets.low_stock})</span>
             </label>
             
             <label className="flex items-center space-x-2">
@@ -692,7 +715,7 @@ const InventoryManagement = ({
                 onChange={(e) => setInventoryFilters({ ...inventoryFilters, expiring_soon: e.target.checked })}
                 className="rounded border-gray-300 text-blue-600 focus:ring-blue-500"
               />
-              <span className="text-sm text-gray-700">In scadenza</span>
+              <span className="text-sm text-gray-700">In scadenza ({inventoryFacets.expiring_soon})</span>
             </label>
           </div>
         </div>
@@ -701,13 +724,16 @@ const InventoryManagement = ({
       {/* Inventory items */}
       <div className="bg-white rounded-lg shadow">
         <div className="px-6 py-4">
-          {filteredInventory.length === 0 ? (
+          {inventory.length === 0 ? (
             <p className="text-gray-500 text-center py-8">
               Nessun articolo trovato
             </p>
           ) : (
             <div className="space-y-4">
-              {filteredInventory.map((item) => (
+              <p className="text-sm text-gray-500">
+                {inventory.length} di {inventoryTotal} articoli
+              </p>
+              {inventory.map((item) => (
                 <div key={item.id} className="border border-gray-200 rounded-lg p-4">
                   <div className="flex items-center justify-between mb-3">
                     <div className="flex-1">
@@ -764,6 +790,16 @@ const InventoryManagement = ({
                   </div>
                 </div>
               ))}
+              {inventoryCursor && (
+                <div className="flex justify-center">
+                  <button
+                    onClick={() => loadInventory(inventoryCursor)}
+                    className="px-4 py-2 bg-gray-100 text-gray-700 rounded-md text-sm hover:bg-gray-200"
+                  >
+                    Carica altri articoli
+                  </button>
+                </div>
+              )}
             </div>
           )}
         </div>
@@ -0,0 +1,90 @@
+import os
+import sys
+import time
+import random
+import uuid
+from datetime import datetime, timedelta
+from pymongo import MongoClient
+
+class GeoQueryBenchmark:
+    """Compares the legacy map query with indexed viewport ($box on 2d) and radius (2dsphere) queries"""
+
+    def __init__(self, mongo_url=None, database_name="emergency_management_bench", events_count=100000):
+        self.mongo_url = mongo_url or os.environ.get("MONGO_URL", "mongodb://localhost:27017/")
+        self.client = MongoClient(self.mongo_url)
+        self.db = self.client[database_name]
+        self.events_count = events_count
+
+    def seed(self):
+        print(f"\n🔧 Seeding {self.events_count} eventi in {self.db.name}.events...")
+        self.db.events.drop()
+        random.seed(42)
+        now = datetime.now()
+        batch = []
+        for i in range(self.events_count):
+            # Events spread over mainland Italy
+            latitude = random.uniform(37.0, 46.5)
+            longitude = random.uniform(7.0, 18.5)
+            batch.append({
+                "id": str(uuid.uuid4()),
+                "title": f"Evento benchmark {i}",
+                "description": "Evento generato per il benchmark geospaziale",
+                "event_type": random.choice(["incendio", "alluvione", "terremoto", "frana", "altro"]),
+                "severity": random.choice(["bassa", "media", "alta", "critica"]),
+                "status": random.choice(["aperto", "in_corso", "risolto", "chiuso"]),
+                "latitude": latitude,
+                "longitude": longitude,
+                "location": {"type": "Point", "coordinates": [longitude, latitude]},
+                "created_at": now - timedelta(minutes=i),
+                "created_by": "benchmark"
+            })
+            if len(batch) == 5000:
+                self.db.events.insert_many(batch)
+                batch = []
+        if batch:
+            self.db.events.insert_many(batch)
+
+        self.db.events.create_index([("created_at", -1)])
+        self.db.events.create_index([("status", 1)])
+        self.db.events.create_index([("latitude", 1), ("longitude", 1)])
+        self.db.events.create_index([("location", "2dsphere")])
+        self.db.events.create_index([("location.coordinates", "2d")], min=-180.0, max=180.000001)
+
+    def measure(self, name, query, repeat=5):
+        active = {"status": {"$in": ["aperto", "in_corso"]}}
+        full_query = {**query, **active}
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            documents = list(self.db.events.find(full_query, {"_id": 0, "location": 0}).sort("created_at", -1))
+            timings.append(time.perf_counter() - start)
+
+        stats = self.db.command("explain", {"find": "events", "filter": full_query}, verbosity="executionStats")["executionStats"]
+        print(f"   {name:<32} {len(documents):>7} eventi  "
+              f"{min(timings) * 1000:>8.1f} ms  docsExamined={stats['totalDocsExamined']}")
+        return min(timings)
+
+    def run(self):
+        self.seed()
+        print("\n📊 Query mappa (eventi attivi)")
+        legacy = self.measure("legacy: latitude/longitude $exists", {
+            "latitude": {"$exists": True, "$ne": None},
+            "longitude": {"$exists": True, "$ne": None}
+        })
+        viewport = self.measure("bbox: viewport Milano (0.5°)", {
+            "location.coordinates": {"$geoWithin": {"$box": [[9.0, 45.3], [9.5, 45.8]]}}
+        })
+        province = self.measure("bbox: viewport regionale (2°)", {
+            "location.coordinates": {"$geoWithin": {"$box": [[10.0, 43.0], [12.0, 45.0]]}}
+        })
+        radius = self.measure("radius: 25 km da Roma", {
+            "location": {"$geoWithin": {"$centerSphere": [[12.4964, 41.9028], 25 / 6378.1]}}
+        })
+
+        print(f"\n   Speedup viewport Milano: {legacy / viewport:.1f}x, regionale: {legacy / province:.1f}x, raggio: {legacy / radius:.1f}x")
+        self.client.drop_database(self.db.name)
+        return 0
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    sys.exit(GeoQueryBenchmark(events_count=count).run())
@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+import uuid
+import random
+from datetime import datetime, timedelta
+from pymongo import MongoClient
+
+ALERT_FIELDS = ["id", "name", "category", "quantity", "min_quantity", "unit", "location"]
+
+class InventoryAlertsBenchmark:
+    """Compares the low-stock alert query as a per-request $expr scan against the stored flag's covered index"""
+
+    def __init__(self, mongo_url=None, database_name="emergency_management_bench", items=200000, repeats=20):
+        self.mongo_url = mongo_url or os.environ.get("MONGO_URL", "mongodb://localhost:27017/")
+        self.client = MongoClient(self.mongo_url)
+        self.db = self.client[database_name]
+        self.items = items
+        self.repeats = repeats
+
+    def seed(self):
+        print(f"\n🔧 Seeding {self.items} articoli...")
+        self.db.inventory.drop()
+        random.seed(42)
+        now = datetime.now()
+        batch = []
+        for i in range(self.items):
+            quantity = random.randint(0, 500)
+            min_quantity = random.randint(0, 60)
+            batch.append({
+                "id": str(uuid.uuid4()),
+                "name": f"Articolo {i:06d}",
+                "category": random.choice(["medicinali", "attrezzature", "vestiario", "alimentari"]),
+                "quantity": quantity,
+                "min_quantity": min_quantity,
+                "unit": "pz",
+                "location": f"Deposito {i % 20}",
+                "expiry_date": now + timedelta(days=random.randint(-30, 720)),
+                "low_stock": quantity <= min_quantity
+            })
+            if len(batch) == 10000:
+                self.db.inventory.insert_many(batch)
+                batch = []
+        if batch:
+            self.db.inventory.insert_many(batch)
+        self.db.inventory.create_index(
+            [("low_stock", 1)] + [(field, 1) for field in ALERT_FIELDS if field != "id"] + [("id", 1)],
+            name="inventory_low_stock_alerts", partialFilterExpression={"low_stock": True}
+        )
+
+    def measure(self, name, query, projection):
+        start = time.perf_counter()
+        for _ in range(self.repeats):
+            found = list(self.db.inventory.find(query, projection).sort("name", 1))
+        elapsed = (time.perf_counter() - start) / self.repeats
+        stats = self.db.inventory.find(query, projection).sort("name", 1).explain()["executionStats"]
+        print(f"   {name:<16} {elapsed * 1000:>8.1f} ms  {len(found)} articoli, "
+              f"{stats['totalDocsExamined']} documenti letti")
+        return elapsed
+
+    def run(self):
+        self.seed()
+        print(f"\n📊 Articoli sotto scorta (media su {self.repeats} richieste)")
+        projection = {"_id": 0, **{field: 1 for field in ALERT_FIELDS}}
+        scan = self.measure("scansione $expr", {"$expr": {"$lte": ["$quantity", "$min_quantity"]}}, projection)
+        covered = self.measure("indice coperto", {"low_stock": True}, projection)
+        print(f"\n   Speedup: {scan / covered:.1f}x")
+        self.client.drop_database(self.db.name)
+        return 0
+
+if __name__ == "__main__":
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    sys.exit(InventoryAlertsBenchmark(items=items).run())
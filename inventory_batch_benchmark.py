@@ -0,0 +1,82 @@
+import requests
+import sys
+import time
+import uuid
+
+class InventoryBatchBenchmark:
+    """Times a truck unload applied one movement per request against a single batch request"""
+
+    def __init__(self, base_url="https://272455ba-030f-4132-83b6-fa2f9889fad1.preview.emergentagent.com", lines=300, items=50):
+        self.base_url = base_url
+        self.lines = lines
+        self.items = items
+        self.session = requests.Session()
+
+    def login(self, username="admin", password="admin123"):
+        response = self.session.post(f"{self.base_url}/api/auth/login", json={"username": username, "password": password})
+        if response.status_code != 200:
+            print(f"❌ Login failed on {self.base_url}: {response.status_code}")
+            return False
+        self.session.headers.update({"Authorization": f"Bearer {response.json()['access_token']}"})
+        return True
+
+    def create_items(self):
+        item_ids = []
+        for _ in range(self.items):
+            response = self.session.post(f"{self.base_url}/api/inventory", json={
+                "name": f"Articolo benchmark {uuid.uuid4().hex[:8]}",
+                "category": "altro",
+                "quantity": 0,
+                "unit": "pz",
+                "location": "Magazzino benchmark"
+            })
+            item_ids.append(response.json()["item_id"])
+        return item_ids
+
+    def movements(self, item_ids):
+        return [
+            {"item_id": item_ids[i % len(item_ids)], "quantity_change": 1 + i % 5, "reason": "Scarico camion"}
+            for i in range(self.lines)
+        ]
+
+    def one_by_one(self, movements):
+        for movement in movements:
+            self.session.post(
+                f"{self.base_url}/api/inventory/{movement['item_id']}/update-quantity",
+                json={"quantity_change": movement["quantity_change"], "reason": movement["reason"]}
+            )
+
+    def batched(self, movements):
+        response = self.session.post(
+            f"{self.base_url}/api/inventory/movements:batch",
+            json={"movements": movements, "reason": "Scarico camion"}
+        )
+        return response.json()["applied"]
+
+    def run(self):
+        print(f"\n🔍 Scarico di {self.lines} righe su {self.items} articoli - {self.base_url}")
+        if not self.login():
+            return 1
+
+        item_ids = self.create_items()
+        movements = self.movements(item_ids)
+
+        start = time.perf_counter()
+        self.one_by_one(movements)
+        single = time.perf_counter() - start
+        print(f"   Una richiesta per riga: {single:.2f}s")
+
+        start = time.perf_counter()
+        applied = self.batched(movements)
+        batch = time.perf_counter() - start
+        print(f"   Richiesta batch:        {batch:.2f}s ({applied} righe applicate)")
+        print(f"\n📊 Speedup: {single / batch:.1f}x")
+
+        for item_id in item_ids:
+            self.session.delete(f"{self.base_url}/api/inventory/{item_id}")
+        return 0
+
+if __name__ == "__main__":
+    base_url = sys.argv[1].rstrip("/") if len(sys.argv) > 1 else None
+    benchmark = InventoryBatchBenchmark(base_url=base_url) if base_url else InventoryBatchBenchmark()
+    sys.exit(benchmark.run())
@@ -0,0 +1,126 @@
+import requests
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+class InventoryConcurrencyTester:
+    """Fires hundreds of simultaneous stock movements at one item and checks that none is lost"""
+
+    def __init__(self, base_url="https://272455ba-030f-4132-83b6-fa2f9889fad1.preview.emergentagent.com", movements=500):
+        self.base_url = base_url
+        self.movements = movements
+        self.token = None
+        self.tests_run = 0
+        self.tests_passed = 0
+
+    def headers(self):
+        return {'Content-Type': 'application/json', 'Authorization': f'Bearer {self.token}'}
+
+    def check(self, name, condition, detail=""):
+        self.tests_run += 1
+        if condition:
+            self.tests_passed += 1
+            print(f"✅ {name}")
+        else:
+            print(f"❌ {name} {detail}")
+        return condition
+
+    def login(self, username="admin", password="admin123"):
+        response = requests.post(f"{self.base_url}/api/auth/login", json={"username": username, "password": password})
+        if response.status_code != 200:
+            print(f"❌ Login failed: {response.status_code}")
+            return False
+        self.token = response.json()["access_token"]
+        return True
+
+    def create_item(self, quantity):
+        item = {
+            "name": f"Articolo stress test {uuid.uuid4().hex[:8]}",
+            "category": "altro",
+            "quantity": quantity,
+            "unit": "pezzi",
+            "location": "Magazzino test",
+            "min_quantity": 0
+        }
+        response = requests.post(f"{self.base_url}/api/inventory", json=item, headers=self.headers())
+        return response.json()["item_id"] if response.status_code == 200 else None
+
+    def get_quantity(self, item_id):
+        response = requests.get(f"{self.base_url}/api/inventory/{item_id}", headers=self.headers())
+        return response.json()["quantity"]
+
+    def delete_item(self, item_id):
+        requests.delete(f"{self.base_url}/api/inventory/{item_id}", headers=self.headers())
+
+    def move_in_parallel(self, item_id, changes):
+        """Send every movement at once; returns the status codes"""
+        session = requests.Session()
+        session.headers.update(self.headers())
+
+        def move(change):
+            try:
+                response = session.post(
+                    f"{self.base_url}/api/inventory/{item_id}/update-quantity",
+                    json={"quantity_change": change, "reason": "Stress test concorrenza"},
+                    timeout=120
+                )
+                return response.status_code
+            except Exception:
+                return None
+
+        with ThreadPoolExecutor(max_workers=50) as executor:
+            return list(executor.map(move, changes))
+
+    def test_no_lost_updates(self):
+        """Mixed loads and unloads that never exceed the stock: the final quantity must be exact"""
+        print(f"\n🔍 {self.movements} movimenti paralleli (carichi e scarichi)...")
+        start_quantity = self.movements
+        item_id = self.create_item(start_quantity)
+        if not self.check("Articolo creato", item_id is not None):
+            return False
+
+        changes = [3 if i % 2 == 0 else -1 for i in range(self.movements)]
+        statuses = self.move_in_parallel(item_id, changes)
+        final_quantity = self.get_quantity(item_id)
+        expected = start_quantity + sum(changes)
+        self.delete_item(item_id)
+
+        ok = self.check("Tutti i movimenti accettati", statuses.count(200) == len(changes),
+                        f"({statuses.count(200)}/{len(changes)})")
+        return self.check(f"Quantità finale esatta ({expected})", final_quantity == expected,
+                          f"- ottenuta {final_quantity}") and ok
+
+    def test_non_negative_guard(self):
+        """More unloads than stock: exactly `stock` succeed and the quantity stops at zero"""
+        stock = self.movements // 5
+        print(f"\n🔍 {self.movements} scarichi paralleli su {stock} pezzi disponibili...")
+        item_id = self.create_item(stock)
+        if not self.check("Articolo creato", item_id is not None):
+            return False
+
+        statuses = self.move_in_parallel(item_id, [-1] * self.movements)
+        final_quantity = self.get_quantity(item_id)
+        self.delete_item(item_id)
+
+        ok = self.check(f"Scarichi accettati: {stock}", statuses.count(200) == stock, f"({statuses.count(200)})")
+        ok = self.check("Scarichi rifiutati con 400", statuses.count(400) == self.movements - stock,
+                        f"({statuses.count(400)})") and ok
+        return self.check("Quantità finale zero", final_quantity == 0, f"- ottenuta {final_quantity}") and ok
+
+def main():
+    base_url = sys.argv[1].rstrip("/") if len(sys.argv) > 1 else None
+    tester = InventoryConcurrencyTester(base_url=base_url) if base_url else InventoryConcurrencyTester()
+
+    if not tester.login():
+        return 1
+
+    no_lost_updates = tester.test_no_lost_updates()
+    guard = tester.test_non_negative_guard()
+
+    print(f"\n📊 Tests passed: {tester.tests_passed}/{tester.tests_run}")
+    print(f"Nessun aggiornamento perso: {'✅ Success' if no_lost_updates else '❌ Failed'}")
+    print(f"Quantità mai negativa: {'✅ Success' if guard else '❌ Failed'}")
+    return 0 if tester.tests_passed == tester.tests_run else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
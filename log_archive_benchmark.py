@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+import uuid
+import random
+import shutil
+import asyncio
+from pathlib import Path
+from datetime import datetime, timedelta
+from pymongo import MongoClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+class LogArchiveBenchmark:
+    """Compares the logs collection size and page latency before and after archiving months outside the hot window"""
+
+    def __init__(self, mongo_url=None, database_name="emergency_management_bench", logs_count=2000000, months=12, page_size=50):
+        self.mongo_url = mongo_url or os.environ.get("MONGO_URL", "mongodb://localhost:27017/")
+        self.database_name = database_name
+        self.client = MongoClient(self.mongo_url)
+        self.db = self.client[database_name]
+        self.logs_count = logs_count
+        self.months = months
+        self.page_size = page_size
+
+    def seed(self):
+        print(f"\n🔧 Seeding {self.logs_count} log su {self.months} mesi in {self.db.name}.logs...")
+        self.db.logs.drop()
+        self.db.log_archives.drop()
+        random.seed(42)
+        now = datetime.now()
+        step = timedelta(days=30 * self.months) / self.logs_count
+        batch = []
+        for i in range(self.logs_count):
+            batch.append({
+                "id": str(uuid.uuid4()),
+                "timestamp": now - step * i,
+                "operator": f"operatore{random.randrange(200)}",
+                "action": "Aggiornamento evento",
+                "details": "Voce di diario generata per il benchmark",
+                "event_id": None,
+                "priority": random.choices(["bassa", "normale", "alta"], weights=[30, 60, 10])[0]
+            })
+            if len(batch) == 20000:
+                self.db.logs.insert_many(batch)
+                batch = []
+        if batch:
+            self.db.logs.insert_many(batch)
+        self.db.logs.create_index([("timestamp", -1), ("id", -1)])
+        self.db.logs.create_index([("operator", 1), ("timestamp", -1), ("id", -1)])
+        self.db.logs.create_index([("priority", 1), ("timestamp", -1), ("id", -1)])
+
+    def collection_size(self):
+        stats = self.db.command("collStats", "logs")
+        return stats["count"], stats["size"] / (1024 * 1024), stats["totalIndexSize"] / (1024 * 1024)
+
+    def page(self, query, repeat=5):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            list(self.db.logs.find(query, {"_id": 0}).sort([("timestamp", -1), ("id", -1)]).limit(self.page_size))
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    def report(self, label):
+        count, size, index_size = self.collection_size()
+        print(f"\n📊 {label}: {count} log, dati {size:.1f} MB, indici {index_size:.1f} MB")
+        for name, query in [("ultimi log", {}), ("priorità alta", {"priority": "alta"})]:
+            print(f"   {name:<20} {self.page(query) * 1000:>8.2f} ms")
+        return size + index_size
+
+    async def archive(self):
+        import server
+
+        success, message = await server.switch_database_connection(self.mongo_url, self.database_name)
+        if not success:
+            print(f"❌ {message}")
+            return None
+        start = time.perf_counter()
+        archived = await server.archive_old_logs()
+        elapsed = time.perf_counter() - start
+        shutil.rmtree(os.path.join(server.LOG_ARCHIVE_DIR, self.database_name), ignore_errors=True)
+        return archived, elapsed
+
+    def run(self):
+        self.seed()
+        before = self.report("prima dell'archiviazione")
+
+        result = asyncio.run(self.archive())
+        if result is None:
+            self.client.drop_database(self.db.name)
+            return 1
+        archived, elapsed = result
+        print(f"\n🗄️ {archived} log archiviati in {elapsed:.1f}s")
+
+        after = self.report("dopo l'archiviazione")
+        print(f"\n   Collezione calda: {before / after:.1f}x più piccola")
+        self.client.drop_database(self.db.name)
+        return 0
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000000
+    sys.exit(LogArchiveBenchmark(logs_count=count).run())
@@ -0,0 +1,102 @@
+import os
+import sys
+import time
+import uuid
+import random
+from datetime import datetime, timedelta
+from pymongo import MongoClient
+
+class LogsQueryBenchmark:
+    """Compares log page queries with single-field indexes against the (field, timestamp, id) compound indexes"""
+
+    def __init__(self, mongo_url=None, database_name="emergency_management_bench", logs_count=5000000, page_size=50):
+        self.mongo_url = mongo_url or os.environ.get("MONGO_URL", "mongodb://localhost:27017/")
+        self.client = MongoClient(self.mongo_url)
+        self.db = self.client[database_name]
+        self.logs_count = logs_count
+        self.page_size = page_size
+
+    def seed(self):
+        print(f"\n🔧 Seeding {self.logs_count} log in {self.db.name}.logs...")
+        self.db.logs.drop()
+        random.seed(42)
+        now = datetime.now()
+        event_ids = [str(uuid.uuid4()) for _ in range(2000)]
+        batch = []
+        for i in range(self.logs_count):
+            batch.append({
+                "id": str(uuid.uuid4()),
+                "timestamp": now - timedelta(seconds=i * 6),
+                "operator": f"operatore{random.randrange(200)}",
+                "action": "Aggiornamento evento",
+                "details": "Voce di diario generata per il benchmark",
+                "event_id": random.choice(event_ids) if random.random() < 0.3 else None,
+                "priority": random.choices(["bassa", "normale", "alta"], weights=[30, 60, 10])[0]
+            })
+            if len(batch) == 20000:
+                self.db.logs.insert_many(batch)
+                batch = []
+        if batch:
+            self.db.logs.insert_many(batch)
+        self.sample = self.db.logs.find_one({"event_id": {"$ne": None}})
+
+    def single_field_indexes(self):
+        self.db.logs.drop_indexes()
+        self.db.logs.create_index([("timestamp", -1)])
+        self.db.logs.create_index([("operator", 1)])
+        self.db.logs.create_index([("priority", 1)])
+        self.db.logs.create_index([("event_id", 1)])
+
+    def compound_indexes(self):
+        self.db.logs.drop_indexes()
+        self.db.logs.create_index([("timestamp", -1), ("id", -1)])
+        self.db.logs.create_index([("operator", 1), ("timestamp", -1), ("id", -1)])
+        self.db.logs.create_index([("priority", 1), ("timestamp", -1), ("id", -1)])
+        self.db.logs.create_index([("event_id", 1), ("timestamp", -1), ("id", -1)])
+
+    def queries(self):
+        return {
+            "ultimi log": {},
+            "operatore": {"operator": self.sample["operator"]},
+            "priorità alta": {"priority": "alta"},
+            "evento collegato": {"event_id": self.sample["event_id"]},
+            "operatore + ultima settimana": {
+                "operator": self.sample["operator"],
+                "timestamp": {"$gte": datetime.now() - timedelta(days=7)}
+            }
+        }
+
+    def page(self, query, repeat=5):
+        sort = [("timestamp", -1), ("id", -1)]
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            list(self.db.logs.find(query, {"_id": 0}).sort(sort).limit(self.page_size))
+            timings.append(time.perf_counter() - start)
+        stats = self.db.command(
+            "explain",
+            {"find": "logs", "filter": query, "sort": {"timestamp": -1, "id": -1}, "limit": self.page_size},
+            verbosity="executionStats"
+        )["executionStats"]
+        return min(timings), stats["totalKeysExamined"], stats["totalDocsExamined"]
+
+    def run(self):
+        self.seed()
+        results = {}
+        for label, build in [("singoli", self.single_field_indexes), ("composti", self.compound_indexes)]:
+            build()
+            print(f"\n📊 Pagina da {self.page_size} log - indici {label}")
+            for name, query in self.queries().items():
+                elapsed, keys, docs = self.page(query)
+                results.setdefault(name, []).append(elapsed)
+                print(f"   {name:<30} {elapsed * 1000:>8.1f} ms  keysExamined={keys:<8} docsExamined={docs}")
+
+        print("\n   Speedup:")
+        for name, (single, compound) in results.items():
+            print(f"   {name:<30} {single / compound:>6.1f}x")
+        self.client.drop_database(self.db.name)
+        return 0
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000000
+    sys.exit(LogsQueryBenchmark(logs_count=count).run())
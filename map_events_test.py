@@ -114,6 +114,35 @@ class MapEventsTester:
             return events
         return []
 
+    def test_get_map_clusters(self, zoom, params=None):
+        """Test the clustered map mode at a given zoom level"""
+        query = {"cluster": "true", "zoom": zoom, **(params or {})}
+        endpoint = "events/map?" + "&".join([f"{k}={v}" for k, v in query.items()])
+        
+        success, response = self.run_test(
+            f"Get clustered map events (zoom {zoom})",
+            "GET",
+            endpoint,
+            200
+        )
+        
+        if success:
+            clusters = response.get('clusters', [])
+            events = response.get('events', [])
+            clustered_total = sum(cluster['count'] for cluster in clusters) + len(events)
+            print(f"Zoom {zoom}: {len(clusters)} clusters + {len(events)} single events = {clustered_total} (total {response.get('total')})")
+            
+            if clustered_total != response.get('total'):
+                print("❌ Cluster counts do not add up to total")
+                return None
+            for cluster in clusters:
+                if sum(cluster['severity'].values()) != cluster['count']:
+                    print(f"❌ Severity breakdown does not match count: {cluster}")
+                    return None
+            print("✅ Cluster counts consistent")
+            return response
+        return None
+
 def main():
     # Setup
     tester = MapEventsTester()
@@ -185,6 +214,12 @@ def main():
     })
     print(f"Active incendio events: {len(combined_events)}")
     
+    # Test 6: Clustering at country and street zoom levels
+    country_view = tester.test_get_map_clusters(5)
+    street_view = tester.test_get_map_clusters(16)
+    if country_view and street_view and country_view['total'] != street_view['total']:
+        print("❌ Clustered total changes with zoom")
+    
     # Print results
     print(f"\n📊 Tests passed: {tester.tests_passed}/{tester.tests_run}")
     return 0 if tester.tests_passed == tester.tests_run else 1
@@ -0,0 +1,64 @@
+import sys
+import time
+import uuid
+import tempfile
+from pathlib import Path
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+import server
+import openpyxl
+import pyarrow.parquet as pq
+
+class ParquetExportBenchmark:
+    """Compares file size and load time of the Excel and Parquet log exports"""
+
+    def __init__(self, logs_count=200000):
+        self.logs_count = logs_count
+
+    def logs(self):
+        now = datetime.now()
+        for i in range(self.logs_count):
+            yield {
+                "id": str(uuid.uuid4()),
+                "timestamp": now - timedelta(minutes=i),
+                "operator": f"operatore{i % 20}",
+                "action": f"Aggiornamento evento {i % 500}",
+                "details": f"Evento aggiornato con nuovi dati. ID: {uuid.uuid4()}",
+                "event_id": None,
+                "priority": ["bassa", "normale", "alta"][i % 3]
+            }
+
+    def export(self, name, write, load):
+        with tempfile.TemporaryFile() as output:
+            start = time.perf_counter()
+            write(output)
+            written = time.perf_counter() - start
+            size = output.seek(0, 2)
+
+            output.seek(0)
+            start = time.perf_counter()
+            rows = load(output)
+            loaded = time.perf_counter() - start
+        print(f"   {name:<8} {size / (1024 * 1024):>8.1f} MB  scrittura {written:>6.2f}s  lettura {loaded:>6.2f}s  ({rows} righe)")
+        return size, loaded
+
+    def run(self):
+        print(f"\n📊 Export di {self.logs_count} log")
+        excel_size, excel_load = self.export(
+            "excel",
+            lambda output: server.generate_excel_report(self.logs(), "logs", {}, output),
+            lambda output: sum(1 for _ in openpyxl.load_workbook(output, read_only=True).active.iter_rows(min_row=2))
+        )
+        parquet_size, parquet_load = self.export(
+            "parquet",
+            lambda output: server.generate_parquet_export(self.logs(), "logs", output),
+            lambda output: pq.read_table(output).num_rows
+        )
+        print(f"\n   Dimensione: {excel_size / parquet_size:.1f}x più piccolo, lettura: {excel_load / parquet_load:.1f}x più veloce")
+        return 0
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    sys.exit(ParquetExportBenchmark(logs_count=count).run())
@@ -0,0 +1,79 @@
+import sys
+import time
+import uuid
+import tracemalloc
+import argparse
+from pathlib import Path
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+import server
+from reportlab.platypus import SimpleDocTemplate, Table
+
+class PdfTableBenchmark:
+    """Times the events PDF with streamed chunk tables against a single table holding every row, with the peak memory of the former"""
+
+    def __init__(self, sizes=(1000, 10000, 50000, 100000), legacy_limit=20000, memory=True):
+        self.sizes = sizes
+        self.legacy_limit = legacy_limit
+        self.memory = memory
+
+    def events(self, count):
+        now = datetime.now()
+        for i in range(count):
+            yield {
+                "id": str(uuid.uuid4()),
+                "title": f"Evento benchmark {i}",
+                "event_type": ["incendio", "alluvione", "terremoto", "frana"][i % 4],
+                "severity": ["bassa", "media", "alta", "critica"][i % 4],
+                "status": ["aperto", "in_corso", "risolto", "chiuso"][i % 4],
+                "created_at": now - timedelta(minutes=i),
+                "created_by": "benchmark"
+            }
+
+    def render_chunked(self, count):
+        server.generate_events_pdf(self.events(count), {}, total=count)
+
+    def render_single_table(self, count):
+        # Layout used before chunking: one Table with every row
+        rows = [["Titolo", "Tipo", "Gravità", "Status", "Data", "Operatore"]]
+        for event in self.events(count):
+            rows.append([event["title"], event["event_type"], event["severity"], event["status"],
+                         event["created_at"].strftime('%d/%m/%Y'), event["created_by"]])
+        table = Table(rows, colWidths=[2 * server.inch] + [server.inch] * 5)
+        table.setStyle(server.EVENTS_TABLE_STYLE)
+        SimpleDocTemplate(server.io.BytesIO(), pagesize=server.A4).build([table])
+
+    def measure(self, render, count):
+        start = time.perf_counter()
+        render(count)
+        return time.perf_counter() - start
+
+    def peak_memory_mb(self, render, count):
+        # Separate run: tracing allocations slows layout down several times
+        tracemalloc.start()
+        render(count)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak / (1024 * 1024)
+
+    def run(self):
+        print(f"\n📊 PDF eventi - tabelle da {server.PDF_TABLE_CHUNK_ROWS} righe")
+        print(f"   {'righe':>8}  {'a blocchi':>10}  {'µs/riga':>8}  {'picco MB':>9}  {'tabella unica':>14}")
+        for count in self.sizes:
+            chunked = self.measure(self.render_chunked, count)
+            peak = self.peak_memory_mb(self.render_chunked, count) if self.memory else None
+            single = self.measure(self.render_single_table, count) if count <= self.legacy_limit else None
+            peak_text = f"{peak:>9.1f}" if peak is not None else f"{'-':>9}"
+            single_text = f"{single:>13.2f}s" if single is not None else f"{'-':>14}"
+            print(f"   {count:>8}  {chunked:>9.2f}s  {chunked / count * 1e6:>8.1f}  {peak_text}  {single_text}")
+        return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("sizes", nargs="*", type=int, default=[1000, 10000, 50000, 100000])
+    parser.add_argument("--legacy-limit", type=int, default=20000, help="largest row count also rendered as a single table")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced run that measures peak memory")
+    args = parser.parse_args()
+    sys.exit(PdfTableBenchmark(sizes=args.sizes, legacy_limit=args.legacy_limit, memory=not args.no_memory).run())
@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+import uuid
+import asyncio
+import argparse
+import resource
+from pathlib import Path
+from datetime import datetime, timedelta
+from pymongo import MongoClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+class ReportMemoryBenchmark:
+    """Measures the peak memory of a log report generated in-process against a seeded logs collection"""
+
+    def __init__(self, mongo_url=None, database_name="emergency_management_bench", logs_count=1000000, report_format="excel"):
+        self.mongo_url = mongo_url or os.environ.get("MONGO_URL", "mongodb://localhost:27017/")
+        self.database_name = database_name
+        self.client = MongoClient(self.mongo_url)
+        self.db = self.client[database_name]
+        self.logs_count = logs_count
+        self.report_format = report_format
+
+    def seed(self):
+        print(f"\n🔧 Seeding {self.logs_count} log in {self.db.name}.logs...")
+        self.db.logs.drop()
+        now = datetime.now()
+        batch = []
+        for i in range(self.logs_count):
+            batch.append({
+                "id": str(uuid.uuid4()),
+                "title": f"Log benchmark {i}",
+                "content": "Voce di diario generata per il benchmark dei report",
+                "priority": ["bassa", "media", "alta"][i % 3],
+                "action_taken": "Nessuna",
+                "operator": f"operatore{i % 20}",
+                "timestamp": now - timedelta(seconds=i * 30)
+            })
+            if len(batch) == 10000:
+                self.db.logs.insert_many(batch)
+                batch = []
+        if batch:
+            self.db.logs.insert_many(batch)
+        self.db.logs.create_index([("timestamp", -1)])
+
+    def peak_rss_mb(self):
+        # ru_maxrss is reported in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    async def generate(self):
+        import server
+
+        success, message = await server.switch_database_connection(self.mongo_url, self.database_name)
+        if not success:
+            print(f"❌ {message}")
+            return None
+
+        report_request = server.ReportRequest(report_type="logs", format=self.report_format)
+        start = time.perf_counter()
+        response = await server.build_report_response(report_request)
+        first_byte = None
+        size = 0
+        async for chunk in response.body_iterator:
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+            size += len(chunk)
+        return size, first_byte or 0, time.perf_counter() - start
+
+    def run(self):
+        self.seed()
+        baseline = self.peak_rss_mb()
+        print(f"\n📊 Report log ({self.report_format}) - RSS di partenza {baseline:.0f} MB")
+
+        result = asyncio.run(self.generate())
+        self.client.drop_database(self.db.name)
+        if result is None:
+            return 1
+
+        size, first_byte, duration = result
+        peak = self.peak_rss_mb()
+        print(f"   Dimensione report: {size / (1024 * 1024):.1f} MB")
+        print(f"   Primo byte: {first_byte:.1f}s, totale: {duration:.1f}s")
+        print(f"   Picco RSS: {peak:.0f} MB (+{peak - baseline:.0f} MB)")
+        return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("logs", nargs="?", type=int, default=1000000)
+    parser.add_argument("--format", choices=["pdf", "excel"], default="excel")
+    args = parser.parse_args()
+    sys.exit(ReportMemoryBenchmark(logs_count=args.logs, report_format=args.format).run())
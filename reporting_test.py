@@ -165,6 +165,37 @@ class ReportingSystemTester:
         )
         return success
 
+    def test_report_job(self, report_type="logs", report_format="pdf", timeout=120):
+        """Test queueing a background report job, polling it and downloading the file"""
+        success, job = self.run_test(
+            f"Queue {report_type} {report_format} Report Job",
+            "POST",
+            "reports/jobs",
+            200,
+            data={"report_type": report_type, "format": report_format}
+        )
+        if not success or "id" not in job:
+            return False
+        
+        deadline = time.time() + timeout
+        while job.get("status") in ("in_coda", "in_corso") and time.time() < deadline:
+            time.sleep(1)
+            success, job = self.run_test("Get Report Job Status", "GET", f"reports/jobs/{job['id']}", 200)
+            if not success:
+                return False
+            print(f"   Progress: {job.get('progress')}% ({job.get('phase')})")
+        
+        if job.get("status") != "completato":
+            print(f"❌ Report job ended with status {job.get('status')}: {job.get('error')}")
+            return False
+        
+        response = requests.get(f"{self.base_url}{job['download_url']}")
+        if response.status_code != 200 or not response.content:
+            print(f"❌ Download failed - Status: {response.status_code}")
+            return False
+        print(f"✅ Downloaded {job['filename']} ({len(response.content)} bytes)")
+        return True
+
 def main():
     # Setup
     tester = ReportingSystemTester()
@@ -184,6 +215,7 @@ def main():
     events_excel_success = tester.test_generate_events_report_excel()
     logs_pdf_success = tester.test_generate_logs_report_pdf()
     stats_pdf_success = tester.test_generate_statistics_report_pdf()
+    job_success = tester.test_report_job()
     
     # Print results
     print(f"\n📊 Tests passed: {tester.tests_passed}/{tester.tests_run}")
@@ -194,6 +226,7 @@ def main():
     print(f"Events Excel Report: {'✅ Success' if events_excel_success else '❌ Failed'}")
     print(f"Logs PDF Report: {'✅ Success' if logs_pdf_success else '❌ Failed'}")
     print(f"Statistics PDF Report: {'✅ Success' if stats_pdf_success else '❌ Failed'}")
+    print(f"Background Report Job: {'✅ Success' if job_success else '❌ Failed'}")
     
     return 0 if tester.tests_passed == tester.tests_run else 1
 
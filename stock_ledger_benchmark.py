@@ -0,0 +1,105 @@
+import os
+import sys
+import time
+import uuid
+import random
+import asyncio
+from pathlib import Path
+from datetime import datetime, timedelta
+from pymongo import MongoClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+class StockLedgerBenchmark:
+    """Times point-in-time stock of a location rebuilt from the latest daily snapshot against the baseline one"""
+
+    def __init__(self, mongo_url=None, database_name="emergency_management_bench", items=2000, movements_per_day=5000, days=90):
+        self.mongo_url = mongo_url or os.environ.get("MONGO_URL", "mongodb://localhost:27017/")
+        self.database_name = database_name
+        self.client = MongoClient(self.mongo_url)
+        self.db = self.client[database_name]
+        self.items = items
+        self.movements_per_day = movements_per_day
+        self.days = days
+
+    def seed(self):
+        print(f"\n🔧 Seeding {self.items} articoli, {self.movements_per_day * self.days} movimenti su {self.days} giorni...")
+        for name in ("stock_movements", "stock_snapshots", "stock_snapshot_runs"):
+            self.db[name].drop()
+        random.seed(42)
+        start = datetime.now() - timedelta(days=self.days)
+        locations = [f"Deposito {i}" for i in range(20)]
+        state = {
+            str(uuid.uuid4()): {"item_name": f"Articolo {i}", "unit": "pz", "location": random.choice(locations), "quantity": 1000}
+            for i in range(self.items)
+        }
+        item_ids = list(state)
+
+        for day in range(self.days):
+            taken_at = start + timedelta(days=day)
+            self.db.stock_snapshots.insert_many([
+                {"taken_at": taken_at, "item_id": item_id, **entry} for item_id, entry in state.items()
+            ])
+            self.db.stock_snapshot_runs.insert_one({"taken_at": taken_at, "items": len(state)})
+
+            batch = []
+            step = timedelta(days=1) / self.movements_per_day
+            for i in range(self.movements_per_day):
+                item_id = random.choice(item_ids)
+                change = random.randint(-5, 5)
+                state[item_id]["quantity"] += change
+                batch.append({
+                    "id": str(uuid.uuid4()),
+                    "timestamp": taken_at + step * (i + 1),
+                    "item_id": item_id,
+                    "quantity_change": change,
+                    "quantity_after": state[item_id]["quantity"],
+                    "reason": "Benchmark",
+                    "source": "movimento",
+                    "operator": "benchmark",
+                    **{key: state[item_id][key] for key in ("item_name", "unit", "location")}
+                })
+            self.db.stock_movements.insert_many(batch)
+
+        self.db.stock_movements.create_index([("timestamp", 1), ("id", 1)])
+        self.db.stock_snapshots.create_index([("taken_at", 1), ("item_id", 1)])
+        self.db.stock_snapshot_runs.create_index([("taken_at", -1)])
+        return start
+
+    async def measure(self, at, location):
+        import server
+
+        success, message = await server.switch_database_connection(self.mongo_url, self.database_name)
+        if not success:
+            print(f"❌ {message}")
+            return None
+
+        start = time.perf_counter()
+        with_snapshots = await server.stock_at(at, location=location)
+        snapshot_time = time.perf_counter() - start
+
+        # With only the baseline snapshot every movement since the start of the ledger has to be replayed
+        first = await asyncio.to_thread(self.db.stock_snapshot_runs.find_one, {}, sort=[("taken_at", 1)])
+        await asyncio.to_thread(self.db.stock_snapshot_runs.delete_many, {"taken_at": {"$gt": first["taken_at"]}})
+        start = time.perf_counter()
+        ledger_only = await server.stock_at(at, location=location)
+        ledger_time = time.perf_counter() - start
+
+        print(f"   con snapshot:  {snapshot_time * 1000:>9.1f} ms  ({with_snapshots['movements_applied']} movimenti)")
+        print(f"   solo registro: {ledger_time * 1000:>9.1f} ms  ({ledger_only['movements_applied']} movimenti)")
+        return ledger_time / snapshot_time
+
+    def run(self):
+        start = self.seed()
+        at = start + timedelta(days=self.days - 1, hours=22)
+        print(f"\n📊 Giacenze di 'Deposito 0' al {at.strftime('%d/%m/%Y %H:%M')}")
+        speedup = asyncio.run(self.measure(at, "Deposito 0"))
+        self.client.drop_database(self.db.name)
+        if speedup is None:
+            return 1
+        print(f"\n   Speedup: {speedup:.1f}x")
+        return 0
+
+if __name__ == "__main__":
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 90
+    sys.exit(StockLedgerBenchmark(days=days).run())
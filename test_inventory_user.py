@@ -174,6 +174,41 @@ class InventoryUserTester:
             return response.get('new_quantity')
         return None
     
+    def test_batch_inventory_movements(self, movements, reason=None):
+        """Test applying several inventory movements in one request"""
+        success, response = self.run_test(
+            f"Batch inventory movements ({len(movements)} lines)",
+            "POST",
+            "inventory/movements:batch",
+            200,
+            data={"movements": movements, "reason": reason}
+        )
+        if success:
+            print(f"Batch applied: {response.get('applied')} applied, {response.get('rejected')} rejected")
+            return response
+        return None
+    
+    def test_search_inventory(self, params=None):
+        """Test the faceted inventory search"""
+        endpoint = "inventory/search"
+        if params:
+            query_params = "&".join([f"{k}={v}" for k, v in params.items()])
+            endpoint = f"{endpoint}?{query_params}"
+        
+        success, response = self.run_test(
+            "Search inventory",
+            "GET",
+            endpoint,
+            200
+        )
+        if success:
+            facets = response["facets"]
+            print(f"Found {response['total']} items ({len(response['items'])} in this page, has_more: {response['has_more']})")
+            print(f"Facets: {len(facets['categories'])} categories, {len(facets['locations'])} locations, "
+                  f"{facets['low_stock']} low stock, {facets['expiring_soon']} expiring soon")
+            return response
+        return None
+    
     def test_get_inventory_categories(self):
         """Test getting inventory categories"""
         success, response = self.run_test(
@@ -371,11 +406,31 @@ def main():
             print(f"✅ Updated inventory quantity to {new_quantity}")
         else:
             print(f"❌ Failed to update inventory quantity")
+        
+        # Test batch movements: two valid lines, one exceeding the stock, one unknown item
+        batch = tester.test_batch_inventory_movements([
+            {"item_id": item_id, "quantity_change": 10, "reason": "Scarico camion"},
+            {"item_id": item_id, "quantity_change": -4, "reason": "Kit inviati sul campo"},
+            {"item_id": item_id, "quantity_change": -1000, "reason": "Richiesta eccessiva"},
+            {"item_id": "articolo-inesistente", "quantity_change": 1, "reason": "Articolo sconosciuto"}
+        ], reason="Movimentazione di test")
+        if batch and [line["status"] for line in batch["results"]] == [200, 200, 400, 404]:
+            print(f"✅ Batch movements reported per line, final quantity {batch['results'][1]['new_quantity']}")
+        else:
+            print(f"❌ Batch movements did not report the expected per-line results")
     
     # Test getting inventory with filters
     filtered_inventory = tester.test_get_inventory({"category": "medicinali"})
     print(f"Filtered inventory (medicinali): {len(filtered_inventory)} items")
     
+    # Test faceted search: a small page of one category, plus a text search
+    search = tester.test_search_inventory({"category": "medicinali", "limit": 2})
+    if search and all(item["category"] == "medicinali" for item in search["items"]):
+        print(f"✅ Faceted search returned {search['total']} medicinali")
+    else:
+        print(f"❌ Faceted search failed")
+    tester.test_search_inventory({"q": "Kit"})
+    
     # Test getting inventory categories
     categories = tester.test_get_inventory_categories()
     print(f"Inventory categories: {categories}")
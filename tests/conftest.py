@@ -0,0 +1,18 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import server  # noqa: E402
+from tests.fake_mongo import FakeClient, FakeDatabase  # noqa: E402
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """Point server.db (and the admin client) at an in-memory database, with an empty log writer"""
+    database = FakeDatabase()
+    monkeypatch.setattr(server, "db", database)
+    monkeypatch.setattr(server, "current_client", FakeClient())
+    monkeypatch.setattr(server, "log_writer", server.LogWriter(batch_size=500, flush_interval=1.0))
+    return database
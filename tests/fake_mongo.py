@@ -0,0 +1,297 @@
+"""In-memory stand-in for the slice of the motor API that server.py uses, for behavior tests"""
+import copy
+import re
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo.results import DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+MISSING = object()
+
+def get_path(document, path):
+    value = document
+    for part in path.split("."):
+        if isinstance(value, dict):
+            value = value.get(part, MISSING)
+        elif isinstance(value, list) and part.isdigit():
+            value = value[int(part)] if int(part) < len(value) else MISSING
+        else:
+            return MISSING
+        if value is MISSING:
+            return MISSING
+    return value
+
+def set_path(document, path, value):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        document = document.setdefault(part, {})
+    document[parts[-1]] = value
+
+def compare(value, operator, operand):
+    if value is MISSING or value is None or operand is None:
+        return False
+    try:
+        return {
+            "$gt": value > operand,
+            "$gte": value >= operand,
+            "$lt": value < operand,
+            "$lte": value <= operand
+        }[operator]
+    except TypeError:
+        return False
+
+def bson_type(value):
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, datetime):
+        return "date"
+    if value is None:
+        return "null"
+    return "missing" if value is MISSING else type(value).__name__
+
+def matches_condition(value, condition):
+    if not (isinstance(condition, dict) and any(key.startswith("$") for key in condition)):
+        if isinstance(value, list) and not isinstance(condition, list):
+            return condition in value
+        return (None if value is MISSING else value) == condition
+    for operator, operand in condition.items():
+        if operator == "$eq" and not matches_condition(value, operand):
+            return False
+        if operator == "$ne" and matches_condition(value, operand):
+            return False
+        if operator in ("$gt", "$gte", "$lt", "$lte") and not compare(value, operator, operand):
+            return False
+        if operator == "$in" and not any(matches_condition(value, option) for option in operand):
+            return False
+        if operator == "$exists" and (value is not MISSING) != bool(operand):
+            return False
+        if operator == "$type" and bson_type(value) != operand:
+            return False
+        if operator == "$regex":
+            flags = re.IGNORECASE if "i" in condition.get("$options", "") else 0
+            if not isinstance(value, str) or not re.search(operand, value, flags):
+                return False
+        if operator == "$geoWithin":
+            (min_x, min_y), (max_x, max_y) = operand["$box"]
+            if not (isinstance(value, list) and min_x <= value[0] <= max_x and min_y <= value[1] <= max_y):
+                return False
+    return True
+
+def matches(document, query):
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(matches(document, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(document, clause) for clause in condition):
+                return False
+        elif not matches_condition(get_path(document, key), condition):
+            return False
+    return True
+
+def evaluate(expression, document):
+    """Aggregation expressions used by pipeline updates"""
+    if isinstance(expression, str) and expression.startswith("$"):
+        value = get_path(document, expression[1:])
+        return None if value is MISSING else value
+    if isinstance(expression, list):
+        return [evaluate(item, document) for item in expression]
+    if not isinstance(expression, dict):
+        return expression
+    if len(expression) == 1 and next(iter(expression)).startswith("$"):
+        operator, operand = next(iter(expression.items()))
+        if operator == "$literal":
+            return operand
+        if operator == "$switch":
+            for branch in operand["branches"]:
+                if evaluate(branch["case"], document):
+                    return evaluate(branch["then"], document)
+            return evaluate(operand.get("default"), document)
+        if operator == "$type":
+            return bson_type(get_path(document, operand[1:]) if isinstance(operand, str) else operand)
+        args = evaluate(operand, document)
+        if operator == "$add":
+            return sum(args)
+        if operator == "$ifNull":
+            return args[0] if args[0] is not None else args[1]
+        if operator == "$and":
+            return all(args)
+        if operator == "$eq":
+            return args[0] == args[1]
+        if operator in ("$gt", "$gte", "$lt", "$lte"):
+            return compare(args[0], operator, args[1])
+        raise NotImplementedError(operator)
+    return {key: evaluate(value, document) for key, value in expression.items()}
+
+def apply_update(document, update):
+    if isinstance(update, list):
+        for stage in update:
+            values = {key: evaluate(value, document) for key, value in stage["$set"].items()}
+            for key, value in values.items():
+                set_path(document, key, value)
+        return
+    for key, value in update.get("$set", {}).items():
+        set_path(document, key, copy.deepcopy(value))
+    for key, value in update.get("$inc", {}).items():
+        current = get_path(document, key)
+        set_path(document, key, (0 if current is MISSING else current) + value)
+    for key in update.get("$unset", {}):
+        document.pop(key, None)
+
+def project(document, projection):
+    if not projection:
+        return copy.deepcopy(document)
+    included = [key for key, value in projection.items() if value and key != "_id"]
+    if included:
+        result = {key: copy.deepcopy(document[key]) for key in included if key in document}
+        if projection.get("_id", 1) and "_id" in document:
+            result["_id"] = document["_id"]
+        return result
+    return {key: copy.deepcopy(value) for key, value in document.items() if projection.get(key, 1)}
+
+def sort_documents(documents, sort):
+    if isinstance(sort, str):
+        sort = [(sort, 1)]
+    for key, direction in reversed(sort):
+        documents.sort(
+            key=lambda document: (get_path(document, key) is MISSING, get_path(document, key)),
+            reverse=direction < 0
+        )
+    return documents
+
+class FakeCursor:
+    def __init__(self, documents, projection):
+        self.documents = documents
+        self.projection = projection
+        self.limit_count = None
+
+    def sort(self, key, direction=None):
+        sort_documents(self.documents, [(key, direction)] if direction is not None else key)
+        return self
+
+    def limit(self, count):
+        self.limit_count = count
+        return self
+
+    def results(self):
+        documents = self.documents[:self.limit_count] if self.limit_count else self.documents
+        return [project(document, self.projection) for document in documents]
+
+    async def to_list(self, length=None):
+        return self.results()
+
+    def __aiter__(self):
+        return self.iterate()
+
+    async def iterate(self):
+        for document in self.results():
+            yield document
+
+class FakeCollection:
+    def __init__(self, name):
+        self.name = name
+        self.documents = []
+
+    def matching(self, query):
+        return [document for document in self.documents if matches(document, query or {})]
+
+    async def create_index(self, *args, **kwargs):
+        return None
+
+    async def insert_one(self, document):
+        document.setdefault("_id", ObjectId())
+        self.documents.append(copy.deepcopy(document))
+        return InsertOneResult(document["_id"], True)
+
+    async def insert_many(self, documents, ordered=True):
+        for document in documents:
+            await self.insert_one(document)
+        return InsertManyResult([document["_id"] for document in documents], True)
+
+    def find(self, query=None, projection=None):
+        return FakeCursor(self.matching(query), projection)
+
+    async def find_one(self, query=None, projection=None, sort=None):
+        documents = self.matching(query)
+        if sort:
+            sort_documents(documents, sort)
+        return project(documents[0], projection) if documents else None
+
+    async def count_documents(self, query, limit=None):
+        count = len(self.matching(query))
+        return min(count, limit) if limit else count
+
+    async def estimated_document_count(self):
+        return len(self.documents)
+
+    def upsert(self, query, update):
+        document = {key: copy.deepcopy(value) for key, value in query.items() if not key.startswith("$") and not isinstance(value, dict)}
+        document.setdefault("_id", ObjectId())
+        apply_update(document, update)
+        self.documents.append(document)
+        return document
+
+    async def update_one(self, query, update, upsert=False):
+        documents = self.matching(query)
+        if documents:
+            apply_update(documents[0], update)
+        elif upsert:
+            self.upsert(query, update)
+        return UpdateResult({"n": len(documents[:1]), "nModified": len(documents[:1])}, True)
+
+    async def update_many(self, query, update):
+        documents = self.matching(query)
+        for document in documents:
+            apply_update(document, update)
+        return UpdateResult({"n": len(documents), "nModified": len(documents)}, True)
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=False, upsert=False):
+        documents = self.matching(query)
+        if not documents:
+            if upsert:
+                document = self.upsert(query, update)
+                return project(document, projection) if return_document else None
+            return None
+        before = copy.deepcopy(documents[0])
+        apply_update(documents[0], update)
+        return project(documents[0] if return_document else before, projection)
+
+    async def find_one_and_delete(self, query, projection=None):
+        documents = self.matching(query)
+        if not documents:
+            return None
+        self.documents.remove(documents[0])
+        return project(documents[0], projection)
+
+    async def delete_many(self, query):
+        documents = self.matching(query)
+        self.documents = [document for document in self.documents if document not in documents]
+        return DeleteResult({"n": len(documents)}, True)
+
+class FakeDatabase:
+    def __init__(self):
+        self.collections = {}
+
+    def __getitem__(self, name):
+        return self.collections.setdefault(name, FakeCollection(name))
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def list_collection_names(self):
+        return list(self.collections)
+
+    async def command(self, name):
+        return {"ok": 1}
+
+class FakeClient:
+    def __init__(self, server_status=None):
+        self.admin = self
+        self.server_status = server_status or {"version": "7.0.0", "uptime": 42}
+
+    async def command(self, name):
+        return self.server_status
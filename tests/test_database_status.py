@@ -0,0 +1,15 @@
+import asyncio
+
+import server
+
+def test_database_status_reports_integer_counts(fake_db):
+    async def scenario():
+        await fake_db.events.insert_many([{"id": "e1"}, {"id": "e2"}])
+        await fake_db.logs.insert_one({"id": "l1"})
+        return await server.get_database_status(current_user={"role": "admin"})
+
+    status = asyncio.run(scenario())
+    assert status["status"] == "connected"
+    assert status["collections"] == {"events": 2, "logs": 1}
+    assert all(isinstance(count, int) for count in status["collections"].values())
+    assert status["total_documents"] == 3
@@ -0,0 +1,40 @@
+import asyncio
+from datetime import date, datetime
+
+import server
+
+def test_normalize_expiry_date_parses_iso_strings():
+    assert server.normalize_expiry_date("2025-03-01") == datetime(2025, 3, 1)
+    assert server.normalize_expiry_date(" 2025-03-01T10:30:00 ") == datetime(2025, 3, 1, 10, 30)
+    # Offsets are converted to naive UTC
+    assert server.normalize_expiry_date("2025-03-01T10:30:00+02:00") == datetime(2025, 3, 1, 8, 30)
+    assert server.normalize_expiry_date("2025-03-01T10:30:00Z") == datetime(2025, 3, 1, 10, 30)
+
+def test_normalize_expiry_date_accepts_dates_and_datetimes():
+    assert server.normalize_expiry_date(date(2025, 3, 1)) == datetime(2025, 3, 1)
+    assert server.normalize_expiry_date(datetime(2025, 3, 1, 9, 0)) == datetime(2025, 3, 1, 9, 0)
+
+def test_normalize_expiry_date_rejects_garbage_and_empty_values():
+    for value in (None, "", "   ", "31/02/2025", "mai", 20250301):
+        assert server.normalize_expiry_date(value) is None
+
+def test_migration_converts_strings_and_keeps_unparseable_values(fake_db, capsys):
+    async def scenario():
+        await fake_db.inventory.insert_many([
+            {"id": "iso", "expiry_date": "2025-03-01"},
+            {"id": "vuota", "expiry_date": ""},
+            {"id": "illeggibile", "expiry_date": "fine marzo"},
+            {"id": "gia-data", "expiry_date": datetime(2025, 4, 1)}
+        ])
+        return await server.migrate_expiry_dates()
+
+    migrated = asyncio.run(scenario())
+    stored = {item["id"]: item["expiry_date"] for item in fake_db.inventory.documents}
+    assert migrated == 2
+    assert stored == {
+        "iso": datetime(2025, 3, 1),
+        "vuota": None,
+        "illeggibile": "fine marzo",
+        "gia-data": datetime(2025, 4, 1)
+    }
+    assert "illeggibile" in capsys.readouterr().out
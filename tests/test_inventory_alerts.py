@@ -0,0 +1,55 @@
+import asyncio
+from datetime import timedelta
+
+import server
+
+def test_stored_expiry_buckets_follow_whole_days(fake_db):
+    today = server.today_start()
+    expiry_dates = {
+        "ieri": today - timedelta(days=1),
+        "oggi": today,
+        "domani": today + timedelta(days=1),
+        "tra-7-giorni": today + timedelta(days=7, hours=12),
+        "tra-30-giorni": today + timedelta(days=30),
+        "tra-31-giorni": today + timedelta(days=31),
+        "senza-scadenza": None
+    }
+
+    async def scenario():
+        await fake_db.inventory.insert_many([
+            {"id": item_id, "quantity": 1, "min_quantity": 0, "expiry_date": expiry_date}
+            for item_id, expiry_date in expiry_dates.items()
+        ])
+        await server.refresh_inventory_alerts(full=True)
+
+    asyncio.run(scenario())
+    stored = {item["id"]: item["expiry_bucket"] for item in fake_db.inventory.documents}
+    assert stored == {
+        "ieri": "scaduto",
+        "oggi": "scaduto",
+        "domani": "entro_7_giorni",
+        "tra-7-giorni": "entro_30_giorni",
+        "tra-30-giorni": "entro_30_giorni",
+        "tra-31-giorni": None,
+        "senza-scadenza": None
+    }
+    # Writes computed in Python agree with the pipeline used by movements and the nightly refresh
+    assert stored == {item_id: server.expiry_bucket(expiry_date) for item_id, expiry_date in expiry_dates.items()}
+
+def test_low_stock_includes_the_minimum_quantity(fake_db):
+    quantities = {"sotto": 2, "al-minimo": 3, "sopra": 4}
+
+    async def scenario():
+        await fake_db.inventory.insert_many([
+            {"id": item_id, "quantity": quantity, "min_quantity": 3, "expiry_date": None}
+            for item_id, quantity in quantities.items()
+        ])
+        await server.refresh_inventory_alerts(full=True)
+
+    asyncio.run(scenario())
+    stored = {item["id"]: item["low_stock"] for item in fake_db.inventory.documents}
+    assert stored == {"sotto": True, "al-minimo": True, "sopra": False}
+    # Full writes and dashboard counters use the same rule as the stored flag (and the frontend badge)
+    for item in fake_db.inventory.documents:
+        assert server.inventory_alert_state(item)["low_stock"] == item["low_stock"]
+        assert server.inventory_counters(item)["low_stock"] == int(item["low_stock"])
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+USER = {"username": "magazziniere1", "role": "warehouse"}
+
+def inventory_item(item_id, quantity, location="Magazzino A"):
+    return {
+        "id": item_id,
+        "name": f"Articolo {item_id}",
+        "category": "altro",
+        "quantity": quantity,
+        "min_quantity": 0,
+        "unit": "pz",
+        "location": location
+    }
+
+def test_batch_reports_the_stock_it_actually_applied_to(fake_db, monkeypatch):
+    collection = fake_db.inventory
+    read_stock = collection.find
+
+    def find_then_concurrent_unload(*args, **kwargs):
+        cursor = read_stock(*args, **kwargs)
+        read = cursor.to_list
+
+        async def to_list(length=None):
+            documents = await read(length)
+            # Another writer takes 3 pieces right after the batch read the stock
+            collection.documents[0]["quantity"] -= 3
+            return documents
+        cursor.to_list = to_list
+        return cursor
+
+    async def scenario():
+        await collection.insert_one(inventory_item("a", 10))
+        monkeypatch.setattr(collection, "find", find_then_concurrent_unload)
+        batch = server.InventoryMovementBatch(movements=[
+            server.InventoryMovement(item_id="a", quantity_change=-2, reason="Scarico"),
+            server.InventoryMovement(item_id="a", quantity_change=5, reason="Carico", location="Magazzino B")
+        ])
+        response = await server.batch_inventory_movements(batch, current_user=USER)
+        ledger = await fake_db.stock_movements.find({}, {"_id": 0}).sort("quantity_after", 1).to_list(None)
+        return response, ledger
+
+    response, ledger = asyncio.run(scenario())
+    assert [result["new_quantity"] for result in response["results"]] == [5, 10]
+    assert [(entry["quantity_after"], entry["location"]) for entry in ledger] == [(5, "Magazzino A"), (10, "Magazzino B")]
+    assert collection.documents[0]["quantity"] == 10
+
+def test_batch_replays_items_whose_guard_no_longer_holds(fake_db):
+    async def scenario():
+        await fake_db.inventory.insert_one(inventory_item("a", 1))
+        batch = server.InventoryMovementBatch(movements=[
+            server.InventoryMovement(item_id="a", quantity_change=-1, reason="Scarico"),
+            server.InventoryMovement(item_id="a", quantity_change=-1, reason="Scarico"),
+            server.InventoryMovement(item_id="mancante", quantity_change=1, reason="Carico")
+        ])
+        return await server.batch_inventory_movements(batch, current_user=USER)
+
+    response = asyncio.run(scenario())
+    assert [result["status"] for result in response["results"]] == [200, 400, 404]
+    assert response["results"][0]["new_quantity"] == 0
+    assert fake_db.inventory.documents[0]["quantity"] == 0
+
+def move(item_id, change):
+    return server.update_inventory_quantity(item_id, server.InventoryUpdate(quantity_change=change, reason="Test"), current_user=USER)
+
+def test_decrement_down_to_zero_is_applied(fake_db):
+    async def scenario():
+        await fake_db.inventory.insert_one(inventory_item("a", 3))
+        return await move("a", -3)
+
+    assert asyncio.run(scenario())["new_quantity"] == 0
+    assert fake_db.inventory.documents[0]["quantity"] == 0
+    assert len(fake_db.stock_movements.documents) == 1
+
+def test_decrement_below_zero_is_rejected_with_400(fake_db):
+    async def scenario():
+        await fake_db.inventory.insert_one(inventory_item("a", 3))
+        await move("a", -4)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(scenario())
+    assert error.value.status_code == 400
+    assert fake_db.inventory.documents[0]["quantity"] == 3
+    assert fake_db.stock_movements.documents == []
+
+def test_movement_on_a_missing_item_is_rejected_with_404(fake_db):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(move("mancante", -1))
+    assert error.value.status_code == 404
+
+def test_concurrent_decrements_stop_at_zero(fake_db):
+    async def scenario():
+        await fake_db.inventory.insert_one(inventory_item("a", 5))
+        return await asyncio.gather(*(move("a", -1) for _ in range(8)), return_exceptions=True)
+
+    outcomes = asyncio.run(scenario())
+    assert sum(isinstance(outcome, dict) for outcome in outcomes) == 5
+    assert [outcome.status_code for outcome in outcomes if isinstance(outcome, HTTPException)] == [400] * 3
+    assert fake_db.inventory.documents[0]["quantity"] == 0
@@ -0,0 +1,43 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+import server
+
+def log_entry(timestamp):
+    return {"id": str(uuid.uuid4()), "timestamp": timestamp, "operator": "admin", "action": "Test", "details": "", "priority": "normale"}
+
+def test_entries_arriving_while_a_month_is_archived_are_not_lost(fake_db, monkeypatch, tmp_path):
+    monkeypatch.setattr(server, "LOG_ARCHIVE_DIR", str(tmp_path))
+    old_month = server.add_months(server.hot_logs_start(), -2)
+    logs = fake_db.logs
+    read_logs = logs.find
+    late = log_entry(old_month.replace(day=20))
+
+    def find_then_late_flush(*args, **kwargs):
+        cursor = read_logs(*args, **kwargs)
+        read = cursor.to_list
+
+        async def to_list(length=None):
+            documents = await read(length)
+            if late["id"] not in {log["id"] for log in logs.documents}:
+                # A batched flush lands in the month after it was read for archiving
+                await logs.insert_one(dict(late))
+            return documents
+        cursor.to_list = to_list
+        return cursor
+
+    async def scenario():
+        await logs.insert_many([log_entry(old_month.replace(day=day)) for day in (2, 9, 16)])
+        await logs.insert_one(log_entry(datetime.now()))
+        monkeypatch.setattr(logs, "find", find_then_late_flush)
+        return await server.archive_old_logs()
+
+    archived = asyncio.run(scenario())
+    catalog = fake_db.log_archives.documents
+    assert archived == 4
+    assert [entry["count"] for entry in catalog] == [4]
+    archived_ids = {log["id"] for log in server.read_log_archive(catalog[0]["path"])}
+    assert late["id"] in archived_ids and len(archived_ids) == 4
+    assert len(logs.documents) == 1
+    assert not list(tmp_path.rglob("*.tmp"))
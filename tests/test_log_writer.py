@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+from pymongo.errors import AutoReconnect
+
+import server
+
+def log_entry(number):
+    return {"id": f"log-{number}", "operator": "admin", "action": "Test", "priority": "normale"}
+
+def test_buffer_stays_bounded_while_the_database_is_down(fake_db, monkeypatch):
+    writer = server.LogWriter(batch_size=2, flush_interval=1.0, max_buffer=4)
+    database = {"down": True}
+    insert_many = fake_db.logs.insert_many
+
+    async def insert_unless_down(*args, **kwargs):
+        if database["down"]:
+            raise AutoReconnect("database down")
+        return await insert_many(*args, **kwargs)
+
+    async def scenario():
+        monkeypatch.setattr(fake_db.logs, "insert_many", insert_unless_down)
+        for number in range(4):
+            await writer.write(log_entry(number))
+        # A full buffer makes the writer flush first, and the failure reaches the caller
+        with pytest.raises(AutoReconnect):
+            await writer.write(log_entry(4))
+        assert len(writer.buffer) == 4
+
+        # Entries queued while a failed batch was in flight push the oldest ones out
+        writer.buffer, batch = [log_entry(5), log_entry(6)], writer.buffer
+        writer.requeue(batch)
+        assert [entry["id"] for entry in writer.buffer] == ["log-2", "log-3", "log-5", "log-6"]
+
+        database["down"] = False
+        return await writer.flush()
+
+    written = asyncio.run(scenario())
+    assert written == 4
+    assert writer.stats()["dropped"] == 2
+    assert writer.stats()["retried"] == 8
+    assert writer.stats()["failures"] == 2
+    assert [log["id"] for log in fake_db.logs.documents] == ["log-2", "log-3", "log-5", "log-6"]
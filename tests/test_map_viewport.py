@@ -0,0 +1,73 @@
+import asyncio
+from datetime import datetime
+
+import server
+from tests.fake_mongo import FakeCursor
+
+def map_event(event_id, longitude, latitude):
+    return {
+        "id": event_id,
+        "title": event_id,
+        "description": "",
+        "event_type": "altro",
+        "severity": "media",
+        "status": "aperto",
+        "latitude": latitude,
+        "longitude": longitude,
+        "location": server.event_location(latitude, longitude),
+        "created_at": datetime.now(),
+        "created_by": "test"
+    }
+
+def visible_ids(fake_db, events, bbox):
+    async def scenario():
+        await fake_db.events.insert_many(events)
+        page = await server.get_map_events(
+            status=None, event_type=None, severity=None, bbox=bbox, lat=None, lon=None,
+            radius_km=None, cluster=False, zoom=None, current_user={"role": "admin"}
+        )
+        return {event["id"] for event in page["events"]}
+    return asyncio.run(scenario())
+
+def test_wide_viewport_keeps_events_along_the_southern_edge(fake_db):
+    # On a 175° wide view a great-circle bottom edge would bow up to ~86° at the centre
+    events = [
+        map_event("bordo-sud", 0.0, 37.0),
+        map_event("angolo", -99.0, 36.5),
+        map_event("fuori-sud", 0.0, 35.0),
+        map_event("fuori-est", 80.0, 50.0)
+    ]
+    assert visible_ids(fake_db, events, "-100,36,75,70") == {"bordo-sud", "angolo"}
+
+def test_viewport_across_the_antimeridian_is_split(fake_db):
+    events = [
+        map_event("fiji", 178.0, -17.0),
+        map_event("samoa", -172.0, -13.5),
+        map_event("greenwich", 0.0, -15.0)
+    ]
+    assert visible_ids(fake_db, events, "170,-20,-170,-10") == {"fiji", "samoa"}
+
+def test_unwrapped_map_bounds_are_normalized():
+    assert server.bbox_boxes(170, -20, 190, -10) == [[[170, -20], [180.0, -10]], [[-180.0, -20], [-170, -10]]]
+    assert server.bbox_boxes(-400, -80, 400, 80) == [[[-180.0, -80], [180.0, 80]]]
+
+def test_truncated_cluster_view_reports_the_true_total(fake_db, monkeypatch):
+    events = [map_event(f"evento-{number}", 9.0 + number, 45.0) for number in range(3)]
+    # Only the densest cell survives the cell limit
+    cells = [{
+        "_id": {"x": 0, "y": 0}, "count": 2, "latitude": 45.0, "longitude": 9.5,
+        "event": {}, **{severity: 0 for severity in server.SEVERITY_LEVELS}, "media": 2
+    }]
+    monkeypatch.setattr(server, "MAP_CLUSTER_MAX_CELLS", 1)
+    monkeypatch.setattr(fake_db.events, "aggregate", lambda pipeline: FakeCursor(cells, None), raising=False)
+
+    async def scenario():
+        await fake_db.events.insert_many(events)
+        return await server.get_map_events(
+            status=None, event_type=None, severity=None, bbox=None, lat=None, lon=None,
+            radius_km=None, cluster=True, zoom=3, current_user={"role": "admin"}
+        )
+
+    page = asyncio.run(scenario())
+    assert page["truncated"] is True
+    assert (page["total"], page["shown"]) == (3, 2)
@@ -0,0 +1,41 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import server
+
+def log_entry(number, operator):
+    return {
+        "id": f"log-{number:02d}",
+        "timestamp": datetime(2026, 10, 1) + timedelta(minutes=number),
+        "operator": operator,
+        "action": "Test",
+        "details": "",
+        "priority": "normale"
+    }
+
+def test_operator_filter_matches_the_username_exactly(fake_db):
+    async def scenario():
+        await fake_db.logs.insert_many([
+            log_entry(1, "operatore1"),
+            log_entry(2, "Operatore1"),
+            log_entry(3, "operatore10"),
+            log_entry(4, "operatore1")
+        ])
+        return await server.get_operational_logs(
+            cursor=None, limit=50, order="desc", operator=" operatore1 ", priority=None, event_id=None,
+            start_date=None, end_date=None, include_total=True, current_user={"role": "admin"}
+        )
+
+    page = asyncio.run(scenario())
+    assert [log["id"] for log in page["logs"]] == ["log-04", "log-01"]
+    assert page["total"] == 2
+
+def test_archived_logs_use_the_same_operator_match():
+    query = {"operator": "operatore1"}
+    assert server.log_matches({"operator": "operatore1"}, query)
+    assert not server.log_matches({"operator": "Operatore1"}, query)
+    assert not server.log_matches({"operator": "operatore10"}, query)
+
+def test_log_report_uses_the_same_operator_match():
+    report_request = server.normalize_report_request(server.ReportRequest(report_type="logs", format="pdf", operator=" operatore1 "))
+    assert server.build_report_query(report_request)[1] == {"operator": "operatore1"}
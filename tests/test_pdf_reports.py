@@ -0,0 +1,43 @@
+import weakref
+from datetime import datetime, timedelta
+
+import server
+
+def logs(count):
+    now = datetime.now()
+    for i in range(count):
+        yield {
+            "id": f"log-{i}",
+            "action": f"Azione {i}",
+            "priority": "media",
+            "operator": "operatore1",
+            "timestamp": now - timedelta(minutes=i),
+            "details": "Dettagli"
+        }
+
+def test_logs_pdf_lays_out_rows_as_they_are_read(monkeypatch):
+    live_tables = weakref.WeakSet()
+    most_live = 0
+
+    class TrackedTable(server.Table):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            live_tables.add(self)
+
+    def tracked(rows):
+        nonlocal most_live
+        for row in rows:
+            most_live = max(most_live, len(live_tables))
+            yield row
+
+    monkeypatch.setattr(server, "Table", TrackedTable)
+    count = 40 * server.PDF_TABLE_CHUNK_ROWS
+    pdf = server.generate_logs_pdf(tracked(logs(count)), {}, total=count)
+
+    assert pdf.getvalue().startswith(b"%PDF")
+    assert most_live <= 4
+
+def test_pdf_without_total_counts_the_rows():
+    pdf = server.generate_events_pdf([{"title": "Incendio", "created_at": datetime.now()}], {})
+
+    assert pdf.getvalue().startswith(b"%PDF")
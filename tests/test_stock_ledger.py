@@ -0,0 +1,68 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+USER = {"username": "magazziniere1", "role": "warehouse"}
+
+def inventory_item(item_id, quantity):
+    return {"id": item_id, "name": f"Articolo {item_id}", "quantity": quantity, "min_quantity": 0, "unit": "pz", "location": "Magazzino A"}
+
+async def move(item_id, change):
+    await server.update_inventory_quantity(item_id, server.InventoryUpdate(quantity_change=change, reason="Test"), current_user=USER)
+
+def test_movement_committed_during_the_snapshot_scan_is_counted_once(fake_db, monkeypatch):
+    collection = fake_db.inventory
+    read_inventory = collection.find
+
+    def find_with_concurrent_movement(*args, **kwargs):
+        cursor = read_inventory(*args, **kwargs)
+
+        async def iterate():
+            # The movement lands after taken_at but before the scan reads the item
+            await move("a", 5)
+            async for item in read_inventory(*args, **kwargs):
+                yield item
+        cursor.iterate = iterate
+        return cursor
+
+    async def scenario():
+        await collection.insert_one(inventory_item("a", 10))
+        monkeypatch.setattr(collection, "find", find_with_concurrent_movement)
+        await server.take_stock_snapshot()
+        monkeypatch.setattr(collection, "find", read_inventory)
+        await move("a", -3)
+        return await server.stock_at(datetime.now())
+
+    stock = asyncio.run(scenario())
+    assert [(entry["item_id"], entry["quantity"]) for entry in stock["items"]] == [("a", 12)]
+    assert stock["movements_applied"] == 1
+    assert collection.documents[0]["quantity"] == 12
+
+def test_stock_at_replays_movements_up_to_the_timestamp(fake_db):
+    async def scenario():
+        await fake_db.inventory.insert_many([inventory_item("a", 10), inventory_item("b", 4)])
+        await server.take_stock_snapshot()
+        await move("a", -4)
+        middle = datetime.now()
+        await move("b", 6)
+        await server.delete_inventory_item("a", current_user={"username": "admin", "role": "admin"})
+        return await server.stock_at(middle), await server.stock_at(datetime.now())
+
+    at_middle, at_end = asyncio.run(scenario())
+    assert {entry["item_id"]: entry["quantity"] for entry in at_middle["items"]} == {"a": 6, "b": 4}
+    assert {entry["item_id"]: entry["quantity"] for entry in at_end["items"]} == {"b": 10}
+    assert at_end["totals_by_unit"] == {"pz": 10}
+
+def test_stock_before_the_first_snapshot_is_rejected(fake_db):
+    async def scenario():
+        await fake_db.inventory.insert_one(inventory_item("a", 10))
+        await server.take_stock_snapshot()
+        await server.stock_at(datetime.now() - timedelta(days=1))
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(scenario())
+    assert error.value.status_code == 400